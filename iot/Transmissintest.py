@@ -31,6 +31,7 @@ class SimulatorConfig:
     TOPIC = "barrier_condition"  # Ana kodunuzdaki topic ile aynı olmalı
     QOS = 1
     KEEPALIVE = 60
+    CONNECT_TIMEOUT = 5  # CONNACK için en fazla bekleme süresi (saniye)
 
 
 class MQTTSimulator:
@@ -40,6 +41,7 @@ class MQTTSimulator:
         self.client: Optional[mqtt.Client] = None
         self.connected = False
         self.stop_event = Event()
+        self.connect_event = Event()
         
     def on_connect(self, client, userdata, flags, rc):
 
@@ -49,6 +51,7 @@ class MQTTSimulator:
         else:
             self.connected = False
             logger.error(f"Connection Failed With Code: {rc}")
+        self.connect_event.set()
     
     def on_disconnect(self, client, userdata, rc):
 
@@ -60,8 +63,9 @@ class MQTTSimulator:
 
         logger.debug(f"Message Published (ID: {mid})")
     
-    def connect(self) -> bool:
+    def connect(self, timeout: float = SimulatorConfig.CONNECT_TIMEOUT) -> bool:
 
+        self.connect_event.clear()
         try:
             client_id = f"simulator_{int(time.time())}"
             self.client = mqtt.Client(client_id=client_id)
@@ -74,7 +78,9 @@ class MQTTSimulator:
             self.client.connect(SimulatorConfig.BROKER, SimulatorConfig.PORT, SimulatorConfig.KEEPALIVE)
             self.client.loop_start()
             
-            time.sleep(2)
+            if not self.connect_event.wait(timeout):
+                logger.error(f"Connection Timeout ({timeout} s)")
+                self.client.loop_stop()
             return self.connected
             
         except Exception as e:
@@ -175,11 +175,17 @@
 # if __name__ == "__main__":
 #     main()
 import paho.mqtt.client as mqtt
-import json
 import time
 import logging
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional
+
+import wire_format
+from ack_tracker import AckTracker
 
 logging.basicConfig(
     level=logging.INFO,
@@ -207,18 +213,55 @@ class MQTTConfig:
     TOPIC = "barrier_condition"
     KEEPALIVE = 60
     QOS = 1
-    RECONNECT_DELAY = 5
+    RECONNECT_MIN_DELAY = 1  # İlk yeniden bağlanma beklemesi (saniye), her denemede iki katına çıkar
+    RECONNECT_DELAY = 5  # Yeniden bağlanma beklemesinin üst sınırı (saniye)
+    OFFLINE_BUFFER_SIZE = 32  # Bağlantı yokken tutulan en fazla komut (yön başına en yenisi)
+    CONNECT_TIMEOUT = 5  # CONNACK için en fazla bekleme süresi (saniye)
+    MAX_INFLIGHT = 20  # Onayı (PUBACK) beklenen en fazla mesaj sayısı
+    ACK_TIMEOUT = 10  # Onay gelmezse mesajın başarısız sayılacağı süre (saniye)
+    # Varsayılan mesaj biçimi: "json" | "binary". Konu bazında TOPIC_FORMATS ile ezilir;
+    # cihaz "<topic>/format" konusuna "binary" yayınlarsa o konu ikili biçime geçer.
+    PAYLOAD_FORMAT = wire_format.FORMAT_JSON
+    TOPIC_FORMATS = {}
 
 
 class MQTTClient:
     """MQTT istemci sınıfı - Bariyer kontrol mesajlarını gönderir"""
 
-    def __init__(self, broker: str, port: int, topic: str):
+    def __init__(self, broker: str, port: int, topic: str, max_inflight: int = MQTTConfig.MAX_INFLIGHT,
+                 barrier_id: int = 0):
         self.broker = broker
         self.port = port
         self.topic = topic
         self.client: Optional[mqtt.Client] = None
         self.connected = False
+        # on_connect çağrıldığında (başarılı ya da değil) işaretlenir
+        self._connect_event = threading.Event()
+        # Son başarısız denemenin nedeni (CONNACK reddi ya da TCP hatası)
+        self._connect_error: Optional[str] = None
+
+        # Mesaj biçimi ve ikili biçim alanları
+        self.barrier_id = barrier_id
+        self.payload_format = MQTTConfig.TOPIC_FORMATS.get(topic, MQTTConfig.PAYLOAD_FORMAT)
+        self._seq = 0
+
+        # Asenkron yayın durumu: mid -> (future, callback, durum, yön, gönderim zamanı)
+        self.max_inflight = max_inflight
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        # _pending_lock ve _acks on_publish içinden de alınır; paho o sırada kendi iç kilidini
+        # tuttuğundan publish() çağrısı boyunca asla tutulmaz. Yayın sırası _send_lock ile korunur.
+        self._pending_lock = threading.RLock()
+        self._send_lock = threading.Lock()
+        self._acks = AckTracker()
+        # ("ack" | "fail" | "superseded", durum, yön, gecikme_sn, açıklama) kayıtları
+        self.ack_queue: "queue.Queue[tuple]" = queue.Queue()
+
+        # Bağlantı yokken bekleyen komutlar: yön -> (future, callback, durum, yön, kuyruğa alınma zamanı)
+        # Aynı yön için yeni komut eskisinin yerini alır; yeniden bağlanınca sırayla gönderilir.
+        self.offline_buffer_size = MQTTConfig.OFFLINE_BUFFER_SIZE
+        self._offline: "OrderedDict[DirectionBarrier, tuple]" = OrderedDict()
+        self.reconnect_count = 0
+        self._was_connected = False
 
     def on_connect(self, client, userdata, flags, rc, properties=None):
         """Bağlantı kurulduğunda çağrılır"""
@@ -234,20 +277,44 @@ class MQTTClient:
         if rc == 0:
             self.connected = True
             client.subscribe(self.topic, qos=MQTTConfig.QOS)
+            client.subscribe(wire_format.format_topic(self.topic), qos=MQTTConfig.QOS)
             logger.info(f"Subscribed to topic: {self.topic}")
-            logger.info(f"Connected to MQTT Broker: {self.broker}:{self.port}")
+            if self._was_connected:
+                self.reconnect_count += 1
+                logger.info(f"Reconnected to MQTT Broker: {self.broker}:{self.port} "
+                            f"({len(self._offline)} buffered commands)")
+            else:
+                logger.info(f"Connected to MQTT Broker: {self.broker}:{self.port}")
+            self._was_connected = True
         else:
             self.connected = False
-            logger.error(f"Connection Warning: {warning_numbers.get(rc, 'Unknown Warning')} (code: {rc})")
+            # VERSION2 API'de rc bir ReasonCode nesnesidir (hashlenemez, adı str() ile alınır)
+            reason = str(rc) if hasattr(rc, "value") else warning_numbers.get(rc, "Unknown Warning")
+            self._connect_error = f"{reason} (code: {getattr(rc, 'value', rc)})"
+            logger.error(f"Connection Warning: {self._connect_error}")
+        self._connect_event.set()
+        if self.connected:
+            self._flush_offline(blocking=False)
+
+    def on_connect_fail(self, client, userdata):
+        """Bağlantı denemesi (TCP) başarısız olduğunda çağrılır; paho beklemeyi artırarak yeniden dener"""
+        logger.warning(f"Connection attempt to {self.broker}:{self.port} failed, retrying "
+                       f"(backoff {MQTTConfig.RECONNECT_MIN_DELAY}-{MQTTConfig.RECONNECT_DELAY} s)")
+        self._connect_error = "broker unreachable"
+        self._connect_event.set()
 
     def on_message(self, client, userdata, message):
         """Mesaj alındığında çağrılır"""
         try:
-            msg_payload = message.payload.decode('utf-8')
-            logger.info(f"Message Received [{message.topic}]: {msg_payload}")
+            if message.topic == wire_format.format_topic(self.topic):
+                # Cihaz desteklediği biçimi duyurdu
+                self.payload_format = wire_format.parse_format_announcement(message.payload)
+                logger.info(f"Payload format for {self.topic}: {self.payload_format}")
+                return
 
-            data = json.loads(msg_payload)
-            logger.info(f"Parsed data - Status: {data.get('status')}, Direction: {data.get('direction')}")
+            data = wire_format.decode(message.payload)
+            logger.info(f"Message Received [{message.topic}] ({data['format']}): "
+                        f"Status: {data.get('status')}, Direction: {data.get('direction')}")
 
         except Exception as e:
             logger.error(f"Message Processing Error: {e}")
@@ -256,73 +323,244 @@ class MQTTClient:
         """Bağlantı kesildiğinde çağrılır"""
         self.connected = False
         if rc != 0:
-            logger.warning(f"Unexpected Disconnection (Code: {rc})")
+            logger.warning(f"Unexpected Disconnection (Code: {rc}), reconnecting in background")
 
     def on_publish(self, client, userdata, mid, reason_code=None, properties=None):
-        """Mesaj yayınlandığında çağrılır"""
+        """Mesaj yayınlandığında çağrılır (QoS 1'de PUBACK alınınca)"""
         logger.debug(f"Message Published (ID: {mid})")
-
-    def connect(self) -> bool:
-        """MQTT broker'a bağlan"""
+        entry = self._acks.ack(mid)
+        if entry is None:
+            # Erken onay (kayıt publish() dönünce eklenir) ya da zaman aşımına uğramış mesaj
+            return
+        self._complete(entry, True, "acknowledged")
+        if self._offline:
+            # Pencerede yer açıldı, tamponda bekleyenleri gönder
+            self._flush_offline(blocking=False)
+
+    def connect(self, timeout: float = MQTTConfig.CONNECT_TIMEOUT) -> bool:
+        """MQTT broker'a bağlan ve ilk denemenin sonucunu (en fazla timeout sn) bekle.
+
+        Bağlantı kurulamazsa False döner ama paho ağ döngüsü arka planda
+        RECONNECT_MIN_DELAY'den RECONNECT_DELAY'e kadar artan aralıklarla denemeye
+        devam eder; bu sırada gönderilen komutlar tamponlanır.
+        """
+        self._connect_event.clear()
+        self._connect_error = None
         try:
             client_id = f"Barrier_control_{int(time.time())}"
             self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
 
             self.client.on_connect = self.on_connect
+            self.client.on_connect_fail = self.on_connect_fail
             self.client.on_disconnect = self.on_disconnect
             self.client.on_publish = self.on_publish
             self.client.on_message = self.on_message
+            self.client.max_inflight_messages_set(self.max_inflight)
+            self.client.reconnect_delay_set(MQTTConfig.RECONNECT_MIN_DELAY, MQTTConfig.RECONNECT_DELAY)
 
-            self.client.connect(self.broker, self.port, MQTTConfig.KEEPALIVE)
+            # connect_async: ilk deneme de dahil tüm denemeleri ağ döngüsü yürütür
+            self.client.connect_async(self.broker, self.port, MQTTConfig.KEEPALIVE)
             self.client.loop_start()
 
-            # Bağlantının kurulması için kısa bir bekleme
-            time.sleep(1)
-            return True
-
         except Exception as e:
             logger.error(f"Connection Error: {e}")
             return False
 
-    def SendOrder(self, status: StateBarrier, direction: DirectionBarrier) -> bool:
-        """Bariyer kontrol mesajı gönder"""
-        if not self.connected:
-            logger.error("MQTT connection is not established.")
+        if not self.wait_until_connected(timeout):
+            if self._connect_event.is_set():
+                # Broker yanıt verdi ama bağlantıyı reddetti (ya da TCP bağlantısı kurulamadı)
+                logger.error(f"Connection refused: {self._connect_error}, retrying in background")
+            else:
+                logger.error(f"Connection timeout: no CONNACK within {timeout} s, retrying in background")
             return False
-
+        return True
+
+    def wait_until_connected(self, timeout: Optional[float] = None) -> bool:
+        """Bağlantı denemesi sonuçlanana kadar bekler; bağlantı kurulduysa True döner"""
+        self._connect_event.wait(timeout)
+        return self.connected
+
+    def _complete(self, entry, success: bool, reason: str):
+        """Bekleyen bir mesajı sonuçlandırır ve pencereden çıkarır"""
+        future, callback, status, direction, sent_at = entry
+        self._inflight.release()
+        latency = time.monotonic() - sent_at
+        self.ack_queue.put(("ack" if success else "fail", status, direction, latency, reason))
+        if success:
+            logger.info(f"✓ Transmitted: {status.name} | {direction.name} ({latency * 1000:.0f} ms)")
+        else:
+            logger.error(f"Message failed: {status.name} | {direction.name} ({reason})")
+        if not future.done():
+            future.set_result(success)
+        if callback is not None:
+            try:
+                callback(success, status, direction, latency)
+            except Exception as e:
+                logger.error(f"Publish callback error: {e}")
+
+    def _reject(self, entry, kind: str, reason: str):
+        """Hiç yayınlanmamış (pencere dışı) bir komutu başarısız sonuçlandırır"""
+        future, callback, status, direction, _ = entry
+        self.ack_queue.put((kind, status, direction, 0.0, reason))
+        if kind == "fail":
+            logger.error(f"Message could not be sent: {status.name} | {direction.name} ({reason})")
+        else:
+            logger.debug(f"Message dropped: {status.name} | {direction.name} ({reason})")
+        if not future.done():
+            future.set_result(False)
+        if callback is not None:
+            try:
+                callback(False, status, direction, 0.0)
+            except Exception as e:
+                logger.error(f"Publish callback error: {e}")
+        return future
+
+    def _buffer_offline(self, entry) -> bool:
+        """Komutu çevrimdışı tampona ekler; aynı yöndeki eski komutun yerini alır"""
+        if self.offline_buffer_size <= 0:
+            return False
+        direction = entry[3]
+        with self._pending_lock:
+            dropped = []
+            if direction in self._offline:
+                dropped.append((self._offline.pop(direction), "superseded", "superseded by newer command"))
+            elif len(self._offline) >= self.offline_buffer_size:
+                dropped.append((self._offline.popitem(last=False)[1], "fail", "offline buffer full"))
+            self._offline[direction] = entry
+        for old_entry, kind, reason in dropped:
+            self._reject(old_entry, kind, reason)
+        logger.debug(f"Buffered offline: {entry[2].name} | {direction.name} ({len(self._offline)} waiting)")
+        return True
+
+    def _flush_offline(self, blocking: bool = True):
+        """Bağlantı varken tampondaki komutları pencere el verdikçe sırayla yayınlar.
+
+        paho ağ iş parçacığından (on_connect / on_publish) blocking=False ile çağrılır;
+        kilit başka bir yayında ise o yayını yapan iş parçacığı tamponu boşaltmaya devam eder.
+        """
+        while self.connected and self._offline:
+            if not self._send_lock.acquire(blocking=blocking):
+                return
+            try:
+                while self.connected:
+                    if not self._inflight.acquire(blocking=False):
+                        break
+                    with self._pending_lock:
+                        entry = self._offline.popitem(last=False)[1] if self._offline else None
+                    if entry is None:
+                        self._inflight.release()
+                        break
+                    self._publish(entry)
+            finally:
+                self._send_lock.release()
+            # Kilit bırakılırken gelen onaylar boşaltmayı atlamış olabilir
+            if self.inflight_count() >= self.max_inflight:
+                return
+
+    def _publish(self, entry) -> bool:
+        """Pencereden yer almış bir komutu yayınlar; hata olursa yeri geri bırakır.
+
+        Çağıran _send_lock'u tutar.
+        """
+        future, callback, status, direction, _ = entry
+        # Onay zaman aşımı yayın anından itibaren sayılır
+        entry = (future, callback, status, direction, time.monotonic())
         try:
-            data_package = {
-                "status": status.value,
-                "direction": direction.value,
-                "status_name": status.name,
-                "direction_name": direction.name,
-                "timestamp": int(time.time())
-            }
-
-            json_message = json.dumps(data_package)
-
-            result = self.client.publish(
-                self.topic,
-                json_message,
-                qos=MQTTConfig.QOS,
-                retain=False
-            )
-
-            result.wait_for_publish()
-
-            if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"✓ Transmitted: {status.name} | {direction.name} | {json_message}")
-                return True
-            else:
-                logger.error(f"Message could not be sent. Error code: {result.rc}")
+            message = self._build_payload(status, direction)
+            with self._acks.publishing():
+                result = self.client.publish(
+                    self.topic,
+                    message,
+                    qos=MQTTConfig.QOS,
+                    retain=False
+                )
+                # NO_CONN: paho QoS 1 mesajını saklar ve yeniden bağlanınca gönderir
+                sent = result.rc in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN)
+                early_ack = sent and self._acks.add(result.mid, entry)
+            if not sent:
+                self._inflight.release()
+                self._reject(entry, "fail", f"error code {result.rc}")
                 return False
 
+            logger.debug(f"Queued: {status.name} | {direction.name} | {message!r}")
+            if early_ack:
+                # publish() dönmeden onay geldi
+                self._complete(entry, True, "acknowledged")
+            return True
+
+        except Exception as e:
+            self._inflight.release()
+            self._reject(entry, "fail", f"sending error: {e}")
+            return False
+
+    def buffered_count(self) -> int:
+        """Bağlantı bekleyen (tampondaki) komut sayısı"""
+        with self._pending_lock:
+            return len(self._offline)
+
+    def _expire_pending(self):
+        """ACK_TIMEOUT süresini aşan onaysız mesajları başarısız sayar"""
+        for entry in self._acks.expire(MQTTConfig.ACK_TIMEOUT):
+            self._complete(entry, False, "ack timeout")
+
+    def _build_payload(self, status: StateBarrier, direction: DirectionBarrier):
+        """Konu için geçerli biçimde (JSON / ikili) mesajı hazırlar"""
+        self._seq += 1
+        return wire_format.encode(self.payload_format, status, direction, self.barrier_id, self._seq)
+
+    def inflight_count(self) -> int:
+        """Onay bekleyen mesaj sayısı"""
+        return len(self._acks)
+
+    def SendOrderAsync(self, status: StateBarrier, direction: DirectionBarrier,
+                       callback: Optional[Callable] = None, block_timeout: float = 0) -> Future:
+        """Bariyer kontrol mesajını beklemeden gönderir.
+
+        Hemen bir Future döner; sonuç (True/False) broker onayı gelince ya da hata
+        olunca belirlenir. Sonuçlar ayrıca ack_queue kuyruğuna ve varsa
+        callback(success, status, direction, latency) fonksiyonuna iletilir.
+        Pencere doluysa en fazla block_timeout saniye beklenir. Bağlantı yoksa
+        komut tamponlanır ve yeniden bağlanınca gönderilir; aynı yönde daha yeni
+        bir komut gelirse eskisi "superseded" olarak False ile sonuçlanır.
+        """
+        future: Future = Future()
+        self._expire_pending()
+        entry = (future, callback, status, direction, time.monotonic())
+
+        # Bağlantı yoksa ya da önceden bekleyen komutlar varsa sırayı korumak için tampona
+        if not self.connected or self._offline:
+            if not self._buffer_offline(entry):
+                return self._reject(entry, "fail", "connection is not established")
+            self._flush_offline()
+            return future
+
+        if block_timeout > 0:
+            acquired = self._inflight.acquire(timeout=block_timeout)
+        else:
+            acquired = self._inflight.acquire(blocking=False)
+        if not acquired:
+            return self._reject(entry, "fail", f"in-flight window full ({self.max_inflight})")
+
+        with self._send_lock:
+            self._publish(entry)
+        return future
+
+    def SendOrder(self, status: StateBarrier, direction: DirectionBarrier) -> bool:
+        """Bariyer kontrol mesajı gönder ve broker onayını bekle"""
+        future = self.SendOrderAsync(status, direction, block_timeout=MQTTConfig.ACK_TIMEOUT)
+        try:
+            return future.result(timeout=MQTTConfig.ACK_TIMEOUT)
         except Exception as e:
             logger.error(f"Sending error: {e}")
             return False
 
     def disconnect(self):
         """MQTT bağlantısını kapat"""
+        with self._pending_lock:
+            buffered = list(self._offline.values())
+            self._offline.clear()
+        for entry in buffered:
+            self._reject(entry, "fail", "client disconnected")
         if self.client:
             self.client.loop_stop()
             self.client.disconnect()
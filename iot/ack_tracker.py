@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Zaman aşımına uğramış mid'lerin hatırlandığı en fazla kayıt (mid alanı 1..65535)
+EXPIRED_HISTORY = 1024
+
+
+class AckTracker:
+    """QoS 1 yayınlarının mid -> kayıt eşlemesi (PUBACK bekleyen mesajlar).
+
+    paho PUBACK'i publish() dönmeden işleyebilir; bu "erken" onaylar yalnızca bir
+    yayın sürerken (publishing() bloğu içinde) kaydedilir ve blok bitince
+    eşleşmeyenler silinir. Zaman aşımına uğrayan mid'ler küçük bir listede
+    tutulur; geç gelen PUBACK'leri yok sayılır. Böylece mid'ler 65535'ten başa
+    döndüğünde eski bir onay yeni mesajı yanlışlıkla onaylamaz.
+    Tüm metotlar iş parçacığı güvenlidir; kilit publish() boyunca tutulmaz.
+    """
+
+    def __init__(self, expired_history: int = EXPIRED_HISTORY):
+        self._lock = threading.Lock()
+        self._pending = {}  # mid -> (kayıt zamanı, kayıt)
+        self._early = set()
+        self._expired: "OrderedDict[int, None]" = OrderedDict()
+        self._expired_history = expired_history
+        self._publishing = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    @contextmanager
+    def publishing(self):
+        """publish() çağrısını ve ardından gelen add() çağrısını sarar"""
+        with self._lock:
+            self._publishing += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._publishing -= 1
+                if not self._publishing:
+                    # Hiçbir yayına ait çıkmayan onaylar
+                    self._early.clear()
+
+    def add(self, mid: int, entry) -> bool:
+        """Yayınlanan mesajı kaydeder; onayı publish() dönmeden geldiyse kaydetmeden True döner"""
+        with self._lock:
+            self._expired.pop(mid, None)
+            if mid in self._early:
+                self._early.discard(mid)
+                return True
+            self._pending[mid] = (time.monotonic(), entry)
+            return False
+
+    def ack(self, mid: int):
+        """on_publish içinden çağrılır; bekleyen kaydı döner (yoksa None)"""
+        with self._lock:
+            item = self._pending.pop(mid, None)
+            if item is not None:
+                return item[1]
+            if mid in self._expired:
+                # Zaman aşımından sonra gelen onay
+                del self._expired[mid]
+            elif self._publishing:
+                self._early.add(mid)
+            return None
+
+    def expire(self, timeout: float) -> list:
+        """timeout saniyeden uzun süredir onay bekleyen kayıtları çıkarıp döner"""
+        now = time.monotonic()
+        with self._lock:
+            mids = [mid for mid, (added_at, _) in self._pending.items() if now - added_at > timeout]
+            return [self._forget(mid) for mid in mids]
+
+    def discard(self, mid: int):
+        """Onayı artık beklenmeyen tek bir kaydı çıkarır (yoksa None)"""
+        with self._lock:
+            return self._forget(mid) if mid in self._pending else None
+
+    def _forget(self, mid: int):
+        # Kilit tutulurken çağrılır
+        self._expired[mid] = None
+        while len(self._expired) > self._expired_history:
+            self._expired.popitem(last=False)
+        return self._pending.pop(mid)[1]
+
+    def clear(self) -> list:
+        """Bekleyen tüm kayıtları çıkarıp döner"""
+        with self._lock:
+            entries = [entry for _, entry in self._pending.values()]
+            self._pending.clear()
+            self._early.clear()
+            return entries
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import Optional
+
+import paho.mqtt.client as mqtt
+
+import wire_format
+from ack_tracker import AckTracker
+from Transmission2 import MQTTConfig, StateBarrier, DirectionBarrier
+
+logger = logging.getLogger(__name__)
+
+
+class _AsyncioSocketBridge:
+    """paho soket olaylarını asyncio olay döngüsüne bağlar (arka plan iş parçacığı yok).
+
+    connect() yürütücü iş parçacığında çalıştığından soket açılış / yazma
+    olayları oradan da gelebilir; bunlar döngüye call_soon_threadsafe ile aktarılır.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, client: mqtt.Client):
+        self.loop = loop
+        self.client = client
+        self.misc_task: Optional[asyncio.Task] = None
+        client.on_socket_open = self.on_socket_open
+        client.on_socket_close = self.on_socket_close
+        client.on_socket_register_write = self.on_socket_register_write
+        client.on_socket_unregister_write = self.on_socket_unregister_write
+
+    def _call(self, callback, *args):
+        """callback'i olay döngüsü iş parçacığında çalıştırır"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def on_socket_open(self, client, userdata, sock):
+        # Küçük komut paketleri Nagle algoritmasında bir önceki ACK'yi beklemesin
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._call(self._open, sock)
+
+    def _open(self, sock):
+        self.loop.add_reader(sock, self.client.loop_read)
+        self.misc_task = self.loop.create_task(self._misc_loop())
+
+    def on_socket_close(self, client, userdata, sock):
+        self._call(self._close, sock)
+
+    def _close(self, sock):
+        self.loop.remove_reader(sock)
+        if self.misc_task is not None:
+            self.misc_task.cancel()
+            self.misc_task = None
+
+    def on_socket_register_write(self, client, userdata, sock):
+        self._call(self.loop.add_writer, sock, client.loop_write)
+
+    def on_socket_unregister_write(self, client, userdata, sock):
+        self._call(self.loop.remove_writer, sock)
+
+    async def _misc_loop(self):
+        # Keepalive ve zaman aşımı kontrolleri
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                break
+
+
+class AsyncMQTTClient:
+    """asyncio tabanlı MQTT istemcisi - MQTTClient ile aynı mesaj sözleşmesi.
+
+    Tek bir olay döngüsü, bağlantı başına iş parçacığı açmadan birçok bariyer
+    konusunu ve kamera iş hattını sürebilir. send_order() broker onayını
+    (QoS 1 PUBACK) bekleyen bir coroutine'dir.
+    """
+
+    def __init__(self, broker: str, port: int, topic: str, max_inflight: int = MQTTConfig.MAX_INFLIGHT,
+                 barrier_id: int = 0):
+        self.broker = broker
+        self.port = port
+        self.topic = topic
+        self.max_inflight = max_inflight
+        self.barrier_id = barrier_id
+        # Konu başına mesaj biçimi; cihaz duyurularıyla güncellenir
+        self.topic_formats = dict(MQTTConfig.TOPIC_FORMATS)
+        self._seq = 0
+        self.client: Optional[mqtt.Client] = None
+        self.connected = False
+        self._bridge: Optional[_AsyncioSocketBridge] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connect_future: Optional[asyncio.Future] = None
+        self._window: Optional[asyncio.Semaphore] = None
+        self._acks = AckTracker()  # mid -> onay Future'ı
+
+    def on_connect(self, client, userdata, flags, rc, properties=None):
+        """Bağlantı kurulduğunda çağrılır"""
+        self.connected = rc == 0
+        if self.connected:
+            for topic in {self.topic, *self.topic_formats}:
+                client.subscribe(wire_format.format_topic(topic), qos=MQTTConfig.QOS)
+            logger.info(f"Connected to MQTT Broker: {self.broker}:{self.port}")
+        else:
+            logger.error(f"Connection Warning (code: {rc})")
+        if self._connect_future is not None and not self._connect_future.done():
+            self._connect_future.set_result(self.connected)
+
+    def on_disconnect(self, client, userdata, flags, rc, properties=None):
+        """Bağlantı kesildiğinde çağrılır"""
+        self.connected = False
+        if rc != 0:
+            logger.warning(f"Unexpected Disconnection (Code: {rc})")
+
+    def on_message(self, client, userdata, message):
+        """Cihazların biçim duyurularını işler"""
+        if message.topic.endswith(wire_format.FORMAT_TOPIC_SUFFIX):
+            topic = message.topic[:-len(wire_format.FORMAT_TOPIC_SUFFIX)]
+            self.topic_formats[topic] = wire_format.parse_format_announcement(message.payload)
+            logger.info(f"Payload format for {topic}: {self.topic_formats[topic]}")
+
+    def on_publish(self, client, userdata, mid, reason_code=None, properties=None):
+        """Mesaj yayınlandığında çağrılır (QoS 1'de PUBACK alınınca)"""
+        future = self._acks.ack(mid)
+        if future is not None and not future.done():
+            future.set_result(True)
+
+    async def connect(self, timeout: float = 5.0) -> bool:
+        """MQTT broker'a bağlan ve CONNACK gelene kadar (en fazla timeout sn) bekle.
+
+        DNS çözümleme ve TCP bağlantısı engelleyicidir; olay döngüsü (ve aynı
+        döngüdeki kamera iş hatları) beklemesin diye yürütücüde yapılır.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._window = asyncio.Semaphore(self.max_inflight)
+        self._connect_future = self._loop.create_future()
+        try:
+            client_id = f"Barrier_control_async_{int(time.time() * 1000)}"
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+            self.client.on_connect = self.on_connect
+            self.client.on_disconnect = self.on_disconnect
+            self.client.on_message = self.on_message
+            self.client.on_publish = self.on_publish
+            self.client.max_inflight_messages_set(self.max_inflight)
+            self._bridge = _AsyncioSocketBridge(self._loop, self.client)
+
+            return await asyncio.wait_for(self._connect_and_wait(), timeout)
+
+        except asyncio.TimeoutError:
+            logger.error(f"Connection timeout: no CONNACK within {timeout} s")
+            return False
+        except Exception as e:
+            logger.error(f"Connection Error: {e}")
+            return False
+
+    async def _connect_and_wait(self) -> bool:
+        await self._loop.run_in_executor(None, self.client.connect, self.broker, self.port, MQTTConfig.KEEPALIVE)
+        return await self._connect_future
+
+    def send_order_nowait(self, status: StateBarrier, direction: DirectionBarrier,
+                          topic: Optional[str] = None) -> asyncio.Future:
+        """Mesajı yayınlar, onay gelince True olacak bir Future döner"""
+        return self._send(status, direction, topic)[1]
+
+    def _send(self, status: StateBarrier, direction: DirectionBarrier, topic: Optional[str]):
+        """Mesajı yayınlar; (mid, Future) döner (yayınlanamadıysa mid None)"""
+        future = self._loop.create_future()
+        if not self.connected:
+            logger.error("MQTT connection is not established.")
+            future.set_result(False)
+            return None, future
+
+        topic = topic or self.topic
+        if topic not in self.topic_formats:
+            # İlk kez kullanılan konu: duyuru gelene kadar varsayılan biçim
+            self.topic_formats[topic] = MQTTConfig.PAYLOAD_FORMAT
+            self.client.subscribe(wire_format.format_topic(topic), qos=MQTTConfig.QOS)
+
+        self._seq += 1
+        with self._acks.publishing():
+            result = self.client.publish(
+                topic,
+                wire_format.encode(self.topic_formats[topic], status, direction, self.barrier_id, self._seq),
+                qos=MQTTConfig.QOS,
+                retain=False
+            )
+            if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                logger.error(f"Message could not be sent. Error code: {result.rc}")
+                future.set_result(False)
+                return None, future
+            if self._acks.add(result.mid, future):
+                future.set_result(True)
+        return result.mid, future
+
+    async def send_order(self, status: StateBarrier, direction: DirectionBarrier,
+                         topic: Optional[str] = None, timeout: float = MQTTConfig.ACK_TIMEOUT) -> bool:
+        """Bariyer kontrol mesajı gönder ve broker onayını bekle"""
+        async with self._window:
+            mid, future = self._send(status, direction, topic)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                # Kayıt silinir; geç gelen PUBACK yok sayılır
+                if mid is not None:
+                    self._acks.discard(mid)
+                logger.error(f"Ack timeout: {status.name} | {direction.name}")
+                return False
+
+    async def disconnect(self):
+        """MQTT bağlantısını kapat"""
+        if self.client:
+            self.client.disconnect()
+            # DISCONNECT paketinin yazılması için döngüye bir tur ver
+            await asyncio.sleep(0)
+            for future in self._acks.clear():
+                if not future.done():
+                    future.set_result(False)
+            logger.info("Disconnected from MQTT Broker")
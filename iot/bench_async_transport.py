@@ -0,0 +1,98 @@
+"""MQTTClient (paho arka plan iş parçacığı) ile AsyncMQTTClient (asyncio) gecikme karşılaştırması.
+
+Ölçüm yerel bir broker taklidi (local_broker.LocalBroker) üzerinde yapılır;
+--ack-delay ile uzak broker gidiş-dönüş süresi eklenebilir.
+
+Kullanım:
+    python bench_async_transport.py --messages 500 --ack-delay 0.02
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from local_broker import LocalBroker
+from Transmission2 import MQTTClient, MQTTConfig, StateBarrier, DirectionBarrier
+from async_transport import AsyncMQTTClient
+
+
+def summarize(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{name:<32} p50 {p50:7.2f} ms | p95 {p95:7.2f} ms | {len(latencies) / elapsed:8.0f} msg/s")
+
+
+def bench_threaded(port, messages, concurrent):
+    client = MQTTClient("127.0.0.1", port, MQTTConfig.TOPIC, max_inflight=max(concurrent, 1))
+    client.connect()
+
+    latencies = []
+    start = time.perf_counter()
+    if concurrent <= 1:
+        for _ in range(messages):
+            t0 = time.perf_counter()
+            client.SendOrder(StateBarrier.MOVE, DirectionBarrier.LEFT)
+            latencies.append(time.perf_counter() - t0)
+    else:
+        futures = [client.SendOrderAsync(StateBarrier.MOVE, DirectionBarrier.LEFT, block_timeout=MQTTConfig.ACK_TIMEOUT)
+                   for _ in range(messages)]
+        for future in futures:
+            future.result()
+        while not client.ack_queue.empty():
+            latencies.append(client.ack_queue.get()[3])
+    elapsed = time.perf_counter() - start
+    client.disconnect()
+    return latencies, elapsed
+
+
+async def bench_async(port, messages, concurrent):
+    client = AsyncMQTTClient("127.0.0.1", port, MQTTConfig.TOPIC, max_inflight=max(concurrent, 1))
+    await client.connect()
+
+    latencies = []
+    # Gecikme, iş parçacıklı istemcideki gibi pencereye girildikten sonra ölçülür
+    window = asyncio.Semaphore(max(concurrent, 1))
+
+    async def timed_send():
+        async with window:
+            t0 = time.perf_counter()
+            await client.send_order(StateBarrier.MOVE, DirectionBarrier.LEFT)
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    if concurrent <= 1:
+        for _ in range(messages):
+            await timed_send()
+    else:
+        await asyncio.gather(*(timed_send() for _ in range(messages)))
+    elapsed = time.perf_counter() - start
+    await client.disconnect()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MQTT istemcisi gecikme karşılaştırması")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--ack-delay", type=float, default=0.0, help="Broker onay gecikmesi (saniye)")
+    parser.add_argument("--window", type=int, default=MQTTConfig.MAX_INFLIGHT, help="Eşzamanlı mesaj sayısı")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    broker = LocalBroker(ack_delay=args.ack_delay).start()
+    print(f"Yerel broker: 127.0.0.1:{broker.port}, onay gecikmesi {args.ack_delay * 1000:.0f} ms, "
+          f"{args.messages} mesaj\n")
+
+    try:
+        summarize("MQTTClient (sıralı SendOrder)", *bench_threaded(broker.port, args.messages, 1))
+        summarize("AsyncMQTTClient (sıralı)", *asyncio.run(bench_async(broker.port, args.messages, 1)))
+        summarize(f"MQTTClient (pencere={args.window})", *bench_threaded(broker.port, args.messages, args.window))
+        summarize(f"AsyncMQTTClient (pencere={args.window})",
+                  *asyncio.run(bench_async(broker.port, args.messages, args.window)))
+    finally:
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main()
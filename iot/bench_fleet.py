@@ -0,0 +1,105 @@
+"""FleetPublisher ile bariyer başına ayrı yayın karşılaştırması.
+
+Yerel broker taklidi (local_broker.LocalBroker) üzerinde N bariyer çifti için
+her tick'te rastgele bir kısmın durumu değiştirilir. Aynı senaryo bir kez tekil
+yayınlarla (max_batch=1), bir kez toplu yayınlarla çalıştırılır; bir abone
+gelen kayıtları sayarak teslimatı doğrular.
+
+Kullanım:
+    python bench_fleet.py --barriers 48 --groups 4 --ticks 200 --change 0.25
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+import wire_format
+from fleet_publisher import FleetConfig, FleetPublisher
+from local_broker import LocalBroker
+from Transmission2 import MQTTConfig, StateBarrier, DirectionBarrier
+
+
+class RecordCounter:
+    """Filo konularına abone olup gelen bariyer kayıtlarını sayar"""
+
+    def __init__(self, port):
+        self.records = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.client.on_message = self.on_message
+        self.client.connect("127.0.0.1", port)
+        self.client.subscribe(f"{FleetConfig.TOPIC_PREFIX}/#")
+        self.client.loop_start()
+
+    def on_message(self, client, userdata, message):
+        records = wire_format.decode_batch(message.payload)
+        with self.lock:
+            self.records += len(records)
+            self.messages += 1
+
+    def wait_for(self, expected, timeout=10.0):
+        deadline = time.time() + timeout
+        while self.records < expected and time.time() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+def run(port, args, max_batch, payload_format):
+    counter = RecordCounter(port)
+    time.sleep(0.2)
+
+    publisher = FleetPublisher("127.0.0.1", port, payload_format=payload_format, max_batch=max_batch)
+    for barrier_id in range(args.barriers):
+        publisher.add_barrier(barrier_id, group=f"g{barrier_id % args.groups}")
+    publisher.connect()
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        for barrier_id in rng.sample(range(args.barriers), int(args.barriers * args.change)):
+            direction = rng.choice((DirectionBarrier.LEFT, DirectionBarrier.RIGHT))
+            current = publisher.get_state(barrier_id, direction)
+            publisher.set_state(barrier_id, direction,
+                                StateBarrier.STOP if current == StateBarrier.MOVE else StateBarrier.MOVE)
+        publisher.tick()
+    counter.wait_for(publisher.stats["updates"])
+    elapsed = time.perf_counter() - start
+
+    stats = dict(publisher.stats)
+    publisher.disconnect()
+    counter.close()
+    return stats, counter.records, counter.messages, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filo yayıncısı verim ölçümü")
+    parser.add_argument("--barriers", type=int, default=48)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--change", type=float, default=0.25, help="Her tick'te değişen bariyer oranı")
+    parser.add_argument("--format", choices=wire_format.FORMATS, default=MQTTConfig.PAYLOAD_FORMAT)
+    parser.add_argument("--ack-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    broker = LocalBroker(ack_delay=args.ack_delay).start()
+    print(f"{args.barriers} bariyer, {args.groups} grup, {args.ticks} tick, değişim oranı {args.change}, "
+          f"biçim {args.format}\n")
+    try:
+        for name, max_batch in (("Tekil yayın (max_batch=1)", 1), ("Toplu yayın", FleetConfig.MAX_BATCH)):
+            stats, records, messages, elapsed = run(broker.port, args, max_batch, args.format)
+            print(f"{name:<28} {stats['updates'] / elapsed:8.0f} güncelleme/s | "
+                  f"{stats['publishes']:6d} yayın | teslim {records}/{stats['updates']} | {elapsed:.2f} sn")
+    finally:
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main()
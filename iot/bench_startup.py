@@ -0,0 +1,94 @@
+"""Süreç başlangıcından ilk yayın yapılabilir ana kadar geçen süreyi ölçer.
+
+Her tekrar yeni bir Python süreci başlatır; süreç Transmission2'yi içe aktarır,
+MQTTClient.connect() ile bağlanır ve ilk komutun broker onayını bekler.
+--fixed-sleep ile eski davranış (connect() sonrası sabit 1 sn bekleme) taklit edilir.
+
+Kullanım:
+    python bench_startup.py --runs 5
+    python bench_startup.py --broker broker.hivemq.com --port 1883
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from local_broker import LocalBroker
+
+CHILD_SCRIPT = r'''
+import json, sys, time
+t_start = time.time()
+from Transmission2 import MQTTClient, MQTTConfig, StateBarrier, DirectionBarrier
+t_import = time.time()
+client = MQTTClient(sys.argv[1], int(sys.argv[2]), MQTTConfig.TOPIC)
+ok = client.connect()
+if float(sys.argv[3]):
+    time.sleep(float(sys.argv[3]))
+t_ready = time.time()
+acked = ok and client.SendOrder(StateBarrier.STOP, DirectionBarrier.LEFT)
+t_ack = time.time()
+client.disconnect()
+print(json.dumps({"ok": bool(acked), "start": t_start, "import": t_import, "ready": t_ready, "ack": t_ack}))
+'''
+
+
+def run_once(broker, port, fixed_sleep):
+    """Tek bir süreç başlatır, aşama zamanlarını (sn) döner"""
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, broker, str(port), str(fixed_sleep)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    data = json.loads(output)
+    return {
+        "ok": data["ok"],
+        "interpreter": data["start"] - launched,
+        "import": data["import"] - data["start"],
+        "connect": data["ready"] - data["import"],
+        "ready": data["ready"] - launched,
+        "first_ack": data["ack"] - launched,
+    }
+
+
+def report(name, runs):
+    print(f"\n{name}")
+    for key in ("interpreter", "import", "connect", "ready", "first_ack"):
+        values = [r[key] * 1000 for r in runs]
+        print(f"  {key:<12} median {statistics.median(values):8.1f} ms | max {max(values):8.1f} ms")
+    failed = sum(not r["ok"] for r in runs)
+    if failed:
+        print(f"  {failed}/{len(runs)} çalıştırmada ilk komut onaylanmadı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MQTT istemcisi başlangıç süresi ölçümü")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--broker", default=None, help="Boşsa yerel broker taklidi kullanılır")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--fixed-sleep", type=float, default=1.0,
+                        help="Karşılaştırma için eski sabit bekleme süresi (0: atla)")
+    args = parser.parse_args()
+
+    local = None
+    if args.broker is None:
+        local = LocalBroker().start()
+        broker, port = local.host, local.port
+    else:
+        broker, port = args.broker, args.port
+
+    try:
+        report("Olay tabanlı hazır olma", [run_once(broker, port, 0) for _ in range(args.runs)])
+        if args.fixed_sleep:
+            report(f"Sabit {args.fixed_sleep:g} sn bekleme (eski)",
+                   [run_once(broker, port, args.fixed_sleep) for _ in range(args.runs)])
+    finally:
+        if local is not None:
+            local.stop()
+
+
+if __name__ == "__main__":
+    main()
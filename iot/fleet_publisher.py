@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+import paho.mqtt.client as mqtt
+
+import wire_format
+from ack_tracker import AckTracker
+from Transmission2 import MQTTConfig, StateBarrier, DirectionBarrier
+
+logger = logging.getLogger(__name__)
+
+
+class FleetConfig:
+    """Filo yayıncısı yapılandırma sabitleri"""
+    TOPIC_PREFIX = "barrier"  # Bariyer konusu: barrier/<grup>/<bariyer_id>
+    DEFAULT_GROUP = "default"
+    BATCH_SUFFIX = "batch"  # Grup toplu konusu: barrier/<grup>/batch
+    MAX_BATCH = 64  # Tek mesajdaki en fazla bariyer kaydı
+    TICK_INTERVAL = 0.05  # Arka plan yayın aralığı (saniye)
+
+
+class FleetPublisher:
+    """Çok sayıda bariyer çiftini tek MQTT bağlantısı üzerinden yönetir.
+
+    set_state() yalnızca istenen durumu kaydeder; tick() o ana kadar değişen
+    bariyerleri gruplarına göre toplar. Bir grupta tek değişiklik varsa bariyerin
+    kendi konusuna tekil mesaj, birden fazlaysa grubun toplu konusuna en fazla
+    max_batch kayıtlık mesajlar yayınlanır. Aynı tick içinde (veya bağlantı
+    yokken) aynı bariyere verilen komutlardan yalnızca en yenisi gönderilir.
+    """
+
+    def __init__(self, broker: str, port: int, prefix: str = FleetConfig.TOPIC_PREFIX,
+                 payload_format: str = MQTTConfig.PAYLOAD_FORMAT, max_batch: int = FleetConfig.MAX_BATCH):
+        self.broker = broker
+        self.port = port
+        self.prefix = prefix
+        self.payload_format = payload_format
+        self.max_batch = max(1, max_batch)
+        self.client: Optional[mqtt.Client] = None
+        self.connected = False
+        self._connect_event = threading.Event()
+
+        self.groups: Dict[int, str] = {}  # bariyer_id -> grup
+        self._lock = threading.RLock()
+        self._send_lock = threading.Lock()
+        # (bariyer_id, yön) -> istenen durum / sürüm; sürüm her değişiklikte artar
+        self._desired: Dict[tuple, StateBarrier] = {}
+        self._version: Dict[tuple, int] = {}
+        self._dirty = set()
+        # mid -> [(anahtar, sürüm), ...]
+        self._acks = AckTracker()
+        self._seq = 0
+
+        self.stats = {"updates": 0, "publishes": 0, "acked_updates": 0, "failed_updates": 0}
+        self._ticker: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # --- BARİYER / KONU EŞLEMESİ ---
+    def add_barrier(self, barrier_id: int, group: str = FleetConfig.DEFAULT_GROUP):
+        """Bariyer çiftini bir gruba kaydeder"""
+        if not 0 <= barrier_id <= 0xFFFF:
+            raise ValueError(f"barrier_id must fit in 16 bits: {barrier_id}")
+        self.groups[barrier_id] = group
+
+    def topic_for(self, barrier_id: int) -> str:
+        return f"{self.prefix}/{self.groups[barrier_id]}/{barrier_id}"
+
+    def batch_topic(self, group: str) -> str:
+        return f"{self.prefix}/{group}/{FleetConfig.BATCH_SUFFIX}"
+
+    # --- DURUM ---
+    def set_state(self, barrier_id: int, direction: DirectionBarrier, status: StateBarrier) -> bool:
+        """İstenen bariyer durumunu kaydeder; değişiklik yoksa False döner"""
+        if barrier_id not in self.groups:
+            raise KeyError(f"Unknown barrier id: {barrier_id}")
+        key = (barrier_id, direction)
+        with self._lock:
+            if self._desired.get(key) == status:
+                return False
+            self._desired[key] = status
+            self._version[key] = self._version.get(key, 0) + 1
+            self._dirty.add(key)
+            self.stats["updates"] += 1
+        return True
+
+    def get_state(self, barrier_id: int, direction: DirectionBarrier) -> Optional[StateBarrier]:
+        return self._desired.get((barrier_id, direction))
+
+    def pending_count(self) -> int:
+        """Henüz yayınlanmamış bariyer değişikliği sayısı"""
+        with self._lock:
+            return len(self._dirty)
+
+    def tick(self) -> int:
+        """Bekleyen değişiklikleri toplu olarak yayınlar; yapılan yayın sayısını döner"""
+        if not self.connected:
+            return 0
+        self._expire_inflight()
+
+        # _lock on_publish içinden de alınır (paho iç kilidi tutulurken); bu yüzden
+        # publish() çağrıları sırasında tutulmaz. Tick'ler _send_lock ile sıralanır.
+        with self._send_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                by_group = defaultdict(list)
+                for key in sorted(self._dirty):
+                    by_group[self.groups[key[0]]].append((key, self._desired[key], self._version[key]))
+                self._dirty.clear()
+
+            publishes = 0
+            for group, changes in by_group.items():
+                for i in range(0, len(changes), self.max_batch):
+                    publishes += self._publish_chunk(group, changes[i:i + self.max_batch])
+            return publishes
+
+    def _publish_chunk(self, group: str, changes: list) -> int:
+        """Aynı gruptaki değişiklikleri tek mesajda yayınlar; changes: [(anahtar, durum, sürüm)]"""
+        self._seq += 1
+        if len(changes) == 1:
+            (barrier_id, direction), status, _ = changes[0]
+            topic = self.topic_for(barrier_id)
+            payload = wire_format.encode(self.payload_format, status, direction, barrier_id, self._seq)
+        else:
+            topic = self.batch_topic(group)
+            payload = wire_format.encode_batch(
+                self.payload_format,
+                [(barrier_id, status, direction, self._seq) for (barrier_id, direction), status, _ in changes]
+            )
+
+        sent = [(key, version) for key, _, version in changes]
+        with self._acks.publishing():
+            result = self.client.publish(topic, payload, qos=MQTTConfig.QOS, retain=False)
+            # NO_CONN: paho QoS 1 mesajını saklar ve yeniden bağlanınca gönderir
+            published = result.rc in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN)
+            early_ack = published and self._acks.add(result.mid, sent)
+        with self._lock:
+            if not published:
+                logger.error(f"Fleet publish failed on {topic} (code: {result.rc})")
+                self._requeue(sent)
+                return 0
+
+            self.stats["publishes"] += 1
+            if early_ack:
+                self.stats["acked_updates"] += len(sent)
+        return 1
+
+    def _requeue(self, sent: list):
+        """Daha yeni bir durum verilmemişse değişiklikleri yeniden sıraya alır (kilit tutulurken)"""
+        for key, version in sent:
+            if self._version[key] == version:
+                self._dirty.add(key)
+
+    def _expire_inflight(self):
+        """Onayı gelmeyen yayınlardaki değişiklikleri (daha yenisi yoksa) yeniden sıraya alır"""
+        expired = self._acks.expire(MQTTConfig.ACK_TIMEOUT)
+        with self._lock:
+            for sent in expired:
+                self.stats["failed_updates"] += len(sent)
+                self._requeue(sent)
+
+    # --- MQTT GERİ ÇAĞRILARI ---
+    def on_connect(self, client, userdata, flags, rc, properties=None):
+        """Bağlantı kurulduğunda çağrılır"""
+        self.connected = rc == 0
+        if self.connected:
+            logger.info(f"Fleet publisher connected to {self.broker}:{self.port} ({len(self.groups)} barriers)")
+        else:
+            logger.error(f"Connection Warning (code: {rc})")
+        self._connect_event.set()
+
+    def on_connect_fail(self, client, userdata):
+        logger.warning(f"Connection attempt to {self.broker}:{self.port} failed, retrying")
+        self._connect_event.set()
+
+    def on_disconnect(self, client, userdata, flags, rc, properties=None):
+        """Bağlantı kesildiğinde çağrılır"""
+        self.connected = False
+        if rc != 0:
+            logger.warning(f"Unexpected Disconnection (Code: {rc}), reconnecting in background")
+
+    def on_publish(self, client, userdata, mid, reason_code=None, properties=None):
+        """Toplu mesaj onaylandığında çağrılır"""
+        sent = self._acks.ack(mid)
+        if sent is None:
+            return
+        with self._lock:
+            self.stats["acked_updates"] += len(sent)
+
+    # --- BAĞLANTI ---
+    def connect(self, timeout: float = MQTTConfig.CONNECT_TIMEOUT) -> bool:
+        """Broker'a bağlan; başarısızsa arka planda yeniden denemeye devam eder"""
+        self._connect_event.clear()
+        try:
+            client_id = f"Barrier_fleet_{int(time.time() * 1000)}"
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+            self.client.on_connect = self.on_connect
+            self.client.on_connect_fail = self.on_connect_fail
+            self.client.on_disconnect = self.on_disconnect
+            self.client.on_publish = self.on_publish
+            self.client.max_inflight_messages_set(MQTTConfig.MAX_INFLIGHT)
+            self.client.reconnect_delay_set(MQTTConfig.RECONNECT_MIN_DELAY, MQTTConfig.RECONNECT_DELAY)
+            self.client.connect_async(self.broker, self.port, MQTTConfig.KEEPALIVE)
+            self.client.loop_start()
+        except Exception as e:
+            logger.error(f"Connection Error: {e}")
+            return False
+
+        self._connect_event.wait(timeout)
+        return self.connected
+
+    def start(self, interval: float = FleetConfig.TICK_INTERVAL):
+        """tick() fonksiyonunu arka planda periyodik çalıştırır"""
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.tick()
+                except Exception as e:
+                    logger.error(f"Fleet tick error: {e}")
+
+        self._ticker = threading.Thread(target=run, name="fleet-ticker", daemon=True)
+        self._ticker.start()
+        return self
+
+    def stop(self):
+        """Arka plan yayınını durdurur ve bekleyenleri son kez gönderir"""
+        self._stop_event.set()
+        if self._ticker is not None:
+            self._ticker.join(timeout=5)
+            self._ticker = None
+        self.tick()
+
+    def disconnect(self):
+        """MQTT bağlantısını kapat"""
+        self.stop()
+        if self.client:
+            self.client.disconnect()
+            self.client.loop_stop()
+            logger.info("Fleet publisher disconnected")
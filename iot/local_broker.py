@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import struct
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """Test ve ölçümler için asgari MQTT 3.1.1 broker'ı (asyncio).
+
+    CONNECT, PUBLISH (QoS 0/1), SUBSCRIBE, PINGREQ ve DISCONNECT paketlerini
+    destekler. ack_delay ile uzak bir broker'ın gidiş-dönüş süresi taklit edilir.
+    Oturum saklama, retain ve QoS 2 yoktur.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, ack_delay: float = 0.0):
+        self.host = host
+        self.port = port
+        self.ack_delay = ack_delay
+        self.subscriptions = {}  # writer -> [topic_filter, ...]
+        self.received = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @staticmethod
+    def _encode_length(length: int) -> bytes:
+        out = bytearray()
+        while True:
+            byte = length % 128
+            length //= 128
+            if length:
+                byte |= 0x80
+            out.append(byte)
+            if not length:
+                return bytes(out)
+
+    @staticmethod
+    def _matches(topic_filter: str, topic: str) -> bool:
+        filter_parts = topic_filter.split("/")
+        topic_parts = topic.split("/")
+        for i, part in enumerate(filter_parts):
+            if part == "#":
+                return True
+            if i >= len(topic_parts) or (part != "+" and part != topic_parts[i]):
+                return False
+        return len(filter_parts) == len(topic_parts)
+
+    async def _read_packet(self, reader):
+        header = await reader.readexactly(1)
+        multiplier, length = 1, 0
+        while True:
+            byte = (await reader.readexactly(1))[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        body = await reader.readexactly(length) if length else b""
+        return header[0], body
+
+    async def _send_ack(self, writer, packet_id: int):
+        if self.ack_delay:
+            await asyncio.sleep(self.ack_delay)
+        if not writer.is_closing():
+            writer.write(b"\x40\x02" + struct.pack("!H", packet_id))
+
+    async def _handle(self, reader, writer):
+        self.subscriptions[writer] = []
+        try:
+            while True:
+                first, body = await self._read_packet(reader)
+                packet_type = first >> 4
+
+                if packet_type == 1:  # CONNECT
+                    writer.write(b"\x20\x02\x00\x00")
+                elif packet_type == 3:  # PUBLISH
+                    qos = (first >> 1) & 0x03
+                    topic_len = struct.unpack("!H", body[:2])[0]
+                    topic = body[2:2 + topic_len].decode("utf-8")
+                    offset = 2 + topic_len
+                    if qos:
+                        packet_id = struct.unpack("!H", body[offset:offset + 2])[0]
+                        offset += 2
+                        asyncio.ensure_future(self._send_ack(writer, packet_id))
+                    self.received += 1
+                    self._forward(topic, body[offset:])
+                elif packet_type == 8:  # SUBSCRIBE
+                    packet_id = body[:2]
+                    offset, granted = 2, bytearray()
+                    while offset < len(body):
+                        filter_len = struct.unpack("!H", body[offset:offset + 2])[0]
+                        topic_filter = body[offset + 2:offset + 2 + filter_len].decode("utf-8")
+                        self.subscriptions[writer].append(topic_filter)
+                        offset += 3 + filter_len
+                        granted.append(0)
+                    writer.write(b"\x90" + self._encode_length(2 + len(granted)) + packet_id + bytes(granted))
+                elif packet_type == 12:  # PINGREQ
+                    writer.write(b"\xd0\x00")
+                elif packet_type == 14:  # DISCONNECT
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.subscriptions.pop(writer, None)
+            writer.close()
+
+    def _forward(self, topic: str, payload: bytes):
+        """Mesajı eşleşen abonelere QoS 0 ile iletir"""
+        encoded_topic = topic.encode("utf-8")
+        body = struct.pack("!H", len(encoded_topic)) + encoded_topic + payload
+        packet = b"\x30" + self._encode_length(len(body)) + body
+        for writer, filters in self.subscriptions.items():
+            if any(self._matches(f, topic) for f in filters) and not writer.is_closing():
+                writer.write(packet)
+
+    async def start_async(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop_async(self):
+        if self._server is not None:
+            self._server.close()
+            # Açık istemci bağlantılarını da kapat (kesinti taklidi)
+            for writer in list(self.subscriptions):
+                writer.close()
+            await self._server.wait_closed()
+            await asyncio.sleep(0)
+
+    def start(self):
+        """Broker'ı ayrı bir iş parçacığındaki olay döngüsünde başlatır"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start_async())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="local-broker", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop_async(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    broker = LocalBroker(port=1883).start()
+    logger.info(f"Local broker listening on {broker.host}:{broker.port} (Ctrl+C to exit)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        broker.stop()
@@ -0,0 +1,125 @@
+import json
+import struct
+import time
+
+# --- İKİLİ MESAJ BİÇİMİ ---
+# ESP32 tarafındaki karşılığı (little-endian, paketlenmiş):
+#
+#   struct __attribute__((packed)) BarrierCommand {
+#       uint8_t  version;       // WIRE_VERSION
+#       uint16_t barrier_id;
+#       uint8_t  state;         // StateBarrier (0=STOP, 1=MOVE)
+#       uint8_t  direction;     // DirectionBarrier (0=LEFT, 1=RIGHT)
+#       uint32_t seq;           // gönderen başına artan sıra numarası
+#       uint64_t timestamp_ms;  // Unix zamanı (ms)
+#   };                          // toplam 17 bayt
+WIRE_VERSION = 1
+BINARY_STRUCT = struct.Struct("<BHBBIQ")
+BINARY_SIZE = BINARY_STRUCT.size
+
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+FORMATS = (FORMAT_JSON, FORMAT_BINARY)
+
+# Cihazın desteklediği biçimi duyurduğu alt konu (retain ile yayınlanır)
+FORMAT_TOPIC_SUFFIX = "/format"
+
+
+def format_topic(topic: str) -> str:
+    """Bir komut konusunun biçim duyuru konusunu döner"""
+    return topic + FORMAT_TOPIC_SUFFIX
+
+
+def encode_json(status, direction) -> str:
+    """Mevcut JSON mesajı (geriye dönük uyumluluk)"""
+    return json.dumps({
+        "status": status.value,
+        "direction": direction.value,
+        "status_name": status.name,
+        "direction_name": direction.name,
+        "timestamp": int(time.time())
+    })
+
+
+def encode_binary(status, direction, barrier_id: int = 0, seq: int = 0, timestamp_ms: int = None) -> bytes:
+    """17 baytlık sabit boyutlu ikili komut"""
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    return BINARY_STRUCT.pack(WIRE_VERSION, barrier_id, status.value, direction.value,
+                              seq & 0xFFFFFFFF, timestamp_ms)
+
+
+def encode(payload_format: str, status, direction, barrier_id: int = 0, seq: int = 0):
+    """Seçilen biçime göre mesajı kodlar"""
+    if payload_format == FORMAT_BINARY:
+        return encode_binary(status, direction, barrier_id, seq)
+    return encode_json(status, direction)
+
+
+def decode(payload: bytes) -> dict:
+    """JSON veya ikili mesajı çözer; biçim ilk bayttan anlaşılır"""
+    if payload[:1] == b"{":
+        data = json.loads(payload.decode("utf-8"))
+        data["format"] = FORMAT_JSON
+        return data
+
+    if len(payload) != BINARY_SIZE:
+        raise ValueError(f"Invalid binary payload size: {len(payload)} (expected {BINARY_SIZE})")
+    version, barrier_id, state, direction, seq, timestamp_ms = BINARY_STRUCT.unpack(payload)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire version: {version}")
+    return {
+        "format": FORMAT_BINARY,
+        "version": version,
+        "barrier_id": barrier_id,
+        "status": state,
+        "direction": direction,
+        "seq": seq,
+        "timestamp_ms": timestamp_ms,
+        "timestamp": timestamp_ms // 1000,
+    }
+
+
+def encode_batch(payload_format: str, records, timestamp_ms: int = None):
+    """Birden çok bariyer komutunu tek mesajda kodlar.
+
+    records: (barrier_id, status, direction, seq) demetleri. İkili biçimde kayıtlar
+    art arda eklenir (N x 17 bayt); JSON biçiminde {"barriers": [...]} listesi.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    if payload_format == FORMAT_BINARY:
+        return b"".join(
+            BINARY_STRUCT.pack(WIRE_VERSION, barrier_id, status.value, direction.value, seq & 0xFFFFFFFF, timestamp_ms)
+            for barrier_id, status, direction, seq in records
+        )
+    return json.dumps({
+        "barriers": [
+            {"barrier_id": barrier_id, "status": status.value, "direction": direction.value, "seq": seq}
+            for barrier_id, status, direction, seq in records
+        ],
+        "timestamp": timestamp_ms // 1000
+    })
+
+
+def decode_batch(payload: bytes) -> list:
+    """Toplu ya da tekil mesajı komut sözlükleri listesine çözer"""
+    if payload[:1] == b"{":
+        data = json.loads(payload.decode("utf-8"))
+        if "barriers" not in data:
+            data["format"] = FORMAT_JSON
+            return [data]
+        for record in data["barriers"]:
+            record["format"] = FORMAT_JSON
+            record["timestamp"] = data.get("timestamp")
+        return data["barriers"]
+
+    if not payload or len(payload) % BINARY_SIZE:
+        raise ValueError(f"Invalid binary batch size: {len(payload)} (not a multiple of {BINARY_SIZE})")
+    return [decode(payload[i:i + BINARY_SIZE]) for i in range(0, len(payload), BINARY_SIZE)]
+
+
+def parse_format_announcement(payload: bytes) -> str:
+    """Biçim duyurusunu çözer ("json" / "binary"); bilinmeyen değerde JSON'a düşer"""
+    value = payload.decode("utf-8", errors="ignore").strip().lower()
+    return value if value in FORMATS else FORMAT_JSON
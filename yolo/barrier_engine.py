@@ -0,0 +1,111 @@
+from collections import deque
+
+
+class BarrierState:
+    """Tek bir bariyerin karar durumu"""
+
+    __slots__ = ("key", "lane", "smoothed", "speed_samples", "speed_total", "speed",
+                 "is_open", "changed_at", "sent_open", "sent_at")
+
+    def __init__(self, key, lane, speed_window):
+        self.key = key
+        self.lane = lane
+        self.smoothed = 0.0  # Şeridin yumuşatılmış araç sayısı (LaneStats'tan)
+        self.speed_samples = deque(maxlen=speed_window)
+        self.speed_total = 0.0
+        self.speed = None  # Ortalama şerit hızı (km/sa, hız verisi yoksa None)
+        self.is_open = None  # Karar verilen durum (None: henüz karar yok)
+        self.changed_at = 0.0
+        self.sent_open = None  # Son gönderilen durum
+        self.sent_at = float("-inf")
+
+    def add_speed(self, speed):
+        """Bilinen (NaN olmayan) hız örneklerinin kayan ortalaması"""
+        if speed != speed:
+            return
+        if len(self.speed_samples) == self.speed_samples.maxlen:
+            self.speed_total -= self.speed_samples[0]
+        self.speed_samples.append(speed)
+        self.speed_total += speed
+        self.speed = self.speed_total / len(self.speed_samples)
+
+
+class BarrierDecisionEngine:
+    """Şerit yoğunluğuna göre bariyer aç/kapa kararlarını verir.
+
+    Her bariyer bir şeridi izler ve kendi durumunu tutar:
+      - Yumuşatma: araç sayısı ortalaması dışarıdan verilir (LaneStats penceresi),
+        hız örnekleri son `speed_window` örnek üzerinden ortalanır.
+      - Histerezis: ortalama open_threshold'u aşınca açılır, close_threshold'un
+        altına inince kapanır; aradaki bölgede durum korunur.
+      - Bekleme: bir durum en az min_dwell saniye korunur.
+      - Şerit hızı (isteğe bağlı): slow_speed verilirse bariyer ancak ortalama hız
+        bu değerin altındayken açılır, hız release_speed'i aşınca kapanır. Hız
+        verisi olmayan bariyerlerde yalnızca araç sayısı kullanılır.
+      - Hız sınırı: her bariyer için iki komut arasında en az min_interval saniye
+        geçer; sınır yüzünden bekleyen komut süre dolunca gönderilir.
+    """
+
+    def __init__(self, open_threshold=8, close_threshold=5, min_dwell=5.0, speed_window=15, min_interval=2.0,
+                 slow_speed=None, release_speed=None):
+        if close_threshold > open_threshold:
+            raise ValueError("close_threshold must not exceed open_threshold")
+        if slow_speed is not None and release_speed is not None and release_speed < slow_speed:
+            raise ValueError("release_speed must not be below slow_speed")
+        self.open_threshold = open_threshold
+        self.close_threshold = close_threshold
+        self.min_dwell = min_dwell
+        self.speed_window = speed_window
+        self.min_interval = min_interval
+        self.slow_speed = slow_speed
+        self.release_speed = release_speed
+        self.barriers = {}
+
+    def add_barrier(self, key, lane):
+        """key: bariyer kimliği (ör. DirectionBarrier.RIGHT), lane: izlenen şerit indeksi"""
+        self.barriers[key] = BarrierState(key, lane, self.speed_window)
+        return self.barriers[key]
+
+    def _congested(self, barrier):
+        if barrier.smoothed <= self.open_threshold:
+            return False
+        return self.slow_speed is None or barrier.speed is None or barrier.speed < self.slow_speed
+
+    def _released(self, barrier):
+        if barrier.smoothed < self.close_threshold:
+            return True
+        return self.release_speed is not None and barrier.speed is not None and barrier.speed > self.release_speed
+
+    def _decide(self, barrier, now):
+        if barrier.is_open is None:
+            barrier.is_open = self._congested(barrier)
+            barrier.changed_at = now
+            return
+        if now - barrier.changed_at < self.min_dwell:
+            return
+        if not barrier.is_open and self._congested(barrier):
+            barrier.is_open = True
+            barrier.changed_at = now
+        elif barrier.is_open and self._released(barrier):
+            barrier.is_open = False
+            barrier.changed_at = now
+
+    def update(self, levels, now, speeds=None):
+        """levels: şerit başına yumuşatılmış araç sayısı (ör. LaneStats.mean("barrier")).
+
+        Şerit hızları da verilebilir; gönderilmesi gereken (key, is_open, ortalama) listesini döner.
+        """
+        commands = []
+        for barrier in self.barriers.values():
+            barrier.smoothed = float(levels[barrier.lane])
+            if speeds is not None:
+                barrier.add_speed(float(speeds[barrier.lane]))
+            self._decide(barrier, now)
+            if barrier.is_open != barrier.sent_open and now - barrier.sent_at >= self.min_interval:
+                barrier.sent_open = barrier.is_open
+                barrier.sent_at = now
+                commands.append((barrier.key, barrier.is_open, barrier.smoothed))
+        return commands
+
+    def state(self, key):
+        return self.barriers[key].is_open
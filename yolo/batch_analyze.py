@@ -0,0 +1,218 @@
+"""Bir klasördeki kayıtları görüntü çizmeden, süreç havuzu ile toplu analiz eder.
+
+Her video için kare başına şerit sayımları ve takip ID'leri sütun tabanlı,
+sıkıştırılmış bir .npz dosyasına yazılır:
+    frame        (F,)    kare numarası
+    lane_counts  (F, L)  şerit başına araç sayısı
+    det_frame    (D,)    her tespitin ait olduğu kare
+    det_id       (D,)    ByteTrack takip ID'si
+    det_lane     (D,)    tespitin şerit indeksi (-1: hiçbiri)
+    lane_names   (L,)    şerit isimleri
+
+Alt klasörler de taranır; sonuç dosyası videonun klasöre göre yolunu korur
+(kayitlar/kamera1/08-00.mp4 -> analiz/kamera1/08-00.mp4.npz), böylece farklı
+kameralardaki aynı adlı kayıtlar birbirinin üzerine yazılmaz.
+
+--lanes ile şerit poligonları bir JSON dosyasından verilir (varsayılan: sol/sağ):
+    {"SOL": [[0, 0], [960, 0], [960, 1080], [0, 1080]], "SAG": [[960, 0], ...]}
+veya isimsiz poligon listesi: [[[x, y], ...], ...]
+
+Model canlı iş hattıyla aynı yoldan yüklenir (model_runtime.load_model: çalışma
+ortamı, INT8, iş parçacığı sınırı) ve kareler aynı ROI letterbox'ından geçer;
+toplu sonuçlar canlı sayımlarla karşılaştırılabilir. Önbellekler (dışa aktarım,
+birleştirilmiş model) ana süreçte bir kez hazırlanır, her işçi modeli bir kez
+yükler ve her videoda takipçiyi sıfırlar.
+
+Kullanım:
+    python batch_analyze.py kayitlar/ --output analiz/ --workers 4
+    python batch_analyze.py kayitlar/ --lanes seritler.json --roi 0,300,1920,1080
+    python batch_analyze.py kayitlar/ --runtime onnx --int8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from lane_counter import LaneCounter
+from model_runtime import RUNTIMES, load_model, prepare_model, reset_tracker
+from roi import RoiLetterbox
+from track_predictor import ConstantVelocityPredictor
+
+# --- AYARLAR ---
+MODEL_PATH = 'yolov8n.pt'
+IMGSZ = 640
+CONFIDENCE = 0.25
+TARGET_CLASSES = [2, 3, 5, 7]
+TRACKER_CONFIG = "bytetrack.yaml"
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".ts")
+
+_model = None
+
+
+def _init_worker(model_path, runtime, int8, threads, warm_cache):
+    """Her işçi süreçte modeli bir kez, iş parçacığı sınırıyla yükler"""
+    global _model
+    cv2.setNumThreads(1)
+    _model = load_model(model_path, runtime, int8=int8, threads=threads, imgsz=IMGSZ, warm_cache=warm_cache,
+                        tracker=TRACKER_CONFIG)
+
+
+def parse_roi(text):
+    """'x1,y1,x2,y2' dikdörtgeni veya 'x1,y1,x2,y2,x3,y3,...' poligonu"""
+    values = [float(value) for value in text.split(",")]
+    if len(values) == 4:
+        return tuple(values)
+    if len(values) < 6 or len(values) % 2:
+        raise ValueError(f"Geçersiz ROI: {text} (beklenen: x1,y1,x2,y2 veya en az 3 nokta)")
+    return list(zip(values[::2], values[1::2]))
+
+
+def load_lanes(path):
+    """--lanes JSON dosyasından (poligonlar, isimler) okur"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return list(data.values()), list(data.keys())
+    return data, None
+
+
+def analyze_video(path, output_path, skip=1, lanes=None, lane_names=None, roi=None):
+    """Tek bir videoyu analiz edip sonuçları output_path'e .npz olarak yazar"""
+    # Her video kendi ByteTrack durumuyla başlasın
+    reset_tracker(_model)
+    cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+    predictor = ConstantVelocityPredictor() if skip > 1 else None
+
+    lane_counter = None
+    letterbox = None
+    boxes = np.empty((0, 4), dtype=np.float32)
+    ids = np.empty(0, dtype=np.int32)
+    frame_counts = []
+    det_frame, det_id, det_lane = [], [], []
+
+    start_time = time.time()
+    index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if lane_counter is None:
+            height, width = frame.shape[:2]
+            lane_counter = (LaneCounter(lanes, lane_names, (0, 0, width, height)) if lanes
+                            else LaneCounter.left_right(width, height))
+            letterbox = RoiLetterbox(frame.shape, roi, imgsz=IMGSZ)
+
+        if index % skip == 0:
+            results = _model.track(letterbox.prepare(frame), persist=True, tracker=TRACKER_CONFIG, verbose=False,
+                                   classes=TARGET_CLASSES, conf=CONFIDENCE, imgsz=letterbox.input_size)
+            if results[0].boxes.id is not None:
+                boxes = letterbox.to_frame(results[0].boxes.xyxy.cpu().numpy())
+                ids = results[0].boxes.id.int().cpu().numpy()
+            else:
+                boxes = np.empty((0, 4), dtype=np.float32)
+                ids = np.empty(0, dtype=np.int32)
+            if predictor is not None:
+                predictor.update(boxes, ids, index)
+            current_boxes, current_ids = boxes, ids
+        else:
+            current_boxes, current_ids = predictor.predict(index)
+
+        counts, masks = lane_counter.count(current_boxes)
+        frame_counts.append(counts)
+        det_frame.append(np.full(len(current_ids), index, dtype=np.int32))
+        det_id.append(current_ids.astype(np.int32))
+        det_lane.append(lane_counter.lane_index(masks).astype(np.int8))
+        index += 1
+
+    cap.release()
+    elapsed = time.time() - start_time
+
+    num_lanes = lane_counter.num_lanes if lane_counter is not None else 0
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    np.savez_compressed(
+        output_path,
+        frame=np.arange(index, dtype=np.int32),
+        lane_counts=np.asarray(frame_counts, dtype=np.int16).reshape(index, num_lanes),
+        det_frame=np.concatenate(det_frame) if det_frame else np.empty(0, dtype=np.int32),
+        det_id=np.concatenate(det_id) if det_id else np.empty(0, dtype=np.int32),
+        det_lane=np.concatenate(det_lane) if det_lane else np.empty(0, dtype=np.int8),
+        lane_names=np.asarray(lane_counter.names if lane_counter is not None else [], dtype=str),
+    )
+    return path, output_path, index, elapsed
+
+
+def find_videos(directory):
+    """Klasör ve alt klasörlerindeki videolar (sıralı)"""
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+
+def output_path_for(path, directory, output_dir):
+    """Videonun klasöre göre yolunu koruyan sonuç dosyası yolu (uzantı dahil, çakışma olmaz)"""
+    return os.path.join(output_dir, os.path.relpath(path, directory) + ".npz")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıt klasörünü görüntüsüz toplu analiz et")
+    parser.add_argument("directory", help="Video kayıtlarının bulunduğu klasör")
+    parser.add_argument("--output", default="analiz_sonuclari", help="Sonuç .npz dosyalarının klasörü")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--skip", type=int, default=1, help="Tespit adımı; ara kareler tahmin edilir")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--runtime", choices=RUNTIMES, default="torch")
+    parser.add_argument("--int8", action="store_true", help="INT8 nicemlenmiş model (onnx / openvino)")
+    parser.add_argument("--no-warm-cache", dest="warm_cache", action="store_false",
+                        help="PyTorch: birleştirilmiş model önbelleğini kullanma")
+    parser.add_argument("--lanes", default=None, help="Şerit poligonları JSON dosyası (varsayılan: sol/sağ)")
+    parser.add_argument("--roi", type=parse_roi, default=None,
+                        help="İlgi alanı: x1,y1,x2,y2 veya x1,y1,x2,y2,x3,y3,... poligonu (varsayılan: tüm kare)")
+    args = parser.parse_args()
+
+    lanes, lane_names = load_lanes(args.lanes) if args.lanes else (None, None)
+
+    videos = find_videos(args.directory)
+    if not videos:
+        print(f"Video bulunamadı: {args.directory}")
+        return
+
+    os.makedirs(args.output, exist_ok=True)
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    print(f"{len(videos)} video, {args.workers} işçi, işçi başına {threads} iş parçacığı, {args.runtime}"
+          f"{' int8' if args.int8 else ''}")
+    # Dışa aktarım / birleştirilmiş model işçiler başlamadan bir kez hazırlanır
+    prepare_model(args.model, args.runtime, args.int8, IMGSZ, args.warm_cache)
+
+    start_time = time.time()
+    total_frames = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.model, args.runtime, args.int8, threads, args.warm_cache)) as pool:
+        futures = {
+            pool.submit(analyze_video, path, output_path_for(path, args.directory, args.output), args.skip,
+                        lanes, lane_names, args.roi): path
+            for path in videos
+        }
+        for future in as_completed(futures):
+            try:
+                path, output_path, frames, elapsed = future.result()
+            except Exception as e:
+                print(f"HATA: {futures[future]} analiz edilemedi: {e}")
+                continue
+            total_frames += frames
+            fps = frames / elapsed if elapsed > 0 else 0
+            print(f"✓ {os.path.relpath(path, args.directory)}: {frames} kare, {fps:.1f} FPS -> {output_path}")
+
+    elapsed = time.time() - start_time
+    print(f"Toplam {total_frames} kare, {elapsed:.1f} sn ({total_frames / elapsed if elapsed else 0:.1f} kare/sn)")
+
+
+if __name__ == "__main__":
+    main()
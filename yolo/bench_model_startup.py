@@ -0,0 +1,95 @@
+"""Model süreç başlangıcından ilk çıkarıma kadar geçen süreyi ölçer (kamera işçisi yeniden başlatma).
+
+Her tekrar yeni bir Python süreci başlatır. İki yol karşılaştırılır:
+  - eski : YOLO('yolov8n.pt') kurulur, ilk kare çıkarımı fuse + arka uç kurulumunu da öder
+  - yeni : model_runtime.load_model (birleştirilmiş önbellek + ısınma), ardından ilk kare
+Aşamalar: interpreter (süreç açılışı), import (numpy ve proje modülleri),
+ultralytics (ultralytics / torch içe aktarması), model, warmup, first_frame.
+
+Kullanım:
+    python bench_model_startup.py --runs 5
+    python bench_model_startup.py --runtime onnx --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD_SCRIPT = r'''
+import json, sys, time
+t_start = time.time()
+import numpy as np
+runtime, imgsz, legacy = sys.argv[1], int(sys.argv[2]), sys.argv[3] == "1"
+frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+if legacy:
+    t_import = time.time()
+    from ultralytics import YOLO
+    t_ultralytics = time.time()
+    model = YOLO("yolov8n.pt")
+    t_model = t_warmup = time.time()
+else:
+    from metrics import StartupTimer
+    from model_runtime import load_model
+    t_import = time.time()
+    timer = StartupTimer()
+    model = load_model("yolov8n.pt", runtime, imgsz=imgsz, tracker="bytetrack.yaml", timer=timer)
+    phases = dict(timer.phases)
+    t_ultralytics = t_import + phases["ultralytics"]
+    t_model = t_ultralytics + phases["model"]
+    t_warmup = time.time()
+model.track(frame, persist=True, tracker="bytetrack.yaml", verbose=False, classes=[2, 3, 5, 7], imgsz=imgsz)
+t_first = time.time()
+print(json.dumps({"start": t_start, "import": t_import, "ultralytics": t_ultralytics, "model": t_model,
+                  "warmup": t_warmup, "first": t_first}))
+'''
+
+PHASES = ("interpreter", "import", "ultralytics", "model", "warmup", "first_frame", "total")
+
+
+def run_once(runtime, imgsz, legacy):
+    """Tek bir süreç başlatır, aşama sürelerini (sn) döner"""
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, runtime, str(imgsz), "1" if legacy else "0"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    data = json.loads(output)
+    return {
+        "interpreter": data["start"] - launched,
+        "import": data["import"] - data["start"],
+        "ultralytics": data["ultralytics"] - data["import"],
+        "model": data["model"] - data["ultralytics"],
+        "warmup": data["warmup"] - data["model"],
+        "first_frame": data["first"] - data["warmup"],
+        "total": data["first"] - launched,
+    }
+
+
+def report(name, runs):
+    print(f"\n{name}")
+    for key in PHASES:
+        values = [r[key] * 1000 for r in runs]
+        print(f"  {key:<12} median {statistics.median(values):8.1f} ms | max {max(values):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model başlangıç süresi ölçümü")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--runtime", default="torch", choices=("torch", "onnx", "openvino"))
+    parser.add_argument("--imgsz", type=int, default=640)
+    args = parser.parse_args()
+
+    # İlk süreç önbellekleri (birleştirilmiş model / dışa aktarım) oluşturur; ölçüme katılmaz
+    run_once(args.runtime, args.imgsz, legacy=False)
+
+    report("Eski: YOLO('yolov8n.pt'), ısınmasız", [run_once("torch", args.imgsz, True) for _ in range(args.runs)])
+    report(f"Yeni: load_model({args.runtime}), önbellek + ısınma",
+           [run_once(args.runtime, args.imgsz, False) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Bilgi paneli çiziminin kare başına maliyetini eski ve önbellekli yöntemle karşılaştırır.
+
+Kullanım:
+    python bench_overlay.py --width 1920 --height 1080 --iterations 2000
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from overlay import InfoPanelRenderer, COLOR_LEFT, COLOR_RIGHT, COLOR_WHITE
+
+STATUS_L = ("AKICI", (0, 255, 0))
+STATUS_R = ("YOGUN", (0, 0, 255))
+
+
+def draw_transparent_box(img, x, y, w, h, color, alpha=0.5):
+    sub_img = img[y:y + h, x:x + w]
+    white_rect = np.full(sub_img.shape, color, dtype=np.uint8)
+    res = cv2.addWeighted(sub_img, 1 - alpha, white_rect, alpha, 1.0)
+    img[y:y + h, x:x + w] = res
+
+
+def legacy_panel(frame, left, right, fps):
+    """Ana betiklerdeki önceki panel çizimi"""
+    box_x, box_y = 0, 0
+    draw_transparent_box(frame, box_x, box_y, 330, 200, (0, 0, 0), alpha=0.85)
+    cv2.putText(frame, "BOLGESEL TRAFIK ANALIZI", (box_x + 15, box_y + 25), cv2.FONT_HERSHEY_DUPLEX, 0.6,
+                COLOR_WHITE, 1, cv2.LINE_AA)
+    cv2.line(frame, (box_x + 15, box_y + 35), (box_x + 315, box_y + 35), (150, 150, 150), 1, cv2.LINE_AA)
+    cv2.putText(frame, "SOL SERIT", (box_x + 15, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_LEFT, 1, cv2.LINE_AA)
+    cv2.putText(frame, f"Arac: {left}", (box_x + 130, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE, 1,
+                cv2.LINE_AA)
+    cv2.putText(frame, STATUS_L[0], (box_x + 230, 65), cv2.FONT_HERSHEY_DUPLEX, 0.7, STATUS_L[1], 2, cv2.LINE_AA)
+    cv2.putText(frame, "SAG SERIT", (box_x + 15, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RIGHT, 1, cv2.LINE_AA)
+    cv2.putText(frame, f"Arac: {right}", (box_x + 130, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE, 1,
+                cv2.LINE_AA)
+    cv2.putText(frame, STATUS_R[0], (box_x + 230, 105), cv2.FONT_HERSHEY_DUPLEX, 0.7, STATUS_R[1], 2, cv2.LINE_AA)
+    cv2.line(frame, (box_x + 15, 135), (box_x + 315, 135), (150, 150, 150), 1, cv2.LINE_AA)
+    cv2.putText(frame, f"Sistem FPS: {int(fps)}", (box_x + 15, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                (200, 200, 200), 1, cv2.LINE_AA)
+
+
+def measure(draw, frames, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        draw(frames[i % len(frames)], i % 15, (i * 7) % 20, 25 + i % 5)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bilgi paneli çizim maliyeti ölçümü")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+
+    renderer = InfoPanelRenderer(width=330, height=200, alpha=0.85)
+
+    def cached_panel(frame, left, right, fps):
+        renderer.render(frame, left, STATUS_L, right, STATUS_R, fps)
+
+    # Isınma
+    measure(legacy_panel, frames, 50)
+    measure(cached_panel, frames, 50)
+
+    legacy = measure(legacy_panel, frames, args.iterations)
+    cached = measure(cached_panel, frames, args.iterations)
+
+    print(f"Çözünürlük: {args.width}x{args.height}, {args.iterations} tekrar")
+    print(f"Eski panel      : {legacy:8.1f} µs/kare")
+    print(f"Önbellekli panel: {cached:8.1f} µs/kare ({legacy / cached:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Çalışma ortamlarını (PyTorch / ONNX / OpenVINO, FP32 / INT8) hız ve sayım uyumu açısından karşılaştırır.
+
+Her yapılandırma videoyu model.track ile baştan işler. PyTorch FP32 referanstır;
+diğerleri için kare başına şerit sayımlarının ortalama mutlak hatası, tam
+eşleşme oranı ve sayım çizgisi geçiş toplamları raporlanır. FPS yalnızca
+tespit + takip süresinden hesaplanır (video çözme hariç).
+
+Kullanım:
+    python bench_runtime.py --source vehicle-counting.mp4 --threads 4
+    python bench_runtime.py --configs torch onnx onnx-int8 openvino openvino-int8 --max-frames 600
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from flow_counter import FlowCounter, default_lines
+from lane_counter import LaneCounter
+from model_runtime import load_model
+from track_registry import TrackRegistry
+
+MODEL_PATH = 'yolov8n.pt'
+CONFIDENCE = 0.25
+TARGET_CLASSES = [2, 3, 5, 7]
+IMGSZ = 640
+
+
+def parse_config(text):
+    """'onnx-int8' -> ('onnx', True)"""
+    runtime, _, precision = text.partition("-")
+    return runtime, precision == "int8"
+
+
+def run(source, runtime, int8, threads, max_frames):
+    """Videoyu işler; (kare başına sayımlar, çizgi geçiş toplamları, FPS, yükleme süresi) döner"""
+    start_time = time.perf_counter()
+    model = load_model(MODEL_PATH, runtime, int8=int8, threads=threads, imgsz=IMGSZ, tracker="bytetrack.yaml")
+    load_time = time.perf_counter() - start_time
+
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    lane_counter = None
+    registry = TrackRegistry()
+    flow = None
+    counts = []
+    detect_time = 0.0
+
+    index = 0
+    while max_frames is None or index < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        index += 1
+        if lane_counter is None:
+            height, width = frame.shape[:2]
+            lane_counter = LaneCounter.left_right(width, height)
+            flow = FlowCounter(default_lines(width, height), registry)
+
+        t0 = time.perf_counter()
+        results = model.track(frame, persist=True, tracker="bytetrack.yaml", verbose=False,
+                              classes=TARGET_CLASSES, conf=CONFIDENCE, imgsz=IMGSZ)
+        detect_time += time.perf_counter() - t0
+        if results[0].boxes.id is not None:
+            boxes = results[0].boxes.xyxy.cpu().numpy()
+            ids = results[0].boxes.id.int().cpu().numpy()
+        else:
+            boxes = np.empty((0, 4), dtype=np.float32)
+            ids = np.empty(0, dtype=np.int32)
+
+        lane_counts, _ = lane_counter.count(boxes)
+        counts.append(lane_counts[:2])
+        flow.update(registry.update(boxes, ids, index), index)
+
+    cap.release()
+    fps = index / detect_time if detect_time > 0 else 0.0
+    return np.asarray(counts, dtype=np.int32).reshape(-1, 2), flow.total(), fps, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model çalışma ortamı karşılaştırması")
+    parser.add_argument("--source", default="vehicle-counting.mp4")
+    parser.add_argument("--configs", nargs="+", default=["onnx", "onnx-int8", "openvino", "openvino-int8"],
+                        help="çalışma_ortamı[-int8]")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"Referans (torch FP32) hesaplanıyor: {args.source}")
+    reference, ref_flow, ref_fps, ref_load = run(args.source, "torch", False, args.threads, args.max_frames)
+    print(f"{len(reference)} kare | {ref_fps:.1f} FPS | yükleme {ref_load:.1f} sn | "
+          f"çizgi geçişleri {ref_flow.tolist()}\n")
+
+    print(f"{'Ortam':>14} {'FPS':>7} {'Hız':>6} {'Yükleme':>8} {'MAE Sol':>8} {'MAE Sağ':>8} "
+          f"{'Tam eşleşme':>12} {'Geçişler':>12}")
+    for text in args.configs:
+        runtime, int8 = parse_config(text)
+        try:
+            counts, flow, fps, load_time = run(args.source, runtime, int8, args.threads, args.max_frames)
+        except (ImportError, RuntimeError, ValueError) as exc:
+            print(f"{text:>14} atlandı: {exc}")
+            continue
+        n = min(len(reference), len(counts))
+        error = np.abs(reference[:n] - counts[:n])
+        mae, exact = error.mean(axis=0), (error.sum(axis=1) == 0).mean()
+        print(f"{text:>14} {fps:>7.1f} {fps / ref_fps:>5.2f}x {load_time:>7.1f}s {mae[0]:>8.3f} {mae[1]:>8.3f} "
+              f"{exact:>11.1%} {str(flow.tolist()):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Atlama oranı (SKIP_RATE) ile sayım doğruluğu arasındaki ilişkiyi ölçer.
+
+Her kare tespit edilerek (adım=1) elde edilen şerit sayımları referans alınır.
+Her adım değeri için iki mod karşılaştırılır:
+  - bekle : atlanan karelerde son kutular aynen kullanılır (eski davranış)
+  - tahmin: ConstantVelocityPredictor ile kutular ileri taşınır
+
+Kullanım:
+    python bench_skip_accuracy.py --source vehicle-counting.mp4 --skips 2 3 4 6 --max-frames 900
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from lane_counter import LaneCounter
+from track_predictor import ConstantVelocityPredictor
+
+MODEL_PATH = 'yolov8n.pt'
+CONFIDENCE = 0.25
+TARGET_CLASSES = [2, 3, 5, 7]
+
+
+def run(source, skip, interpolate, max_frames):
+    """Videoyu verilen adımla işler; kare başına (sol, sağ) sayımları ve süreyi döner"""
+    # Her koşu kendi ByteTrack durumuyla başlasın diye model yeniden yüklenir
+    model = YOLO(MODEL_PATH)
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    predictor = ConstantVelocityPredictor() if interpolate else None
+
+    lane_counter = None
+    boxes = np.empty((0, 4), dtype=np.float32)
+    ids = np.empty(0, dtype=np.int32)
+    counts = []
+    detect_time = 0.0
+    start_time = time.perf_counter()
+
+    index = 0
+    while max_frames is None or index < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        index += 1
+
+        if lane_counter is None:
+            height, width = frame.shape[:2]
+            lane_counter = LaneCounter.left_right(width, height)
+
+        if (index - 1) % skip == 0:
+            t0 = time.perf_counter()
+            results = model.track(frame, persist=True, tracker="bytetrack.yaml", verbose=False,
+                                  classes=TARGET_CLASSES, conf=CONFIDENCE, imgsz=640)
+            detect_time += time.perf_counter() - t0
+            if results[0].boxes.id is not None:
+                boxes = results[0].boxes.xyxy.cpu().numpy()
+                ids = results[0].boxes.id.int().cpu().numpy()
+            else:
+                boxes = np.empty((0, 4), dtype=np.float32)
+                ids = np.empty(0, dtype=np.int32)
+            if predictor is not None:
+                predictor.update(boxes, ids, index)
+            current = boxes
+        elif predictor is not None:
+            current, _ = predictor.predict(index)
+        else:
+            current = boxes
+
+        lane_counts, _ = lane_counter.count(current)
+        counts.append(lane_counts[:2])
+
+    cap.release()
+    elapsed = time.perf_counter() - start_time
+    return np.asarray(counts, dtype=np.int32).reshape(-1, 2), elapsed, detect_time
+
+
+def compare(reference, counts):
+    """Referansa göre şerit başına ortalama mutlak hata ve tam eşleşme oranı"""
+    n = min(len(reference), len(counts))
+    error = np.abs(reference[:n] - counts[:n])
+    return error.mean(axis=0), (error.sum(axis=1) == 0).mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atlama oranı - sayım doğruluğu ölçümü")
+    parser.add_argument("--source", default="vehicle-counting.mp4")
+    parser.add_argument("--skips", type=int, nargs="+", default=[2, 3, 4, 6])
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"Referans (adım=1) hesaplanıyor: {args.source}")
+    reference, ref_elapsed, ref_detect = run(args.source, 1, False, args.max_frames)
+    frames = len(reference)
+    print(f"{frames} kare, {frames / ref_elapsed:.1f} FPS, tespit {ref_detect / frames * 1000:.1f} ms/kare\n")
+
+    print(f"{'Adım':>4} {'Mod':>7} {'FPS':>7} {'MAE Sol':>8} {'MAE Sağ':>8} {'Tam eşleşme':>12}")
+    for skip in args.skips:
+        for interpolate in (False, True):
+            counts, elapsed, _ = run(args.source, skip, interpolate, args.max_frames)
+            mae, exact = compare(reference, counts)
+            mode = "tahmin" if interpolate else "bekle"
+            print(f"{skip:>4} {mode:>7} {len(counts) / elapsed:>7.1f} {mae[0]:>8.3f} {mae[1]:>8.3f} {exact:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Karolu çıkarımda karo düzeni ile hız / yakalama (recall) dengesini ölçer.
+
+Elle etiketlenmiş veri olmadığından referans, kareyi kendi çözünürlüğünde
+(imgsz = uzun kenar) tek geçişte işleyen modelin tespitleridir. Her düzen için
+referans kutularının IoU >= 0.5 ile bulunma oranı hesaplanır; "küçük" sütunu
+yalnızca yüksekliği --small pikselin altındaki (uzaktaki) araçları içerir.
+
+Kullanım:
+    python bench_tiled.py --source kavsak_4k.mp4 --layouts 1x2 2x2 2x3 3x3 --max-frames 300
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from tiled_detector import TiledDetector
+
+MODEL_PATH = 'yolov8n.pt'
+CONFIDENCE = 0.25
+TARGET_CLASSES = [2, 3, 5, 7]
+IMGSZ = 640
+
+
+def read_frames(source, max_frames, stride):
+    """Ölçüm için karelerin bir örneğini belleğe okur (çözme süresi ölçüme girmesin)"""
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    frames = []
+    index = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % stride == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def iou_matrix(a, b):
+    """(N, 4) ve (M, 4) xyxy kutular arasında (N, M) IoU"""
+    w = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    h = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match(reference, detections, threshold=0.5):
+    """Referans kutularından birebir (açgözlü) eşleşenlerin maskesi"""
+    found = np.zeros(len(reference), dtype=bool)
+    if not len(reference) or not len(detections):
+        return found
+    iou = iou_matrix(reference, detections)
+    while True:
+        r, d = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[r, d] < threshold:
+            return found
+        found[r] = True
+        iou[r, :] = 0
+        iou[:, d] = 0
+
+
+def predict(model, frame, imgsz):
+    result = model.predict(frame, verbose=False, classes=TARGET_CLASSES, conf=CONFIDENCE, imgsz=imgsz)[0]
+    return result.boxes.xyxy.cpu().numpy()
+
+
+def run(frames, detect):
+    """Her karede detect(frame) -> xyxy kutular; (kutu listesi, kare/sn) döner"""
+    detect(frames[0])  # Isınma
+    start_time = time.perf_counter()
+    outputs = [detect(frame) for frame in frames]
+    return outputs, len(frames) / (time.perf_counter() - start_time)
+
+
+def parse_layout(text):
+    rows, _, cols = text.partition("x")
+    return int(rows), int(cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Karolu çıkarım: hız - recall ölçümü")
+    parser.add_argument("--source", default="vehicle-counting.mp4")
+    parser.add_argument("--layouts", nargs="+", default=["1x2", "2x2", "2x3", "3x3"], help="satırxsütun")
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--max-frames", type=int, default=200)
+    parser.add_argument("--stride", type=int, default=5, help="Her kaçıncı karenin ölçüleceği")
+    parser.add_argument("--small", type=float, default=40, help="Küçük araç yükseklik sınırı (piksel)")
+    args = parser.parse_args()
+
+    model = YOLO(MODEL_PATH)
+    frames = read_frames(args.source, args.max_frames, args.stride)
+    if not frames:
+        raise SystemExit(f"Kare okunamadı: {args.source}")
+    height, width = frames[0].shape[:2]
+    ref_size = int(np.ceil(max(height, width) / 32) * 32)
+
+    print(f"{len(frames)} kare ({width}x{height}), referans: tek geçiş imgsz={ref_size}")
+    reference, ref_fps = run(frames, lambda frame: predict(model, frame, ref_size))
+    ref_total = sum(len(boxes) for boxes in reference)
+    small = [(boxes[:, 3] - boxes[:, 1]) < args.small for boxes in reference]
+    small_total = sum(int(mask.sum()) for mask in small)
+    print(f"Referans: {ref_total} araç ({small_total} küçük), {ref_fps:.2f} FPS\n")
+
+    candidates = [("tüm kare", lambda frame: predict(model, frame, IMGSZ))]
+    for text in args.layouts:
+        detector = TiledDetector(model, parse_layout(text), args.overlap, imgsz=IMGSZ,
+                                 classes=TARGET_CLASSES, conf=CONFIDENCE)
+        candidates.append((f"{text} karo", lambda frame, d=detector: d.detect(frame)[:, :4]))
+
+    print(f"{'Düzen':>10} {'FPS':>7} {'Recall':>7} {'Küçük':>7} {'Tespit':>7}")
+    for name, detect in candidates:
+        outputs, fps = run(frames, detect)
+        found = [match(ref, out) for ref, out in zip(reference, outputs)]
+        recall = sum(int(f.sum()) for f in found) / max(ref_total, 1)
+        small_recall = sum(int(f[m].sum()) for f, m in zip(found, small)) / max(small_total, 1)
+        detections = sum(len(out) for out in outputs)
+        print(f"{name:>10} {fps:>7.2f} {recall:>7.1%} {small_recall:>7.1%} {detections:>7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""TrackRegistry + FlowCounter uzun süre (soak) bellek testi.
+
+Sentetik trafik üretilir: araçlar Poisson süreciyle gelir, her biri artan yeni
+bir ByteTrack ID'si alır, görüntüyü yukarıdan aşağı geçip kaybolur. Simüle
+edilen her --report-hours saatte bir süreç belleği (RSS), aktif takip sayısı ve
+verilen toplam ID sayısı yazdırılır. Sınırsız bir ID sözlüğü bu süre sonunda
+"ID" sütunundaki kadar kayıt tutardı.
+
+Kullanım:
+    python bench_track_registry.py --days 7 --fps 10
+    python bench_track_registry.py --days 1 --fps 30 --rate 40
+"""
+import argparse
+import os
+import resource
+import time
+
+import numpy as np
+
+from flow_counter import FlowCounter, default_lines
+from track_registry import TrackRegistry
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def rss_mb():
+    """Güncel yerleşik bellek (MB); /proc yoksa en yüksek değer"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrackRegistry uzun süre bellek testi")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--fps", type=float, default=10, help="Simüle edilen kare hızı")
+    parser.add_argument("--rate", type=float, default=30, help="Dakikada gelen araç")
+    parser.add_argument("--transit", type=float, default=6, help="Bir aracın görüntüde kalma süresi (sn)")
+    parser.add_argument("--report-hours", type=float, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    registry = TrackRegistry(capacity=1024, max_age=int(args.fps * 3))
+    flow = FlowCounter(default_lines(WIDTH, HEIGHT), registry, names=["SOL", "SAG"])
+
+    total_frames = int(args.days * 86400 * args.fps)
+    report_every = int(args.report_hours * 3600 * args.fps)
+    spawn_per_frame = args.rate / 60.0 / args.fps
+    speed = (HEIGHT + 100) / (args.transit * args.fps)  # piksel / kare
+
+    # Aktif araçlar: x, y, genişlik, yükseklik, id
+    cars = np.empty((0, 5), dtype=np.float64)
+    next_id = 1
+
+    print(f"{args.days:g} gün x {args.fps:g} FPS = {total_frames} kare, dakikada {args.rate:g} araç")
+    print(f"{'saat':>6} {'ID':>10} {'aktif':>6} {'süresi dolan':>13} {'geçiş':>9} {'RSS MB':>8} {'µs/kare':>8}")
+
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    window_start = start
+    for frame_index in range(total_frames):
+        # Yeni araçlar
+        arrivals = rng.poisson(spawn_per_frame)
+        if arrivals:
+            new = np.empty((arrivals, 5))
+            new[:, 0] = rng.uniform(0, WIDTH - 200, arrivals)
+            new[:, 1] = -100.0
+            new[:, 2] = rng.uniform(80, 200, arrivals)
+            new[:, 3] = rng.uniform(60, 150, arrivals)
+            new[:, 4] = np.arange(next_id, next_id + arrivals)
+            next_id += arrivals
+            cars = np.concatenate((cars, new))
+
+        cars[:, 1] += speed
+        cars = cars[cars[:, 1] < HEIGHT + 100]
+
+        # Tespit kaçırma: her aracı %5 olasılıkla bu karede görme
+        visible = cars[rng.random(len(cars)) > 0.05]
+        boxes = np.column_stack((visible[:, 0], visible[:, 1],
+                                 visible[:, 0] + visible[:, 2], visible[:, 1] + visible[:, 3]))
+        slots = registry.update(boxes, visible[:, 4].astype(np.int64), frame_index)
+        flow.update(slots, frame_index / args.fps)
+
+        if (frame_index + 1) % report_every == 0 or frame_index + 1 == total_frames:
+            now = time.perf_counter()
+            frames = (frame_index % report_every) + 1
+            stats = registry.stats()
+            print(f"{(frame_index + 1) / args.fps / 3600:6.1f} {next_id - 1:10d} {stats['active']:6d} "
+                  f"{stats['expired']:13d} {int(flow.total().sum()):9d} {rss_mb():8.1f} "
+                  f"{(now - window_start) / frames * 1e6:8.1f}")
+            window_start = now
+
+    elapsed = time.perf_counter() - start
+    print(f"\nSüre: {elapsed:.0f} sn | RSS değişimi: {rss_mb() - start_rss:+.1f} MB | "
+          f"tablodan çıkarılan (kapasite dolu): {registry.stats()['evicted']}")
+
+
+if __name__ == "__main__":
+    main()
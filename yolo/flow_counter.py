@@ -0,0 +1,132 @@
+import numpy as np
+
+
+def default_lines(width, height, mid_x=None, y_ratio=0.6):
+    """Sol ve sağ yarıyı y_ratio yüksekliğinde kesen iki yatay sayım çizgisi"""
+    if mid_x is None:
+        mid_x = width // 2
+    y = int(height * y_ratio)
+    return [((0, y), (mid_x, y)), ((mid_x, y), (width, y))]
+
+
+class FlowCounter:
+    """Takip ID'lerinin sanal çizgileri geçişini sayar (kutu sayısı değil, geçen araç).
+
+    Önceki / güncel kutular TrackRegistry'den okunur; ID başına "bu çizgide sayıldı"
+    bilgisi registry yuvalarıyla indekslenen sabit boyutlu dizide tutulur. Yuva
+    başka bir ID'ye geçtiğinde (generation değişir) bilgi sıfırlanır, böylece
+    günlerce süren yayında da bellek sabit kalır. Her ID bir çizgiyi en fazla bir
+    kez geçmiş sayılır (çizgi üzerindeki titreşim tekrar saymaz).
+
+    Yön, çizginin (p1 -> p2) hangi tarafına geçildiğine göre belirlenir: soldan sağa
+    çizilmiş yatay bir çizgide aşağı doğru (kameraya yaklaşan) geçiş "forward" (+1),
+    yukarı doğru geçiş "backward" (-1) sayılır.
+    """
+
+    def __init__(self, lines, registry, names=None, rate_window=60):
+        if not lines:
+            raise ValueError("En az bir sayım çizgisi gerekli")
+        points = np.asarray(lines, dtype=np.float64).reshape(-1, 2, 2)
+        self.num_lines = len(points)
+        self.names = list(names) if names is not None else [f"cizgi_{i}" for i in range(self.num_lines)]
+        self.lines = points
+        self._p1 = points[:, 0]
+        self._d = points[:, 1] - points[:, 0]
+
+        # Registry yuvalarıyla indekslenen durum
+        self.registry = registry
+        self.counted = np.zeros((registry.capacity, self.num_lines), dtype=bool)
+        self._generation = np.zeros(registry.capacity, dtype=np.int64)
+
+        # Toplam sayımlar: [çizgi, 0=forward / 1=backward]
+        self.totals = np.zeros((self.num_lines, 2), dtype=np.int64)
+
+        # Son rate_window saniyedeki geçişler: saniyelik kovalı halka tampon
+        self.rate_window = rate_window
+        self._bins = np.zeros((self.num_lines, rate_window), dtype=np.int32)
+        self._bin_second = None
+
+    def _side(self, points):
+        """(N, 2) noktaların her çizgiye göre işaretli tarafı: (N, çizgi sayısı)"""
+        rel = points[:, None, :] - self._p1[None, :, :]
+        return self._d[None, :, 0] * rel[..., 1] - self._d[None, :, 1] * rel[..., 0]
+
+    def _advance_bins(self, timestamp):
+        second = int(timestamp)
+        if self._bin_second is None:
+            self._bin_second = second
+            return
+        elapsed = second - self._bin_second
+        if elapsed <= 0:
+            return
+        # Geçen saniyelerin kovalarını sıfırla
+        if elapsed >= self.rate_window:
+            self._bins[:] = 0
+        else:
+            for s in range(self._bin_second + 1, second + 1):
+                self._bins[:, s % self.rate_window] = 0
+        self._bin_second = second
+
+    @staticmethod
+    def _anchor(boxes):
+        """Kutunun alt orta noktası (yol düzlemine temas)"""
+        points = np.empty((len(boxes), 2), dtype=np.float64)
+        points[:, 0] = (boxes[:, 0] + boxes[:, 2]) * 0.5
+        points[:, 1] = boxes[:, 3]
+        return points
+
+    def update(self, slots, timestamp):
+        """registry.update() sonrası çağrılır; bu karedeki (id, çizgi, yön) geçişlerini döner"""
+        self._advance_bins(timestamp)
+        registry = self.registry
+        if len(slots) == 0:
+            return []
+
+        # Yuvası yeni bir ID'ye geçenlerin sayım bilgisini sıfırla
+        generation = registry.generation[slots]
+        reused = slots[self._generation[slots] != generation]
+        self.counted[reused] = False
+        self._generation[slots] = generation
+
+        # İlk kez görülen ID'nin önceki konumu yok
+        slots = slots[registry.hits[slots] > 1]
+        if len(slots) == 0:
+            return []
+        n = len(slots)
+        points = self._anchor(np.concatenate((registry.prev_box[slots], registry.box[slots])))
+        sides = self._side(points)
+        side_prev, side_curr = sides[:n], sides[n:]
+        crossed = (side_prev * side_curr < 0) | ((side_prev == 0) & (side_curr != 0))
+
+        # Çizginin uç noktaları hareket doğrusunun iki farklı tarafında mı? (parça kesişimi)
+        prev = points[:n]
+        move = points[n:] - prev
+        rel1 = self._p1[None, :, :] - prev[:, None, :]
+        rel2 = rel1 + self._d[None, :, :]
+        o1 = move[:, None, 0] * rel1[..., 1] - move[:, None, 1] * rel1[..., 0]
+        o2 = move[:, None, 0] * rel2[..., 1] - move[:, None, 1] * rel2[..., 0]
+        crossed &= (o1 * o2 <= 0) & ~self.counted[slots]
+
+        rows, line_index = np.nonzero(crossed)
+        if len(rows) == 0:
+            return []
+        backward = (side_curr[rows, line_index] < 0).astype(np.int64)
+        np.add.at(self.totals, (line_index, backward), 1)
+        np.add.at(self._bins, (line_index, self._bin_second % self.rate_window), 1)
+        self.counted[slots[rows], line_index] = True
+        track_ids = registry.track_id[slots]
+        return [(int(track_ids[r]), int(l), -1 if b else 1) for r, l, b in zip(rows, line_index, backward)]
+
+    def per_minute(self):
+        """Çizgi başına son rate_window saniyedeki geçişlerden dakikalık araç akışı"""
+        return self._bins.sum(axis=1) * (60.0 / self.rate_window)
+
+    def total(self):
+        """Çizgi başına (her iki yön) toplam geçiş"""
+        return self.totals.sum(axis=1)
+
+    def summary(self):
+        """Konsol için kısa özet satırı"""
+        rates = self.per_minute()
+        return " | ".join(f"{name}: {int(forward)}+{int(backward)} araç, {rate:.0f}/dk"
+                          for name, (forward, backward), rate in zip(self.names, self.totals, rates))
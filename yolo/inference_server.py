@@ -0,0 +1,212 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from live_capture import open_capture
+from lane_counter import LaneCounter
+from roi import RoiLetterbox
+from model_runtime import RUNTIMES, byte_tracker, load_model, tracker_args
+
+# --- AYARLAR ---
+MODEL_PATH = 'yolov8n.pt'
+TRACKER_CONFIG = "bytetrack.yaml"
+CONFIDENCE = 0.25
+IMGSZ = 640
+POLL_INTERVAL = 0.002  # Hiçbir canlı kamerada yeni kare yokken bekleme (saniye)
+TARGET_CLASSES = [2, 3, 5, 7]  # Araba, motosiklet, otobüs, kamyon
+
+
+class BatchedTracker:
+    """Tek model kopyası ile birden çok kamerayı aynı partide işler.
+
+    Her kameranın kendi ByteTrack durumu vardır; böylece takip ID'leri
+    kameralar arasında karışmaz ve RAM'de tek bir model bulunur. Kamera başına
+    bir ROI verilebilir; kareler modele kameranın kendi ön tahsisli tamponunda
+    kırpılmış olarak gider, kutular kare koordinatlarına geri çevrilir. Tampon
+    boyutu aynı olan kameralar bir partide, imgsz=tampon boyutu ile işlenir;
+    küçük ROI tamponları ortak bir boyuta büyütülmez.
+    """
+
+    def __init__(self, model, tracker_config=TRACKER_CONFIG, classes=None, conf=CONFIDENCE, imgsz=IMGSZ):
+        self.model = model
+        self.tracker_args = tracker_args(tracker_config)
+        self.classes = classes if classes is not None else TARGET_CLASSES
+        self.conf = conf
+        self.imgsz = imgsz
+        self.trackers = {}
+        self.rois = {}
+        self.letterboxes = {}
+
+    def add_camera(self, camera_id, frame_rate=30, roi=None):
+        """Kamera için ayrı bir ByteTrack durumu oluşturur"""
+        self.trackers[camera_id] = byte_tracker(self.tracker_args, frame_rate)
+        self.rois[camera_id] = roi
+        self.letterboxes.pop(camera_id, None)
+
+    def remove_camera(self, camera_id):
+        self.trackers.pop(camera_id, None)
+        self.rois.pop(camera_id, None)
+        self.letterboxes.pop(camera_id, None)
+
+    def _letterbox(self, camera_id, frame):
+        letterbox = self.letterboxes.get(camera_id)
+        if letterbox is None or letterbox.frame_shape != frame.shape[:2]:
+            letterbox = RoiLetterbox(frame.shape, self.rois.get(camera_id), imgsz=self.imgsz)
+            self.letterboxes[camera_id] = letterbox
+        return letterbox
+
+    def track(self, frames):
+        """{kamera_id: kare} sözlüğünü tek partide işler, {kamera_id: (kutular, id'ler)} döner"""
+        camera_ids = [camera_id for camera_id in frames if camera_id in self.trackers]
+        if not camera_ids:
+            return {}
+
+        groups = {}
+        for camera_id in camera_ids:
+            letterbox = self._letterbox(camera_id, frames[camera_id])
+            groups.setdefault(letterbox.input_size, []).append((camera_id, letterbox))
+
+        output = {}
+        for input_size, group in groups.items():
+            batch = [letterbox.prepare(frames[camera_id]) for camera_id, letterbox in group]
+            results = self.model.predict(
+                batch,
+                verbose=False,
+                classes=self.classes,
+                conf=self.conf,
+                imgsz=input_size
+            )
+            for (camera_id, letterbox), image, result in zip(group, batch, results):
+                # Takip tampon koordinatlarında yapılır, kutular sonra kareye çevrilir
+                detections = result.boxes.cpu().numpy()
+                tracks = self.trackers[camera_id].update(detections, image)
+                if len(tracks):
+                    output[camera_id] = (letterbox.to_frame(tracks[:, :4]), tracks[:, 4].astype(np.int32))
+                else:
+                    output[camera_id] = (np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.int32))
+        return output
+
+
+class InferenceServer:
+    """N kaynaktan kareleri toplar ve her turda tek parti halinde işler.
+
+    Canlı kaynaklarda yalnızca en yeni kare alınır; yeni karesi olmayan kamera o
+    turu beklemeden atlar, böylece yavaş bir kamera diğerlerini geciktirmez.
+    Video dosyaları kare atlanmadan sırayla okunur.
+    """
+
+    def __init__(self, sources, model_path=MODEL_PATH, on_result=None, rois=None, runtime="torch", int8=False,
+                 threads=None):
+        print("Model yükleniyor...")
+        self.model = load_model(model_path, runtime, int8=int8, threads=threads, imgsz=IMGSZ)
+        self.tracker = BatchedTracker(self.model)
+        self.on_result = on_result or self._print_counts
+        self.cameras = {}
+        self.lane_counters = {}
+        self.tick = 0
+        rois = rois or {}
+
+        for camera_id, source in sources.items():
+            grabber = open_capture(source)
+            if not grabber.isOpened():
+                print(f"UYARI: Kaynak açılamadı, atlanıyor: {camera_id} ({source})")
+                grabber.release()
+                continue
+            frame_rate = grabber.get(cv2.CAP_PROP_FPS) or 30
+            self.cameras[camera_id] = grabber
+            self.tracker.add_camera(camera_id, frame_rate, roi=rois.get(camera_id))
+            print(f"Kamera eklendi: {camera_id} -> {source}")
+
+    def _print_counts(self, camera_id, frame, boxes, ids):
+        if self.tick % 30 != 0:
+            return
+        if camera_id not in self.lane_counters:
+            height, width = frame.shape[:2]
+            self.lane_counters[camera_id] = LaneCounter.left_right(width, height)
+        counts, _ = self.lane_counters[camera_id].count(boxes)
+        print(f"[{camera_id}] Tur {self.tick} | Sol: {counts[0]}, Sağ: {counts[1]}")
+
+    def step(self):
+        """Yeni karesi olan kameraları tek parti olarak işler"""
+        frames = {}
+        for camera_id, grabber in list(self.cameras.items()):
+            ret, frame = grabber.read(timeout=0)
+            if ret:
+                frames[camera_id] = frame
+            elif grabber.ended:
+                print(f"Kaynak bitti: {camera_id}")
+                grabber.release()
+                del self.cameras[camera_id]
+                self.tracker.remove_camera(camera_id)
+
+        if not frames:
+            time.sleep(POLL_INTERVAL)
+            return 0
+
+        self.tick += 1
+        for camera_id, (boxes, ids) in self.tracker.track(frames).items():
+            self.on_result(camera_id, frames[camera_id], boxes, ids)
+        return len(frames)
+
+    def run(self):
+        start_time = time.time()
+        processed = 0
+        try:
+            while self.cameras:
+                processed += self.step()
+        except KeyboardInterrupt:
+            print("\n\nKullanıcı tarafından durduruldu.")
+        finally:
+            self.close()
+
+        elapsed = time.time() - start_time
+        if elapsed > 0:
+            print(f"Toplam {processed} kare, {self.tick} tur, {processed / elapsed:.1f} kare/sn")
+
+    def close(self):
+        for grabber in self.cameras.values():
+            grabber.release()
+        self.cameras.clear()
+
+
+def parse_sources(items):
+    """'kamera_id=kaynak' biçimindeki argümanları sözlüğe çevirir"""
+    sources = {}
+    for index, item in enumerate(items):
+        camera_id, sep, source = item.partition("=")
+        if not sep:
+            camera_id, source = f"cam{index}", item
+        sources[camera_id] = source
+    return sources
+
+
+def parse_rois(items):
+    """'kamera_id=x1,y1,x2,y2' biçimindeki ROI argümanlarını sözlüğe çevirir"""
+    rois = {}
+    for item in items:
+        camera_id, sep, coords = item.partition("=")
+        values = [float(value) for value in coords.split(",")] if sep else []
+        if len(values) != 4:
+            raise ValueError(f"Geçersiz ROI: {item} (beklenen: kamera_id=x1,y1,x2,y2)")
+        rois[camera_id] = tuple(values)
+    return rois
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çok kameralı toplu YOLO + ByteTrack çıkarım sunucusu")
+    parser.add_argument("sources", nargs="+", help="kamera_id=kaynak (RTSP/HLS linki veya video dosyası)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--runtime", choices=RUNTIMES, default="torch")
+    parser.add_argument("--int8", action="store_true", help="INT8 nicemlenmiş model (onnx / openvino)")
+    parser.add_argument("--threads", type=int, default=None, help="CPU iş parçacığı sayısı")
+    parser.add_argument("--roi", action="append", default=[], help="kamera_id=x1,y1,x2,y2 (tekrarlanabilir)")
+    args = parser.parse_args()
+
+    InferenceServer(parse_sources(args.sources), model_path=args.model, rois=parse_rois(args.roi),
+                    runtime=args.runtime, int8=args.int8, threads=args.threads).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def split_lanes(width, height, mid_x=None):
+    """Görüntüyü mid_x'ten ikiye bölen sol/sağ şerit poligonlarını döner"""
+    if mid_x is None:
+        mid_x = width // 2
+    left = [(0, 0), (mid_x, 0), (mid_x, height), (0, height)]
+    right = [(mid_x, 0), (width, 0), (width, height), (mid_x, height)]
+    return [left, right]
+
+
+class LaneCounter:
+    """Kutuları NumPy dizisi üzerinde, tek vektörel geçişte şerit poligonlarına atar.
+
+    Her kutunun merkez noktası tüm poligonların tüm kenarlarına karşı aynı anda
+    ışın atma (ray casting) testinden geçirilir; kutu başına Python döngüsü yoktur.
+    Ortak kenar üzerindeki bir nokta yalnızca bir şeride sayılır.
+
+    Merkezler önce bounds (x1, y1, x2, y2; varsayılan: poligonların sınırlayıcı
+    dikdörtgeni) içine kırpılır. Kare kenarında kesilmiş ya da track_predictor'ın
+    kare dışına taşıdığı kutular böylece kenardaki şeride sayılır. Kareyi bilen
+    çağıranlar bounds olarak kareyi verir.
+    """
+
+    def __init__(self, lanes, names=None, bounds=None):
+        if not lanes:
+            raise ValueError("En az bir şerit poligonu gerekli")
+
+        self.names = list(names) if names is not None else [f"serit_{i}" for i in range(len(lanes))]
+        if len(self.names) != len(lanes):
+            raise ValueError("Şerit isimleri ile poligon sayısı uyuşmuyor")
+
+        # Tüm poligonların kenarlarını tek dizide topla: (x1, y1) -> (x2, y2)
+        starts, ends, offsets = [], [], []
+        for polygon in lanes:
+            points = np.asarray(polygon, dtype=np.float64)
+            if points.ndim != 2 or points.shape[0] < 3 or points.shape[1] != 2:
+                raise ValueError("Her poligon en az 3 (x, y) noktasından oluşmalı")
+            offsets.append(sum(len(s) for s in starts))
+            starts.append(points)
+            ends.append(np.roll(points, -1, axis=0))
+
+        starts = np.concatenate(starts)
+        ends = np.concatenate(ends)
+        if bounds is None:
+            bounds = (*starts.min(axis=0), *starts.max(axis=0))
+        # Işın testi sol/üst kenarı içeri, sağ/alt kenarı dışarı sayar; üst sınır kenarın hemen içidir
+        self._low = np.asarray(bounds[:2], dtype=np.float64)
+        self._high = np.nextafter(np.asarray(bounds[2:], dtype=np.float64), -np.inf)
+        self._x1, self._y1 = starts[:, 0], starts[:, 1]
+        self._x2, self._y2 = ends[:, 0], ends[:, 1]
+        dy = self._y2 - self._y1
+        # Yatay kenarlar kesişim testine hiç girmez; bölme hatasını önle
+        self._inv_dy = np.divide(self._x2 - self._x1, dy, out=np.zeros_like(dy), where=dy != 0)
+        self._offsets = np.asarray(offsets)
+        self.num_lanes = len(lanes)
+
+    @classmethod
+    def left_right(cls, width, height, mid_x=None):
+        """Mevcut sol/sağ (mid_x) ayrımına eşdeğer sayaç"""
+        return cls(split_lanes(width, height, mid_x), names=["SOL", "SAG"], bounds=(0, 0, width, height))
+
+    def assign(self, boxes):
+        """(N, 4) xyxy kutular için (şerit sayısı, N) boyutlu bool maske döner"""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if boxes.shape[0] == 0:
+            return np.zeros((self.num_lanes, 0), dtype=bool)
+
+        cx = np.clip((boxes[:, 0] + boxes[:, 2]) * 0.5, self._low[0], self._high[0])[:, None]
+        cy = np.clip((boxes[:, 1] + boxes[:, 3]) * 0.5, self._low[1], self._high[1])[:, None]
+
+        # (N, kenar) kesişim matrisi
+        straddles = (self._y1 > cy) != (self._y2 > cy)
+        x_cross = self._x1 + (cy - self._y1) * self._inv_dy
+        crossings = straddles & (cx < x_cross)
+
+        # Her şeridin kenarlarındaki kesişimleri topla, tek sayı = içeride
+        per_lane = np.add.reduceat(crossings, self._offsets, axis=1, dtype=np.intp)
+        return (per_lane % 2 == 1).T
+
+    def count(self, boxes):
+        """Şerit başına araç sayısını ve maskeleri döner: (sayılar, maskeler)"""
+        masks = self.assign(boxes)
+        return masks.sum(axis=1), masks
+
+    def lane_index(self, masks):
+        """Her kutunun ait olduğu şerit indeksini döner (hiçbiri değilse -1)"""
+        if masks.shape[1] == 0:
+            return np.empty(0, dtype=np.intp)
+        index = masks.argmax(axis=0)
+        index[~masks.any(axis=0)] = -1
+        return index
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class RollingWindow:
+    """Şerit başına son `size` örneğin kayan istatistikleri (ön tahsisli halka tampon).
+
+    Her update() O(şerit sayısı): çıkan örnek toplamdan ve sayım histogramından
+    düşülür, gelen eklenir. Yüzdelikler histogramın kümülatif toplamından okunur,
+    bu yüzden maliyet pencere boyundan bağımsızdır. Şerit sayısı küçük olduğundan
+    kare başına güncelleme düz Python listeleriyle yapılır (NumPy çağrı maliyeti
+    burada işin kendisinden büyük).
+    """
+
+    def __init__(self, num_lanes, size, max_count=63):
+        self.num_lanes = num_lanes
+        self.size = size
+        self.max_count = max_count
+        self.buffer = [[0] * num_lanes for _ in range(size)]
+        self.histogram = [[0] * (max_count + 1) for _ in range(num_lanes)]
+        self.sums = [0] * num_lanes
+        self.position = 0
+        self.filled = 0
+
+    def update(self, counts):
+        """counts: max_count ile sınırlanmış tamsayı listesi"""
+        row = self.buffer[self.position]
+        if self.filled == self.size:
+            for lane in range(self.num_lanes):
+                old = row[lane]
+                self.sums[lane] -= old
+                self.histogram[lane][old] -= 1
+        else:
+            self.filled += 1
+        for lane in range(self.num_lanes):
+            count = counts[lane]
+            row[lane] = count
+            self.sums[lane] += count
+            self.histogram[lane][count] += 1
+        self.position = (self.position + 1) % self.size
+
+    def mean(self):
+        if not self.filled:
+            return np.zeros(self.num_lanes)
+        return np.array(self.sums, dtype=np.float64) / self.filled
+
+    def percentile(self, q):
+        """Şerit başına q (0-100) yüzdelik sayım"""
+        if not self.filled:
+            return np.zeros(self.num_lanes, dtype=np.int64)
+        rank = max(1, int(np.ceil(q / 100.0 * self.filled)))
+        cumulative = np.cumsum(self.histogram, axis=1)
+        return np.argmax(cumulative >= rank, axis=1)
+
+    def max(self):
+        return self.percentile(100)
+
+
+class LaneStats:
+    """Sayım aşamasından beslenen şerit yoğunluğu istatistikleri.
+
+    windows: {"ad": kare sayısı} kayan pencereleri, ewma_alpha: üstel ortalama katsayısı.
+    """
+
+    def __init__(self, num_lanes, windows=None, ewma_alpha=0.1, max_count=63):
+        self.num_lanes = num_lanes
+        self.windows = {name: RollingWindow(num_lanes, size, max_count)
+                        for name, size in (windows or {"short": 30, "long": 900}).items()}
+        self.max_count = max_count
+        self.ewma_alpha = ewma_alpha
+        self.ewma = [0.0] * num_lanes
+        self.samples = 0
+
+    def update(self, counts):
+        """Bir karenin şerit sayımlarını ekler"""
+        counts = [min(int(count), self.max_count) for count in counts]
+        alpha = self.ewma_alpha if self.samples else 1.0
+        for lane in range(self.num_lanes):
+            self.ewma[lane] += alpha * (counts[lane] - self.ewma[lane])
+        for window in self.windows.values():
+            window.update(counts)
+        self.samples += 1
+
+    def mean(self, window="short"):
+        return self.windows[window].mean()
+
+    def percentile(self, q, window="long"):
+        return self.windows[window].percentile(q)
+
+    def snapshot(self):
+        """Pano / kayıt için şerit başına özet"""
+        data = {"ewma": np.array(self.ewma)}
+        for name, window in self.windows.items():
+            data[f"{name}_mean"] = window.mean()
+            data[f"{name}_p50"] = window.percentile(50)
+            data[f"{name}_p95"] = window.percentile(95)
+        return data
+
+    def summary(self, names=("Sol", "Sağ")):
+        """Konsol için kısa özet satırı: şerit başına pencere ortalamaları, p95 ve EWMA"""
+        parts = []
+        for lane in range(self.num_lanes):
+            name = names[lane] if lane < len(names) else f"Şerit {lane}"
+            windows = ", ".join(f"{window_name} {window.mean()[lane]:.1f} (p95 {window.percentile(95)[lane]})"
+                                for window_name, window in self.windows.items())
+            parts.append(f"{name}: {windows}, ewma {self.ewma[lane]:.1f}")
+        return " | ".join(parts)
@@ -0,0 +1,151 @@
+import threading
+
+import cv2
+
+LIVE_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://")
+
+
+def is_live_source(source):
+    """Canlı yayın (ağ akışı) ise True, video dosyası ise False"""
+    return str(source).startswith(LIVE_PREFIXES)
+
+
+def open_capture(source, api_preference=cv2.CAP_FFMPEG):
+    """Canlı kaynak için başlatılmış LatestFrameGrabber, dosya için SequentialCapture döner"""
+    if is_live_source(source):
+        return LatestFrameGrabber(source, api_preference).start()
+    return SequentialCapture(source, api_preference)
+
+
+class LatestFrameGrabber:
+    """Canlı yayından arka planda sürekli kare okur, yalnızca en yeni kareyi tutar.
+
+    Çıkarım kameradan yavaş kaldığında OpenCV'nin iç tamponu dolar ve sayımlar
+    gerçeğin saniyelerce gerisinde kalır. Bu sınıf tamponu sürekli boşaltır;
+    tüketilmeden üzerine yazılan kareler "atlanan" olarak sayılır.
+    """
+
+    def __init__(self, source, api_preference=cv2.CAP_FFMPEG):
+        self.cap = cv2.VideoCapture(source, api_preference)
+        # Destekleyen arka uçlarda iç tamponu küçült
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self._condition = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._last_read_id = 0
+        self._ended = False
+        self._running = False
+        self._thread = None
+
+        # Sayaçlar
+        self.grabbed_frames = 0
+        self.dropped_frames = 0
+        self.processed_frames = 0
+
+    @property
+    def ended(self):
+        """Kaynak bittiyse ve okunmamış kare kalmadıysa True"""
+        with self._condition:
+            return self._ended and self._frame_id == self._last_read_id
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def start(self):
+        """Okuma iş parçacığını başlatır"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._grab_loop, name="latest-frame-grabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _grab_loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            with self._condition:
+                if not ret:
+                    self._ended = True
+                    self._condition.notify_all()
+                    break
+                # Önceki kare okunmadan yenisi geldiyse eskisi atlanmış olur
+                if self._frame_id > self._last_read_id:
+                    self.dropped_frames += 1
+                self._frame = frame
+                self._frame_id += 1
+                self.grabbed_frames += 1
+                self._condition.notify_all()
+
+    def read(self, timeout=None):
+        """cv2.VideoCapture.read ile aynı imza: en yeni kareyi bekler ve döner"""
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._frame_id > self._last_read_id or self._ended,
+                timeout=timeout
+            )
+            if not ready or self._frame_id == self._last_read_id:
+                return False, None
+            self._last_read_id = self._frame_id
+            self.processed_frames += 1
+            return True, self._frame
+
+    def stats(self):
+        """Okunan, atlanan ve işlenen kare sayılarını döner"""
+        return {
+            "grabbed": self.grabbed_frames,
+            "dropped": self.dropped_frames,
+            "processed": self.processed_frames,
+        }
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.cap.release()
+
+
+class SequentialCapture:
+    """Video dosyasını kare atlamadan sırayla okur; LatestFrameGrabber ile aynı arayüz.
+
+    Dosyada gerçek zaman sınırı yoktur; arka planda okuyan bir iş parçacığı
+    çözücüyü çıkarımın önüne geçirir ve kareleri atlatarak sayımları bozar.
+    """
+
+    def __init__(self, source, api_preference=cv2.CAP_FFMPEG):
+        self.cap = cv2.VideoCapture(source, api_preference)
+        self._ended = False
+        self.processed_frames = 0
+
+    @property
+    def ended(self):
+        return self._ended
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def start(self):
+        return self
+
+    def read(self, timeout=None):
+        """Sıradaki kareyi okur (timeout yok sayılır)"""
+        if self._ended:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret:
+            self._ended = True
+            return False, None
+        self.processed_frames += 1
+        return True, frame
+
+    def stats(self):
+        return {"grabbed": self.processed_frames, "dropped": 0, "processed": self.processed_frames}
+
+    def release(self):
+        self.cap.release()
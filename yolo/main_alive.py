@@ -1,20 +1,96 @@
+import time
+
+# Başlangıç dökümü betiğin ilk satırından ölçülür
+STARTUP_ORIGIN = time.perf_counter()
+
+import os
 import cv2
 import numpy as np
-from ultralytics import YOLO
-import time
+from live_capture import LatestFrameGrabber, is_live_source
+from lane_counter import LaneCounter
+from lane_stats import LaneStats
+from flow_counter import FlowCounter, default_lines
+from track_registry import TrackRegistry
+from speed_estimator import SpeedEstimator
+from roi import RoiLetterbox, roi_bounds, roi_outline
+from tiled_detector import TiledDetector, TiledTracker
+from model_runtime import load_model
+from skip_scheduler import AdaptiveSkipScheduler
+from track_predictor import ConstantVelocityPredictor
+from overlay import InfoPanelRenderer
+from metrics import StageMetrics, StartupTimer
 
 # --- AYARLAR ---
 SKIP_RATE = 2        # Her 2 karede bir takip işlemi (Performans için)
+ADAPTIVE_SKIP = True # True: adım çıkarım süresi ve sahne hareketine göre 1..MAX_SKIP_RATE arası ayarlanır
+MAX_SKIP_RATE = 8
+TARGET_FPS = 25      # Canlı yayında ulaşılmak istenen işlem hızı
+INTERPOLATE_TRACKS = True # True: atlanan karelerde kutular sabit hızla ileri taşınır
 CONFIDENCE = 0.35    # Algılama hassasiyeti
 
+# --- MODEL ÇALIŞMA ORTAMI ---
+MODEL_PATH = 'yolov8n.pt'
+# "torch": PyTorch | "onnx": ONNX Runtime | "openvino": Intel CPU'lar için (ilk çalıştırmada dışa aktarılır)
+MODEL_RUNTIME = "torch"
+MODEL_INT8 = False    # INT8 nicemleme (yalnızca onnx / openvino)
+MODEL_THREADS = None  # CPU iş parçacığı sayısı (None: kütüphane varsayılanı)
+MODEL_WARM_CACHE = True  # PyTorch: Conv+BN birleştirilmiş kopyayı diskte tut (yeniden başlatmada fuse yok)
+TRACKER_CONFIG = "bytetrack.yaml"  # model.track takipçisi (ısınma da aynı yapılandırmayla yapılır)
+
+# --- İLGİ ALANI (ROI) ---
+# None: tüm kare. (x1, y1, x2, y2) dikdörtgeni veya [(x, y), ...] poligonu; dışındaki bölge modele verilmez
+ROI = None
+IMGSZ = 640  # Modelin giriş boyutu (uzun kenar)
+
+# --- KAROLU (TILED) ÇIKARIM ---
+# None: kapalı. (satır, sütun): kare (ROI varsa sınırlayıcı dikdörtgeni) örtüşen karolara bölünür,
+# karolar + tüm kare tek partide işlenir. Uzak araçların kaybolduğu 4K kameralar için.
+TILE_LAYOUT = None
+TILE_OVERLAP = 0.2  # Komşu karoların örtüşme oranı
+
+# --- ÖLÇÜM AYARLARI ---
+# http://127.0.0.1:9109/metrics; TRAFIK_METRICS_PORT ortam değişkeniyle değiştirilir (0: kapalı).
+# main_video ve main_alive aynı makinede birlikte çalışabilsin diye portları farklıdır.
+METRICS_PORT = int(os.environ.get("TRAFIK_METRICS_PORT", 9109))
+METRICS_SUMMARY_INTERVAL = 10   # Gecikme özet satırı aralığı (saniye)
+
 # --- YOĞUNLUK EŞİKLERİ ---
 LIMIT_LOW = 4
 LIMIT_MID = 10
+# Durum (AKICI/NORMAL/YOGUN) anlık sayıya göre değil kayan ortalamaya göre belirlenir
+DENSITY_WINDOW = 30      # Kısa pencere (kare) - durum sınıflandırması
+DENSITY_HISTORY = 900    # Uzun pencere (kare) - yüzdelikler
+DENSITY_EWMA_ALPHA = 0.1
+
+# --- ŞERİTLER ---
+# None: görüntü mid_x'ten sol/sağ ikiye bölünür.
+# Aksi halde [(x, y), ...] poligon listesi; ilk iki poligon SOL ve SAĞ şerit olarak gösterilir.
+LANES = None
+
+# --- AKIŞ SAYIMI (ÇİZGİ GEÇİŞİ) ---
+# None: her yarıda FLOW_LINE_Y yüksekliğinde yatay çizgi. Aksi halde [((x1, y1), (x2, y2)), ...]
+FLOW_LINES = None
+FLOW_LINE_Y = 0.6  # Varsayılan çizgilerin görüntü yüksekliğine oranı
+COLOR_FLOW = (255, 0, 255)
+
+# --- TAKİP KAYDI ---
+TRACK_CAPACITY = 1024  # Aynı anda tutulan en fazla takip ID'si
+TRACK_MAX_AGE = 90     # Bu kadar kare görülmeyen ID silinir
+
+# --- HIZ TAHMİNİ ---
+# None: kapalı. Aksi halde yol düzleminde en az 4 noktanın görüntü (piksel) ve yol (metre) koordinatları:
+# {"image": [(x, y), ...], "world": [(x_m, y_m), ...]}
+SPEED_CALIBRATION = None
+SPEED_WINDOW = 15  # Hız bu kadar karelik konum geçmişinden hesaplanır
 
 # --- VİDEO KAYNAĞI ---
 # SOURCE_URL = "https://canliyayin.bursa.bel.tr/..." # Canlı yayın linkiniz buraya
 SOURCE_URL = "vehicle-counting.mp4" # Video dosyanız
 
+# Canlı yayında sadece en yeni kare işlenir, bayat kareler atlanır.
+# Video dosyalarında her kare işlensin diye kapalı kalır.
+LIVE_CAPTURE = is_live_source(SOURCE_URL)
+
 # --- RENK PALETİ (BGR) ---
 COLOR_LEFT = (255, 191, 0)   # Sol şerit rengi
 COLOR_RIGHT = (0, 165, 255)  # Sağ şerit rengi
@@ -23,12 +99,25 @@ COLOR_YELLOW = (0, 255, 255)
 COLOR_RED = (0, 0, 255)
 COLOR_WHITE = (255, 255, 255)
 
+# --- ÖLÇÜMLER ---
+startup = StartupTimer(STARTUP_ORIGIN)
+startup.mark("imports")
+metrics = StageMetrics()
+if METRICS_PORT and metrics.start_http_server(METRICS_PORT) is not None:
+    print(f"Metrikler: http://127.0.0.1:{METRICS_PORT}/metrics")
+
 # 1. MODEL VE VİDEO BAŞLATMA
 print("Model yükleniyor...")
-model = YOLO('yolov8n.pt')
+# Model kaynak açılmadan önce ısıtılır: canlı yayında bekleyen kareler birikmez
+model = load_model(MODEL_PATH, MODEL_RUNTIME, int8=MODEL_INT8, threads=MODEL_THREADS, imgsz=IMGSZ,
+                   warm_cache=MODEL_WARM_CACHE, tracker=None if TILE_LAYOUT else TRACKER_CONFIG, timer=startup)
 
 print(f"Video açılıyor: {SOURCE_URL}")
-cap = cv2.VideoCapture(SOURCE_URL, cv2.CAP_FFMPEG)
+if LIVE_CAPTURE:
+    cap = LatestFrameGrabber(SOURCE_URL).start()
+else:
+    cap = cv2.VideoCapture(SOURCE_URL, cv2.CAP_FFMPEG)
+startup.mark("capture")
 
 # Pencere ayarı (Boyutlandırılabilir olması için WINDOW_NORMAL şart)
 window_name = "Canlı Trafik Analizi"
@@ -39,22 +128,34 @@ cv2.resizeWindow(window_name, 1280, 720)
 # Hedef sınıflar (Araba, motosiklet, otobüs, kamyon)
 target_classes = [2, 3, 5, 7]
 
+skip_scheduler = AdaptiveSkipScheduler(target_fps=TARGET_FPS, max_stride=MAX_SKIP_RATE) if ADAPTIVE_SKIP else None
+track_predictor = ConstantVelocityPredictor() if INTERPOLATE_TRACKS else None
+info_panel = InfoPanelRenderer(width=330, height=175, alpha=0.85)
+
 # Değişkenler
 prev_frame_time = 0
 frame_counter = 0
-memory_boxes = []
-memory_ids = []
+memory_boxes = np.empty((0, 4), dtype=np.float32)
+memory_ids = np.empty(0, dtype=np.int32)
+lane_counter = None
+roi_letterbox = None
+tiled_tracker = None
+lane_stats = None
+flow_counter = None
+track_registry = TrackRegistry(capacity=TRACK_CAPACITY, max_age=TRACK_MAX_AGE)
+speed_estimator = SpeedEstimator.from_points(track_registry, SPEED_CALIBRATION["image"], SPEED_CALIBRATION["world"],
+                                             window=SPEED_WINDOW) if SPEED_CALIBRATION else None
 
 # --- YARDIMCI FONKSİYONLAR ---
-def draw_transparent_box(img, x, y, w, h, color, alpha=0.5):
-    """Yarı saydam siyah arka plan kutusu çizer"""
-    try:
-        sub_img = img[y:y+h, x:x+w]
-        white_rect = np.full(sub_img.shape, color, dtype=np.uint8)
-        res = cv2.addWeighted(sub_img, 1-alpha, white_rect, alpha, 1.0)
-        img[y:y+h, x:x+w] = res
-    except:
-        pass
+def draw_flow_lines(frame):
+    """Sayım çizgilerini ve çizgi başına toplam / dakikalık akışı çizer"""
+    rates = flow_counter.per_minute()
+    totals = flow_counter.total()
+    for (p1, p2), name, total, rate in zip(flow_counter.lines.astype(int), flow_counter.names, totals, rates):
+        cv2.line(frame, tuple(p1), tuple(p2), COLOR_FLOW, 2, cv2.LINE_AA)
+        cv2.putText(frame, f"{name}: {total} ({rate:.0f}/dk)", (int(p1[0]) + 10, int(p1[1]) - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_FLOW, 2, cv2.LINE_AA)
+
 
 def get_status_and_color(count):
     """Araç sayısına göre trafik durumunu belirler"""
@@ -65,9 +166,52 @@ def get_status_and_color(count):
     else:
         return "YOGUN", COLOR_RED
 
+
+def draw_roi(frame):
+    """ROI tanımlıysa sınırını çizer"""
+    if ROI is not None:
+        cv2.polylines(frame, [roi_outline(ROI)], True, (200, 200, 200), 1, cv2.LINE_AA)
+
+
+def detect_tiled(frame):
+    """Kareyi örtüşen karolarda tespit eder, karolar arası NMS sonrası ByteTrack'e verir"""
+    global tiled_tracker
+
+    start_time = time.perf_counter()
+    if tiled_tracker is None:
+        # Letterbox yoluyla aynı alan: ROI dikdörtgeni kırpılır, poligon dışı maskelenir
+        region, polygon = roi_bounds(ROI, frame.shape) if ROI is not None else (None, None)
+        detector = TiledDetector(model, TILE_LAYOUT, TILE_OVERLAP, region=region, imgsz=IMGSZ,
+                                 classes=target_classes, conf=CONFIDENCE, polygon=polygon)
+        tiled_tracker = TiledTracker(detector, frame_rate=TARGET_FPS)
+    boxes, ids = tiled_tracker.track(frame)
+    elapsed = time.perf_counter() - start_time
+    if skip_scheduler is not None:
+        skip_scheduler.record_inference(elapsed)
+
+    inference_time = tiled_tracker.detector.last_elapsed
+    metrics.observe("inference", inference_time)
+    metrics.observe("tracking", max(elapsed - inference_time, 0.0))
+    return boxes, ids
+
+
+def box_labels(ids, speeds):
+    """Kutu etiketleri: takip ID'si ve hız tahmini varsa km/sa"""
+    if speeds is None:
+        return [f"#{track_id}" for track_id in ids]
+    return [f"#{track_id} {speed:.0f} km/sa" if speed == speed else f"#{track_id}"
+            for track_id, speed in zip(ids, speeds)]
+
+
+def speed_summary(lane_speeds):
+    """Konsol için şerit başına ortalama hız satırı"""
+    return " | ".join(f"{name}: {'-' if speed != speed else f'{speed:.0f} km/sa'}"
+                      for name, speed in zip(("Sol", "Sağ"), lane_speeds))
+
 # --- ANA DÖNGÜ ---
 while True:
-    ret, frame = cap.read()
+    with metrics.timer("decode"):
+        ret, frame = cap.read()
 
     if not ret:
         print("Video bitti veya okunamadı. Çıkılıyor...")
@@ -86,78 +230,115 @@ while True:
     prev_frame_time = new_frame_time
 
     # --- TESPİT (ByteTrack) ---
-    if frame_counter % SKIP_RATE == 0:
-        results = model.track(
-            frame,
-            persist=True,
-            tracker="bytetrack.yaml",
-            verbose=False,
-            classes=target_classes,
-            conf=CONFIDENCE,
-            imgsz=640
-        )
-
-        if results[0].boxes.id is not None:
-            memory_boxes = results[0].boxes.xyxy.cpu().tolist()
-            memory_ids = results[0].boxes.id.int().cpu().tolist()
+    if skip_scheduler is not None:
+        run_detection = skip_scheduler.should_detect(frame)
+    else:
+        run_detection = frame_counter % SKIP_RATE == 0
+
+    if run_detection:
+        if TILE_LAYOUT:
+            memory_boxes, memory_ids = detect_tiled(frame)
         else:
-            memory_boxes = []
-            memory_ids = []
+            detect_start = time.perf_counter()
+            if roi_letterbox is None:
+                roi_letterbox = RoiLetterbox(frame.shape, ROI, imgsz=IMGSZ)
+            results = model.track(
+                roi_letterbox.prepare(frame),
+                persist=True,
+                tracker=TRACKER_CONFIG,
+                verbose=False,
+                classes=target_classes,
+                conf=CONFIDENCE,
+                imgsz=roi_letterbox.input_size
+            )
+            detect_elapsed = time.perf_counter() - detect_start
+            if skip_scheduler is not None:
+                skip_scheduler.record_inference(detect_elapsed)
+
+            # model.track süresi = ön işleme + çıkarım + son işleme (speed, ms) + ByteTrack
+            inference_time = sum(results[0].speed.values()) / 1000
+            metrics.observe("inference", inference_time)
+            metrics.observe("tracking", max(detect_elapsed - inference_time, 0.0))
+
+            if results[0].boxes.id is not None:
+                memory_boxes = roi_letterbox.to_frame(results[0].boxes.xyxy.cpu().numpy())
+                memory_ids = results[0].boxes.id.int().cpu().numpy()
+            else:
+                memory_boxes = np.empty((0, 4), dtype=np.float32)
+                memory_ids = np.empty(0, dtype=np.int32)
+
+        if track_predictor is not None:
+            track_predictor.update(memory_boxes, memory_ids, frame_counter)
+        current_boxes = memory_boxes
+    elif track_predictor is not None:
+        current_boxes, memory_ids = track_predictor.predict(frame_counter)
+    else:
+        current_boxes = memory_boxes
 
     # --- HESAPLAMA ---
-    instant_left = 0
-    instant_right = 0
-
-    for box in memory_boxes:
-        x1, y1, x2, y2 = map(int, box)
-        cx = int((x1 + x2) / 2)
-        if cx < mid_x:
-            instant_left += 1
+    if lane_counter is None:
+        lane_counter = (LaneCounter(LANES, bounds=(0, 0, width, height)) if LANES
+                        else LaneCounter.left_right(width, height, mid_x))
+        lane_stats = LaneStats(lane_counter.num_lanes, {"short": DENSITY_WINDOW, "long": DENSITY_HISTORY},
+                               ewma_alpha=DENSITY_EWMA_ALPHA)
+        flow_counter = FlowCounter(FLOW_LINES or default_lines(width, height, mid_x, FLOW_LINE_Y),
+                                   track_registry, names=None if FLOW_LINES else ["SOL", "SAG"])
+
+    with metrics.timer("counting"):
+        lane_counts, lane_masks = lane_counter.count(current_boxes)
+        instant_left, instant_right = int(lane_counts[0]), int(lane_counts[1])
+        box_lanes = lane_counter.lane_index(lane_masks)
+        lane_stats.update(lane_counts)
+        density = lane_stats.mean("short")
+        slots = track_registry.update(current_boxes, memory_ids, frame_counter)
+        flow_counter.update(slots, new_frame_time)
+        if speed_estimator is not None:
+            speeds = speed_estimator.update(slots, new_frame_time)
+            lane_speeds = SpeedEstimator.lane_means(speeds, box_lanes, lane_counter.num_lanes)
         else:
-            instant_right += 1
+            speeds = lane_speeds = None
 
-    status_text_L, status_color_L = get_status_and_color(instant_left)
-    status_text_R, status_color_R = get_status_and_color(instant_right)
+    status_text_L, status_color_L = get_status_and_color(density[0])
+    status_text_R, status_color_R = get_status_and_color(density[1])
 
     # --- GÖRSELLEŞTİRME ---
+    overlay_start = time.perf_counter()
 
     # 1. Ortadaki Çizgi
     cv2.line(frame, (mid_x, 0), (mid_x, height), (200, 200, 200), 2, cv2.LINE_AA)
+    draw_roi(frame)
 
     # 2. Araç Kutuları
-    for box, track_id in zip(memory_boxes, memory_ids):
+    for box, label, lane in zip(current_boxes, box_labels(memory_ids, speeds), box_lanes):
         x1, y1, x2, y2 = map(int, box)
-        cx = int((x1 + x2) / 2)
-        
-        box_color = COLOR_LEFT if cx < mid_x else COLOR_RIGHT
+
+        box_color = COLOR_LEFT if lane == 0 else COLOR_RIGHT
         
         cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2, cv2.LINE_AA)
-        cv2.putText(frame, f"#{track_id}", (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2, cv2.LINE_AA)
-
-    # 3. Bilgi Paneli (Sol Üst Köşe)
-    box_x, box_y = 0, 0
-    draw_transparent_box(frame, box_x, box_y, 330, 175, (0, 0, 0), alpha=0.85)
-
-    # Başlık
-    cv2.putText(frame, "BOLGESEL TRAFIK ANALIZI", (box_x + 15, box_y + 25), cv2.FONT_HERSHEY_DUPLEX, 0.6, COLOR_WHITE, 1, cv2.LINE_AA)
-    cv2.line(frame, (box_x + 15, box_y + 35), (box_x + 315, box_y + 35), (150, 150, 150), 1, cv2.LINE_AA)
-
-    # Sol Şerit Bilgisi
-    line_y_1 = box_y + 65
-    cv2.putText(frame, "SOL SERIT", (box_x + 15, line_y_1), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_LEFT, 1, cv2.LINE_AA)
-    cv2.putText(frame, f"Arac: {instant_left}", (box_x + 130, line_y_1), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE, 1, cv2.LINE_AA)
-    cv2.putText(frame, status_text_L, (box_x + 230, line_y_1), cv2.FONT_HERSHEY_DUPLEX, 0.7, status_color_L, 2, cv2.LINE_AA)
-
-    # Sağ Şerit Bilgisi
-    line_y_2 = box_y + 105
-    cv2.putText(frame, "SAG SERIT", (box_x + 15, line_y_2), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RIGHT, 1, cv2.LINE_AA)
-    cv2.putText(frame, f"Arac: {instant_right}", (box_x + 130, line_y_2), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE, 1, cv2.LINE_AA)
-    cv2.putText(frame, status_text_R, (box_x + 230, line_y_2), cv2.FONT_HERSHEY_DUPLEX, 0.7, status_color_R, 2, cv2.LINE_AA)
-
-    # FPS Alt Bilgi
-    line_y_3 = box_y + 135
-    cv2.line(frame, (box_x + 15, line_y_3), (box_x + 315, line_y_3), (150, 150, 150), 1, cv2.LINE_AA)
-    cv2.putText(frame, f"Sistem FPS: {int(fps)}", (box_x + 15, line_y_3 + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+        cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2, cv2.LINE_AA)
+
+    # Akış çizgileri
+    draw_flow_lines(frame)
+
+    # 3. Bilgi Paneli (Sol Üst Köşe, sabit kısımlar önbellekten)
+    info_panel.render(frame, instant_left, (status_text_L, status_color_L), instant_right, (status_text_R, status_color_R), fps)
+
+    if LIVE_CAPTURE:
+        cv2.putText(frame, f"Atlanan: {cap.dropped_frames}", (150, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+    if skip_scheduler is not None:
+        cv2.putText(frame, f"Adim: {skip_scheduler.stride}", (255, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+
+    metrics.observe("overlay", time.perf_counter() - overlay_start)
+    report = startup.report_once("first_frame")
+    if report:
+        print(report)
+    summary = metrics.maybe_summary(METRICS_SUMMARY_INTERVAL)
+    if summary:
+        print(summary)
+        print("Yoğunluk | " + lane_stats.summary())
+        print("Akış | " + flow_counter.summary())
+        if lane_speeds is not None:
+            print("Hız | " + speed_summary(lane_speeds))
 
     # --- EKRANA BASMA (Dinamik Boyutlandırma) ---
     
@@ -199,4 +380,7 @@ while True:
 # --- KAPANIŞ ---
 cap.release()
 cv2.destroyAllWindows()
+if LIVE_CAPTURE:
+    stats = cap.stats()
+    print(f"Canlı yayın: {stats['grabbed']} kare okundu, {stats['processed']} işlendi, {stats['dropped']} atlandı.")
 print("Program sonlandırıldı.")
\ No newline at end of file
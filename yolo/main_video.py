@@ -1,28 +1,124 @@
+import time
+
+# Başlangıç dökümü betiğin ilk satırından ölçülür
+STARTUP_ORIGIN = time.perf_counter()
+
+import os
 import cv2
 import sys
 import numpy as np
-from ultralytics import YOLO
-import time
+import queue
 
 sys.path.append(r"D:\Github Repo\Bursa_Akilli_Sehir_Hackathon_Projesi\iot")
 from Transmission2 import MQTTClient, StateBarrier, DirectionBarrier, MQTTConfig
+from pipeline import FramePipeline
+from lane_counter import LaneCounter
+from lane_stats import LaneStats
+from flow_counter import FlowCounter, default_lines
+from track_registry import TrackRegistry
+from speed_estimator import SpeedEstimator
+from roi import RoiLetterbox, roi_bounds, roi_outline
+from tiled_detector import TiledDetector, TiledTracker
+from model_runtime import load_model
+from skip_scheduler import AdaptiveSkipScheduler
+from track_predictor import ConstantVelocityPredictor
+from overlay import InfoPanelRenderer
+from video_sink import open_sink
+from metrics import StageMetrics, StartupTimer
+from barrier_engine import BarrierDecisionEngine
 
 # --- AYARLAR ---
 SKIP_RATE = 1
+# True: tespit adımı sahne hareketine göre 1..MAX_SKIP_RATE arasında ayarlanır. Dosya işlenirken
+# gerçek zaman sınırı olmadığından çıkarım süresi adımı büyütmez; varsayılan kapalı (tüm kareler, tam doğruluk)
+ADAPTIVE_SKIP = False
+MAX_SKIP_RATE = 6
+# True: atlanan karelerde kutular son iki tespitten hesaplanan hızla ileri taşınır
+INTERPOLATE_TRACKS = True
 CONFIDENCE = 0.25
 
+# --- İŞ HATTI AYARLARI ---
+# True: okuma, tespit ve çizim+kayıt ayrı iş parçacıklarında örtüşerek çalışır
+PIPELINE_MODE = True
+PIPELINE_QUEUE_SIZE = 8  # Aşamalar arası kuyruk kapasitesi (kare)
+
+# --- MODEL ÇALIŞMA ORTAMI ---
+MODEL_PATH = 'yolov8n.pt'
+# "torch": PyTorch | "onnx": ONNX Runtime | "openvino": Intel CPU'lar için (ilk çalıştırmada dışa aktarılır)
+MODEL_RUNTIME = "torch"
+MODEL_INT8 = False    # INT8 nicemleme (yalnızca onnx / openvino)
+MODEL_THREADS = None  # CPU iş parçacığı sayısı (None: kütüphane varsayılanı)
+MODEL_WARM_CACHE = True  # PyTorch: Conv+BN birleştirilmiş kopyayı diskte tut (yeniden başlatmada fuse yok)
+TRACKER_CONFIG = "bytetrack.yaml"  # model.track takipçisi (ısınma da aynı yapılandırmayla yapılır)
+
+# --- İLGİ ALANI (ROI) ---
+# None: tüm kare. (x1, y1, x2, y2) dikdörtgeni veya [(x, y), ...] poligonu; dışındaki bölge modele verilmez
+ROI = None
+IMGSZ = 640  # Modelin giriş boyutu (uzun kenar)
+
+# --- KAROLU (TILED) ÇIKARIM ---
+# None: kapalı. (satır, sütun): kare (ROI varsa sınırlayıcı dikdörtgeni) örtüşen karolara bölünür,
+# karolar + tüm kare tek partide işlenir. Uzak araçların kaybolduğu 4K kameralar için.
+TILE_LAYOUT = None
+TILE_OVERLAP = 0.2  # Komşu karoların örtüşme oranı
+
+# --- ÖLÇÜM AYARLARI ---
+# http://127.0.0.1:9108/metrics; TRAFIK_METRICS_PORT ortam değişkeniyle değiştirilir (0: kapalı).
+# main_video ve main_alive aynı makinede birlikte çalışabilsin diye portları farklıdır.
+METRICS_PORT = int(os.environ.get("TRAFIK_METRICS_PORT", 9108))
+METRICS_SUMMARY_INTERVAL = 10   # Gecikme özet satırı aralığı (saniye)
+
 # --- YOĞUNLUK EŞİKLERİ ---
 LIMIT_LOW = 4
 LIMIT_MID = 10
+# Durum (AKICI/NORMAL/YOGUN) anlık sayıya göre değil kayan ortalamaya göre belirlenir
+DENSITY_WINDOW = 30      # Kısa pencere (kare) - durum sınıflandırması
+DENSITY_HISTORY = 900    # Uzun pencere (kare) - yüzdelikler
+DENSITY_EWMA_ALPHA = 0.1
+
+# --- ŞERİTLER ---
+# None: görüntü mid_x'ten sol/sağ ikiye bölünür.
+# Aksi halde [(x, y), ...] poligon listesi; ilk iki poligon SOL ve SAĞ şerit olarak gösterilir.
+LANES = None
+
+# --- AKIŞ SAYIMI (ÇİZGİ GEÇİŞİ) ---
+# None: her yarıda FLOW_LINE_Y yüksekliğinde yatay çizgi. Aksi halde [((x1, y1), (x2, y2)), ...]
+FLOW_LINES = None
+FLOW_LINE_Y = 0.6  # Varsayılan çizgilerin görüntü yüksekliğine oranı
+COLOR_FLOW = (255, 0, 255)
+
+# --- TAKİP KAYDI ---
+TRACK_CAPACITY = 1024  # Aynı anda tutulan en fazla takip ID'si
+TRACK_MAX_AGE = 90     # Bu kadar kare görülmeyen ID silinir
+
+# --- HIZ TAHMİNİ ---
+# None: kapalı. Aksi halde yol düzleminde en az 4 noktanın görüntü (piksel) ve yol (metre) koordinatları:
+# {"image": [(x, y), ...], "world": [(x_m, y_m), ...]}
+SPEED_CALIBRATION = None
+SPEED_WINDOW = 15  # Hız bu kadar karelik konum geçmişinden hesaplanır
 
 # --- BARIYER KONTROL EŞİKLERİ ---
 # Bir taraf yoğunken, diğer tarafın bariyerini aç
-BARRIER_THRESHOLD = 8  # Bu sayının üstündeki yoğunluk bariyer açılmasını tetikler
+BARRIER_THRESHOLD = 8  # Ortalama yoğunluk bu sayının üstüne çıkınca bariyer açılır
+BARRIER_RELEASE_THRESHOLD = 5  # Ortalama bu sayının altına inince bariyer kapanır (histerezis)
+BARRIER_MIN_DWELL = 5.0  # Bir bariyer durumu en az bu kadar korunur (saniye)
+BARRIER_SMOOTHING_WINDOW = 15  # Yoğunluk ortalaması için kare sayısı
+# Hız tahmini açıksa: şerit ortalama hızı bunun altındayken açılır, üstüne çıkınca kapanır (km/sa)
+BARRIER_SLOW_SPEED = 20
+BARRIER_RELEASE_SPEED = 35
+MQTT_SEND_INTERVAL = 2  # Aynı bariyere iki komut arası en az süre (saniye, yön başına)
 
 # --- GÜNCEL YAYIN LİNKİ ---
 SOURCE_URL = "vehicle-counting.mp4"
 OUTPUT_FILENAME = "trafik_analiz_sonucu.mp4"
 
+# --- KAYIT AYARLARI ---
+# "opencv": cv2.VideoWriter (mp4v) | "ffmpeg": ffmpeg sürecine ham kare aktarımı | "none": kayıt yok
+OUTPUT_MODE = "opencv"
+ASYNC_ENCODE = True         # Kodlamayı ayrı iş parçacığında yap
+FFMPEG_CODEC = "libx264"    # Donanım kodlayıcı için ör. "h264_nvenc", "h264_qsv"
+FFMPEG_PRESET = "veryfast"  # x264 adı; nvenc / qsv için karşılığına çevrilir
+
 # --- RENK PALETİ (BGR) ---
 COLOR_LEFT = (255, 191, 0)
 COLOR_RIGHT = (0, 165, 255)
@@ -31,12 +127,22 @@ COLOR_YELLOW = (0, 255, 255)
 COLOR_RED = (0, 0, 255)
 COLOR_WHITE = (255, 255, 255)
 
+# --- ÖLÇÜMLER ---
+startup = StartupTimer(STARTUP_ORIGIN)
+startup.mark("imports")
+metrics = StageMetrics()
+if METRICS_PORT and metrics.start_http_server(METRICS_PORT) is not None:
+    print(f"Metrikler: http://127.0.0.1:{METRICS_PORT}/metrics")
+
 # 1. MODEL VE VİDEO BAŞLATMA
 print("Model yükleniyor...")
-model = YOLO('yolov8n.pt')
+# Model kaynak açılmadan önce ısıtılır: canlı yayında bekleyen kareler birikmez
+model = load_model(MODEL_PATH, MODEL_RUNTIME, int8=MODEL_INT8, threads=MODEL_THREADS, imgsz=IMGSZ,
+                   warm_cache=MODEL_WARM_CACHE, tracker=None if TILE_LAYOUT else TRACKER_CONFIG, timer=startup)
 
 print(f"Video kaynağı okunuyor: {SOURCE_URL}")
 cap = cv2.VideoCapture(SOURCE_URL, cv2.CAP_FFMPEG)
+startup.mark("capture")
 
 # --- VİDEO KAYIT AYARLARI ---
 frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -48,16 +154,34 @@ if original_fps == 0:
 
 print(f"Kayıt başlatılıyor... Çözünürlük: {frame_width}x{frame_height}, FPS: {original_fps}")
 
-fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-out = cv2.VideoWriter(OUTPUT_FILENAME, fourcc, original_fps, (frame_width, frame_height))
+if OUTPUT_MODE == "ffmpeg":
+    sink_options = {"codec": FFMPEG_CODEC, "preset": FFMPEG_PRESET}
+elif OUTPUT_MODE == "opencv":
+    sink_options = {"fourcc": 'mp4v'}
+else:
+    sink_options = {}
+out = open_sink(OUTPUT_MODE, OUTPUT_FILENAME, original_fps, (frame_width, frame_height),
+                threaded=ASYNC_ENCODE, on_write=lambda seconds: metrics.observe("encode", seconds), **sink_options)
 
 target_classes = [2, 3, 5, 7]
 
+skip_scheduler = AdaptiveSkipScheduler(target_fps=None, max_stride=MAX_SKIP_RATE) if ADAPTIVE_SKIP else None
+track_predictor = ConstantVelocityPredictor() if INTERPOLATE_TRACKS else None
+info_panel = InfoPanelRenderer(width=330, height=200, alpha=0.85)
+
 # Değişkenler
 prev_frame_time = 0
 frame_counter = 0
-memory_boxes = []
-memory_ids = []
+memory_boxes = np.empty((0, 4), dtype=np.float32)
+memory_ids = np.empty(0, dtype=np.int32)
+lane_counter = None
+roi_letterbox = None
+tiled_tracker = None
+lane_stats = None
+flow_counter = None
+track_registry = TrackRegistry(capacity=TRACK_CAPACITY, max_age=TRACK_MAX_AGE)
+speed_estimator = SpeedEstimator.from_points(track_registry, SPEED_CALIBRATION["image"], SPEED_CALIBRATION["world"],
+                                             window=SPEED_WINDOW) if SPEED_CALIBRATION else None
 
 # --- MQTT İStemcisi Başlat ---
 print("MQTT bağlantısı kuruluyor...")
@@ -67,29 +191,37 @@ mqtt_client = MQTTClient(
     topic=MQTTConfig.TOPIC
 )
 
-if not mqtt_client.connect():
-    print("UYARI: MQTT bağlantısı kurulamadı. Sistem MQTT olmadan devam edecek.")
-    mqtt_enabled = False
-else:
+if mqtt_client.connect():
     print("MQTT bağlantısı başarılı!")
-    mqtt_enabled = True
-
-# Bariyer durumu takibi (gereksiz mesaj göndermeyi önlemek için)
-last_left_barrier_state = None
-last_right_barrier_state = None
-last_mqtt_send_time = 0
-MQTT_SEND_INTERVAL = 2  # En az 2 saniyede bir mesaj gönder
+else:
+    # İstemci arka planda yeniden bağlanmayı dener; bu sırada komutlar tamponlanır
+    print("UYARI: MQTT bağlantısı kurulamadı. Arka planda yeniden denenecek, komutlar bekletilecek.")
+startup.mark("mqtt")
+
+# Bariyer kararları (bariyer başına yumuşatma, histerezis, bekleme ve hız sınırı)
+barrier_engine = BarrierDecisionEngine(
+    open_threshold=BARRIER_THRESHOLD,
+    close_threshold=BARRIER_RELEASE_THRESHOLD,
+    min_dwell=BARRIER_MIN_DWELL,
+    speed_window=BARRIER_SMOOTHING_WINDOW,
+    min_interval=MQTT_SEND_INTERVAL,
+    slow_speed=BARRIER_SLOW_SPEED if speed_estimator is not None else None,
+    release_speed=BARRIER_RELEASE_SPEED if speed_estimator is not None else None
+)
+# Sol taraf yoğun -> Sağ bariyeri aç (sağdan gelen trafiği yavaşlat), sağ için tersi
+barrier_engine.add_barrier(DirectionBarrier.RIGHT, lane=0)
+barrier_engine.add_barrier(DirectionBarrier.LEFT, lane=1)
 
 
 # --- YARDIMCI FONKSİYONLAR ---
-def draw_transparent_box(img, x, y, w, h, color, alpha=0.5):
-    try:
-        sub_img = img[y:y + h, x:x + w]
-        white_rect = np.full(sub_img.shape, color, dtype=np.uint8)
-        res = cv2.addWeighted(sub_img, 1 - alpha, white_rect, alpha, 1.0)
-        img[y:y + h, x:x + w] = res
-    except:
-        pass
+def draw_flow_lines(frame):
+    """Sayım çizgilerini ve çizgi başına toplam / dakikalık akışı çizer"""
+    rates = flow_counter.per_minute()
+    totals = flow_counter.total()
+    for (p1, p2), name, total, rate in zip(flow_counter.lines.astype(int), flow_counter.names, totals, rates):
+        cv2.line(frame, tuple(p1), tuple(p2), COLOR_FLOW, 2, cv2.LINE_AA)
+        cv2.putText(frame, f"{name}: {total} ({rate:.0f}/dk)", (int(p1[0]) + 10, int(p1[1]) - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_FLOW, 2, cv2.LINE_AA)
 
 
 def get_status_and_color(count):
@@ -101,175 +233,314 @@ def get_status_and_color(count):
         return "YOGUN", COLOR_RED
 
 
-def control_barriers(left_count, right_count, current_time):
-    """Trafik yoğunluğuna göre bariyer kontrolü"""
-    global last_left_barrier_state, last_right_barrier_state, last_mqtt_send_time
+def draw_roi(frame):
+    """ROI tanımlıysa sınırını çizer"""
+    if ROI is not None:
+        cv2.polylines(frame, [roi_outline(ROI)], True, (200, 200, 200), 1, cv2.LINE_AA)
+
+
+def box_labels(ids, speeds):
+    """Kutu etiketleri: takip ID'si ve hız tahmini varsa km/sa"""
+    if speeds is None:
+        return [f"#{track_id}" for track_id in ids]
+    return [f"#{track_id} {speed:.0f} km/sa" if speed == speed else f"#{track_id}"
+            for track_id, speed in zip(ids, speeds)]
+
+
+def speed_summary(lane_speeds):
+    """Konsol için şerit başına ortalama hız satırı"""
+    return " | ".join(f"{name}: {'-' if speed != speed else f'{speed:.0f} km/sa'}"
+                      for name, speed in zip(("Sol", "Sağ"), lane_speeds))
+
 
-    if not mqtt_enabled:
-        return
+def send_order(status, direction):
+    """Bariyer komutunu beklemeden kuyruğa verir; onay sonradan ack_queue'dan okunur"""
+    with metrics.timer("mqtt_publish"):
+        return mqtt_client.SendOrderAsync(status, direction)
 
-    # Minimum gönderim aralığını kontrol et
-    if current_time - last_mqtt_send_time < MQTT_SEND_INTERVAL:
-        return
 
-    # Sol taraf yoğun mu?
-    if left_count > BARRIER_THRESHOLD:
-        # Sol taraf yoğun -> Sağ bariyeri aç (sağdan gelen trafiği yavaşlat)
-        new_right_state = StateBarrier.MOVE
-        if new_right_state != last_right_barrier_state:
-            mqtt_client.SendOrder(StateBarrier.MOVE, DirectionBarrier.RIGHT)
-            last_right_barrier_state = new_right_state
-            last_mqtt_send_time = current_time
-            print(f"🚦 SAĞ BARİYER AÇILDI (Sol taraf yoğun: {left_count} araç)")
+def drain_mqtt_acks():
+    """Gelen yayın onaylarını/hatalarını işler (video döngüsünü bekletmez)"""
+    while True:
+        try:
+            result, status, direction, latency, reason = mqtt_client.ack_queue.get_nowait()
+        except queue.Empty:
+            return
+        if result == "ack":
+            metrics.observe("mqtt_ack", latency)
+        elif result == "superseded":
+            # Bağlantı yokken aynı yöne daha yeni bir komut verildi
+            continue
+        else:
+            print(f"UYARI: Bariyer komutu iletilemedi: {status.name} {direction.name} ({reason})")
+
+
+def control_barriers(current_time, lane_speeds=None):
+    """Trafik yoğunluğuna (ve hız tahmini açıksa şerit hızına) göre bariyer kontrolü"""
+    for direction, is_open, level in barrier_engine.update(lane_stats.mean("barrier"), current_time, lane_speeds):
+        send_order(StateBarrier.MOVE if is_open else StateBarrier.STOP, direction)
+        side = "SAĞ" if direction == DirectionBarrier.RIGHT else "SOL"
+        watched = "Sol" if direction == DirectionBarrier.RIGHT else "Sağ"
+        if is_open:
+            print(f"🚦 {side} BARİYER AÇILDI ({watched} taraf yoğun: ort. {level:.1f} araç)")
+        else:
+            print(f"🚦 {side} BARİYER KAPATILDI ({watched} taraf normal: ort. {level:.1f} araç)")
+
+
+def should_detect(index, frame):
+    """Bu karede tespit çalıştırılıp çalıştırılmayacağına karar verir"""
+    if skip_scheduler is None:
+        return index % SKIP_RATE == 0
+    return skip_scheduler.should_detect(frame)
+
+
+def stride_report():
+    """Uyarlanabilir adım etkinse periyodik çıktıya eklenecek metni döner"""
+    if skip_scheduler is None:
+        return ""
+    stats = skip_scheduler.stats()
+    return f" | Adım: {stats['stride']} (Hareket: {stats['motion']:.3f}, Tespit: {stats['latency_ms']:.0f} ms)"
+
+
+def detect(frame):
+    """Kareyi ByteTrack ile işler, kutuları (kare koordinatlarında) ve takip ID'lerini döner"""
+    global roi_letterbox
+
+    start_time = time.perf_counter()
+    if roi_letterbox is None:
+        roi_letterbox = RoiLetterbox(frame.shape, ROI, imgsz=IMGSZ)
+    results = model.track(
+        roi_letterbox.prepare(frame),
+        persist=True,
+        tracker=TRACKER_CONFIG,
+        verbose=False,
+        classes=target_classes,
+        conf=CONFIDENCE,
+        imgsz=roi_letterbox.input_size
+    )
+    elapsed = time.perf_counter() - start_time
+    if skip_scheduler is not None:
+        skip_scheduler.record_inference(elapsed)
+
+    # model.track süresi = ön işleme + çıkarım + son işleme (speed, ms) + ByteTrack
+    inference_time = sum(results[0].speed.values()) / 1000
+    metrics.observe("inference", inference_time)
+    metrics.observe("tracking", max(elapsed - inference_time, 0.0))
+
+    if results[0].boxes.id is not None:
+        return roi_letterbox.to_frame(results[0].boxes.xyxy.cpu().numpy()), results[0].boxes.id.int().cpu().numpy()
+    return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.int32)
+
+
+def detect_tiled(frame):
+    """Kareyi örtüşen karolarda tespit eder, karolar arası NMS sonrası ByteTrack'e verir"""
+    global tiled_tracker
+
+    start_time = time.perf_counter()
+    if tiled_tracker is None:
+        # Letterbox yoluyla aynı alan: ROI dikdörtgeni kırpılır, poligon dışı maskelenir
+        region, polygon = roi_bounds(ROI, frame.shape) if ROI is not None else (None, None)
+        detector = TiledDetector(model, TILE_LAYOUT, TILE_OVERLAP, region=region, imgsz=IMGSZ,
+                                 classes=target_classes, conf=CONFIDENCE, polygon=polygon)
+        tiled_tracker = TiledTracker(detector, frame_rate=original_fps)
+    boxes, ids = tiled_tracker.track(frame)
+    elapsed = time.perf_counter() - start_time
+    if skip_scheduler is not None:
+        skip_scheduler.record_inference(elapsed)
+
+    inference_time = tiled_tracker.detector.last_elapsed
+    metrics.observe("inference", inference_time)
+    metrics.observe("tracking", max(elapsed - inference_time, 0.0))
+    return boxes, ids
+
+
+def track_frame(index, frame):
+    """Tespit karesinde ByteTrack çalıştırır, diğer karelerde son sonucu (veya tahmini) döner"""
+    global memory_boxes, memory_ids
+
+    if should_detect(index, frame):
+        memory_boxes, memory_ids = detect_tiled(frame) if TILE_LAYOUT else detect(frame)
+        if track_predictor is not None:
+            track_predictor.update(memory_boxes, memory_ids, index)
+        return memory_boxes, memory_ids
+
+    if track_predictor is not None:
+        return track_predictor.predict(index)
+    return memory_boxes, memory_ids
+
+
+def render_frame(frame, boxes, ids):
+    """Sayım, bariyer kontrolü ve çizimi yapar, kareyi kayda yazar"""
+    global prev_frame_time, lane_counter, lane_stats, flow_counter
+
+    height, width, _ = frame.shape
+    mid_x = width // 2
+
+    # FPS Hesaplama
+    new_frame_time = time.time()
+    fps = 1 / (new_frame_time - prev_frame_time) if (new_frame_time - prev_frame_time) > 0 else 0
+    prev_frame_time = new_frame_time
+
+    # --- HESAPLAMA ---
+    if lane_counter is None:
+        lane_counter = (LaneCounter(LANES, bounds=(0, 0, width, height)) if LANES
+                        else LaneCounter.left_right(width, height, mid_x))
+        lane_stats = LaneStats(lane_counter.num_lanes, {"short": DENSITY_WINDOW, "long": DENSITY_HISTORY,
+                                                        "barrier": BARRIER_SMOOTHING_WINDOW},
+                               ewma_alpha=DENSITY_EWMA_ALPHA)
+        flow_counter = FlowCounter(FLOW_LINES or default_lines(width, height, mid_x, FLOW_LINE_Y),
+                                   track_registry, names=None if FLOW_LINES else ["SOL", "SAG"])
+
+    with metrics.timer("counting"):
+        lane_counts, lane_masks = lane_counter.count(boxes)
+        instant_left, instant_right = int(lane_counts[0]), int(lane_counts[1])
+        box_lanes = lane_counter.lane_index(lane_masks)
+        lane_stats.update(lane_counts)
+        density = lane_stats.mean("short")
+        # Akış hızı video zamanına göre (dosya gerçek zamandan hızlı işlenebilir)
+        video_time = frame_counter / original_fps
+        slots = track_registry.update(boxes, ids, frame_counter)
+        flow_counter.update(slots, video_time)
+        if speed_estimator is not None:
+            speeds = speed_estimator.update(slots, video_time)
+            lane_speeds = SpeedEstimator.lane_means(speeds, box_lanes, lane_counter.num_lanes)
+        else:
+            speeds = lane_speeds = None
+
+    status_text_L, status_color_L = get_status_and_color(density[0])
+    status_text_R, status_color_R = get_status_and_color(density[1])
+
+    # --- BARİYER KONTROLÜ (MQTT GÖNDERİMİ) ---
+    control_barriers(new_frame_time, lane_speeds)
+    drain_mqtt_acks()
+
+    # --- GÖRSELLEŞTİRME ---
+    overlay_start = time.perf_counter()
+
+    # 1. Ortadaki Çizgi
+    cv2.line(frame, (mid_x, 0), (mid_x, height), (200, 200, 200), 2, cv2.LINE_AA)
+    draw_roi(frame)
+
+    # 2. Araç Kutuları
+    for box, label, lane in zip(boxes, box_labels(ids, speeds), box_lanes):
+        x1, y1, x2, y2 = map(int, box)
+        box_color = COLOR_LEFT if lane == 0 else COLOR_RIGHT
+        cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2, cv2.LINE_AA)
+        cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2, cv2.LINE_AA)
+
+    # Akış çizgileri
+    draw_flow_lines(frame)
+
+    # 3. Bilgi Paneli (sabit kısımlar önbellekten)
+    info_panel.render(frame, instant_left, (status_text_L, status_color_L),
+                      instant_right, (status_text_R, status_color_R), fps)
+
+    # MQTT Durumu
+    if mqtt_client.connected:
+        mqtt_status, mqtt_color = "Aktif", COLOR_GREEN
     else:
-        # Sol taraf yoğun değil -> Sağ bariyeri kapat
-        new_right_state = StateBarrier.STOP
-        if new_right_state != last_right_barrier_state:
-            mqtt_client.SendOrder(StateBarrier.STOP, DirectionBarrier.RIGHT)
-            last_right_barrier_state = new_right_state
-            last_mqtt_send_time = current_time
-            print(f"🚦 SAĞ BARİYER KAPATILDI (Sol taraf normal: {left_count} araç)")
-
-    # Sağ taraf yoğun mu?
-    if right_count > BARRIER_THRESHOLD:
-        # Sağ taraf yoğun -> Sol bariyeri aç (soldan gelen trafiği yavaşlat)
-        new_left_state = StateBarrier.MOVE
-        if new_left_state != last_left_barrier_state:
-            mqtt_client.SendOrder(StateBarrier.MOVE, DirectionBarrier.LEFT)
-            last_left_barrier_state = new_left_state
-            last_mqtt_send_time = current_time
-            print(f"🚦 SOL BARİYER AÇILDI (Sağ taraf yoğun: {right_count} araç)")
+        mqtt_status, mqtt_color = f"Baglaniyor ({mqtt_client.buffered_count()} bekleyen)", COLOR_RED
+    cv2.putText(frame, f"MQTT: {mqtt_status}", (15, 185), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                mqtt_color, 1, cv2.LINE_AA)
+
+    metrics.observe("overlay", time.perf_counter() - overlay_start)
+
+    # --- KAYIT İŞLEMİ ---
+    if ASYNC_ENCODE:
+        # Kuyruğa bırakma anlıktır; gerçek kodlama süresi kodlama iş parçacığında ölçülür (on_write)
+        out.write(frame)
     else:
-        # Sağ taraf yoğun değil -> Sol bariyeri kapat
-        new_left_state = StateBarrier.STOP
-        if new_left_state != last_left_barrier_state:
-            mqtt_client.SendOrder(StateBarrier.STOP, DirectionBarrier.LEFT)
-            last_left_barrier_state = new_left_state
-            last_mqtt_send_time = current_time
-            print(f"🚦 SOL BARİYER KAPATILDI (Sağ taraf normal: {right_count} araç)")
+        with metrics.timer("encode"):
+            out.write(frame)
 
+    report = startup.report_once("first_frame")
+    if report:
+        print(report)
 
-# --- ANA DÖNGÜ ---
-try:
-    while True:
+    summary = metrics.maybe_summary(METRICS_SUMMARY_INTERVAL)
+    if summary:
+        print(summary)
+        print("Yoğunluk | " + lane_stats.summary())
+        print("Akış | " + flow_counter.summary())
+        if lane_speeds is not None:
+            print("Hız | " + speed_summary(lane_speeds))
+
+    return instant_left, instant_right, fps
+
+
+def read_frame():
+    """Kaynaktan bir kare okur (kaynak bittiyse None)"""
+    with metrics.timer("decode"):
         ret, frame = cap.read()
+    return frame if ret else None
+
+
+def run_serial():
+    """Tek iş parçacığında oku -> tespit et -> çiz -> kaydet"""
+    global frame_counter
 
-        if not ret:
+    while True:
+        frame = read_frame()
+
+        if frame is None:
             print("Video tamamlandı veya okunamadı.")
             break
 
         frame_counter += 1
-        height, width, _ = frame.shape
-        mid_x = width // 2
-
-        # FPS Hesaplama
-        new_frame_time = time.time()
-        fps = 1 / (new_frame_time - prev_frame_time) if (new_frame_time - prev_frame_time) > 0 else 0
-        prev_frame_time = new_frame_time
 
         # --- TESPİT (ByteTrack) ---
-        if frame_counter % SKIP_RATE == 0:
-            results = model.track(
-                frame,
-                persist=True,
-                tracker="bytetrack.yaml",
-                verbose=False,
-                classes=target_classes,
-                conf=CONFIDENCE,
-                imgsz=640
-            )
-
-            if results[0].boxes.id is not None:
-                memory_boxes = results[0].boxes.xyxy.cpu().tolist()
-                memory_ids = results[0].boxes.id.int().cpu().tolist()
-            else:
-                memory_boxes = []
-                memory_ids = []
-
-        # --- HESAPLAMA ---
-        instant_left = 0
-        instant_right = 0
-
-        for box in memory_boxes:
-            x1, y1, x2, y2 = map(int, box)
-            cx = int((x1 + x2) / 2)
-            if cx < mid_x:
-                instant_left += 1
-            else:
-                instant_right += 1
-
-        status_text_L, status_color_L = get_status_and_color(instant_left)
-        status_text_R, status_color_R = get_status_and_color(instant_right)
-
-        # --- BARİYER KONTROLÜ (MQTT GÖNDERİMİ) ---
-        control_barriers(instant_left, instant_right, new_frame_time)
-
-        # --- GÖRSELLEŞTİRME ---
-        # 1. Ortadaki Çizgi
-        cv2.line(frame, (mid_x, 0), (mid_x, height), (200, 200, 200), 2, cv2.LINE_AA)
-
-        # 2. Araç Kutuları
-        for box, track_id in zip(memory_boxes, memory_ids):
-            x1, y1, x2, y2 = map(int, box)
-            cx = int((x1 + x2) / 2)
-            box_color = COLOR_LEFT if cx < mid_x else COLOR_RIGHT
-            cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2, cv2.LINE_AA)
-            cv2.putText(frame, f"#{track_id}", (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, box_color, 2, cv2.LINE_AA)
-
-        # 3. Bilgi Paneli
-        box_x, box_y = 0, 0
-        draw_transparent_box(frame, box_x, box_y, 330, 200, (0, 0, 0), alpha=0.85)
-
-        cv2.putText(frame, "BOLGESEL TRAFIK ANALIZI", (box_x + 15, box_y + 25), cv2.FONT_HERSHEY_DUPLEX, 0.6,
-                    COLOR_WHITE, 1, cv2.LINE_AA)
-        cv2.line(frame, (box_x + 15, box_y + 35), (box_x + 315, box_y + 35), (150, 150, 150), 1, cv2.LINE_AA)
-
-        # Sol Taraf
-        line_y_1 = box_y + 65
-        cv2.putText(frame, "SOL SERIT", (box_x + 15, line_y_1), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_LEFT, 1,
-                    cv2.LINE_AA)
-        cv2.putText(frame, f"Arac: {instant_left}", (box_x + 130, line_y_1), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE,
-                    1, cv2.LINE_AA)
-        cv2.putText(frame, status_text_L, (box_x + 230, line_y_1), cv2.FONT_HERSHEY_DUPLEX, 0.7, status_color_L, 2,
-                    cv2.LINE_AA)
-
-        # Sağ Taraf
-        line_y_2 = box_y + 105
-        cv2.putText(frame, "SAG SERIT", (box_x + 15, line_y_2), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RIGHT, 1,
-                    cv2.LINE_AA)
-        cv2.putText(frame, f"Arac: {instant_right}", (box_x + 130, line_y_2), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
-                    COLOR_WHITE, 1, cv2.LINE_AA)
-        cv2.putText(frame, status_text_R, (box_x + 230, line_y_2), cv2.FONT_HERSHEY_DUPLEX, 0.7, status_color_R, 2,
-                    cv2.LINE_AA)
-
-        # FPS ve MQTT Durumu
-        line_y_3 = box_y + 135
-        cv2.line(frame, (box_x + 15, line_y_3), (box_x + 315, line_y_3), (150, 150, 150), 1, cv2.LINE_AA)
-        cv2.putText(frame, f"Sistem FPS: {int(fps)}", (box_x + 15, line_y_3 + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
-                    (200, 200, 200), 1, cv2.LINE_AA)
-
-        mqtt_status = "Aktif" if mqtt_enabled else "Devre Disi"
-        mqtt_color = COLOR_GREEN if mqtt_enabled else COLOR_RED
-        cv2.putText(frame, f"MQTT: {mqtt_status}", (box_x + 15, line_y_3 + 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
-                    mqtt_color, 1, cv2.LINE_AA)
-
-        # --- KAYIT İŞLEMİ ---
-        out.write(frame)
+        boxes, ids = track_frame(frame_counter, frame)
+
+        instant_left, instant_right, fps = render_frame(frame, boxes, ids)
 
         if frame_counter % 30 == 0:
             print(
-                f"Kare işleniyor: {frame_counter} (Anlık FPS: {int(fps)}) | Sol: {instant_left}, Sağ: {instant_right}")
+                f"Kare işleniyor: {frame_counter} (Anlık FPS: {int(fps)}) | Sol: {instant_left}, Sağ: {instant_right}{stride_report()}")
+
+
+def run_pipelined():
+    """Yakalama, tespit ve çizim+kayıt aşamalarını ayrı iş parçacıklarında çalıştırır"""
+
+    def render_stage(index, frame, detections):
+        global frame_counter
+        frame_counter = index
+        boxes, ids = detections
+        instant_left, instant_right, fps = render_frame(frame, boxes, ids)
+
+        if index % 30 == 0:
+            print(
+                f"Kare işleniyor: {index} (Anlık FPS: {int(fps)}) | Sol: {instant_left}, Sağ: {instant_right}{stride_report()} | "
+                f"{pipeline.depth_report()}")
+
+    pipeline = FramePipeline(read_frame, track_frame, render_stage, queue_size=PIPELINE_QUEUE_SIZE)
+    summary = pipeline.run()
+
+    print("Video tamamlandı veya okunamadı.")
+    print(f"İş hattı: {summary['frames']} kare, {summary['fps']:.1f} FPS | "
+          f"En yüksek kuyruk -> Yakalama: {summary['max_depth']['capture']}, "
+          f"Çizim: {summary['max_depth']['render']}")
+
+
+# --- ANA DÖNGÜ ---
+try:
+    if PIPELINE_MODE:
+        run_pipelined()
+    else:
+        run_serial()
 
 except KeyboardInterrupt:
     print("\n\nKullanıcı tarafından durduruldu.")
 
 finally:
     # --- TEMİZLİK ---
-    print("İşlem tamamlandı. Dosya kaydedildi.")
+    print("İşlem tamamlandı." if OUTPUT_MODE == "none" else "İşlem tamamlandı. Dosya kaydedildi.")
     cap.release()
-    out.release()
+    try:
+        out.release()
+    except Exception as e:
+        # Kodlama hatası asıl hatayı gizlemesin; MQTT yine kapatılsın
+        print(f"UYARI: Video çıktısı kapatılırken hata: {e}")
     cv2.destroyAllWindows()
 
-    if mqtt_enabled:
-        mqtt_client.disconnect()
-        print("MQTT bağlantısı kapatıldı.")
\ No newline at end of file
+    mqtt_client.disconnect()
+    print("MQTT bağlantısı kapatıldı.")
\ No newline at end of file
@@ -0,0 +1,174 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Saniye cinsinden histogram sınırları (0.5 ms - 2 s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0)
+
+STAGES = ("decode", "inference", "tracking", "counting", "overlay", "encode", "mqtt_publish")
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı (Prometheus biçimine uygun)"""
+
+    __slots__ = ("buckets", "counts", "total", "count", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Kova sınırlarından yaklaşık yüzdelik değer (üst sınır) döner"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class StageMetrics:
+    """Aşama başına gecikme histogramlarını iş parçacığı güvenli şekilde tutar"""
+
+    def __init__(self, prefix="trafik", stages=STAGES, buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.histograms = {stage: Histogram(buckets) for stage in stages}
+        self.window = {stage: Histogram(buckets) for stage in stages}
+        self.last_summary = time.time()
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram(self.buckets)
+                self.window[stage] = Histogram(self.buckets)
+            self.histograms[stage].observe(seconds)
+            self.window[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """with metrics.timer("encode"): ... bloğunun süresini kaydeder"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary_line(self, reset=True):
+        """Son özetten bu yana aşama başına ortalama / p95 (ms) satırı"""
+        with self.lock:
+            parts = []
+            for stage, hist in self.window.items():
+                if hist.count:
+                    parts.append(f"{stage}: {hist.mean * 1000:.1f}/{hist.quantile(0.95) * 1000:.1f}")
+            if reset:
+                self.window = {stage: Histogram(self.buckets) for stage in self.window}
+                self.last_summary = time.time()
+        return "Gecikme ort/p95 ms | " + (", ".join(parts) if parts else "veri yok")
+
+    def maybe_summary(self, interval=10.0):
+        """interval saniye geçtiyse özet satırını döner, aksi halde None"""
+        if time.time() - self.last_summary >= interval:
+            return self.summary_line()
+        return None
+
+    def render_prometheus(self):
+        """Prometheus metin biçiminde tüm histogramlar"""
+        name = f"{self.prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Per-stage processing latency.",
+            f"# TYPE {name} histogram",
+        ]
+        with self.lock:
+            for stage, hist in self.histograms.items():
+                cumulative = 0
+                for bound, bucket_count in zip(hist.buckets, hist.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port=9108, host="127.0.0.1"):
+        """/metrics uç noktasını arka planda sunar; port kullanılamıyorsa uyarı yazıp None döner"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # Ölçüm uç noktası yüzünden analiz durmasın (ör. port başka bir süreçte)
+            print(f"UYARI: metrik sunucusu {host}:{port} açılamadı ({e}), /metrics kapalı.")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+class StartupTimer:
+    """Başlangıç aşamalarının (içe aktarma, model, ısınma, kaynak açma...) sürelerini kaydeder"""
+
+    def __init__(self, origin=None):
+        # origin: betiğin en başında alınan time.perf_counter() değeri
+        self.origin = time.perf_counter() if origin is None else origin
+        self.last = self.origin
+        self.phases = []
+        self.reported = False
+
+    def mark(self, phase):
+        """Son işaretten bu yana geçen süreyi phase adıyla kaydeder"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    @property
+    def total(self):
+        return self.last - self.origin
+
+    def report(self):
+        """Başlangıç dökümü satırı: aşama süreleri ve toplam"""
+        parts = ", ".join(f"{phase} {seconds:.2f}" for phase, seconds in self.phases)
+        return f"Başlangıç sn | {parts} | toplam {self.total:.2f}"
+
+    def report_once(self, phase):
+        """İlk çağrıda son aşamayı işaretleyip dökümü döner, sonrakilerde None"""
+        if self.reported:
+            return None
+        self.mark(phase)
+        self.reported = True
+        return self.report()
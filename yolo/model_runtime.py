@@ -0,0 +1,319 @@
+import os
+import shutil
+import tempfile
+from functools import partial
+
+import numpy as np
+
+# ultralytics / torch içe aktarması saniyeler sürer; yalnızca model gerçekten yüklenirken yapılır
+RUNTIMES = ("torch", "onnx", "openvino")
+CALIBRATION_DATA = "coco8.yaml"  # OpenVINO INT8 kalibrasyon veri seti
+CALIBRATION_VIDEO = "vehicle-counting.mp4"  # ONNX INT8 kalibrasyon kareleri (sahadaki görüntüye benzer)
+CALIBRATION_FRAMES = 64
+
+
+def _is_stale(target, source):
+    """Önbellek yoksa veya kaynak modelden eskiyse True"""
+    if not os.path.exists(target):
+        return True
+    return os.path.exists(source) and os.path.getmtime(target) < os.path.getmtime(source)
+
+
+def _replace(built, target):
+    """Geçici yolda hazırlanan dosya / klasörü hedefe atomik olarak taşır.
+
+    Hedefi okuyan başka bir süreç hiçbir zaman yarım yazılmış dosya görmez.
+    Klasör hedefi başka bir süreç aynı anda kurduysa bu kopya atılır (ikisi de günceldir).
+    """
+    if not os.path.isdir(built):
+        os.replace(built, target)
+        return
+    old = None
+    if os.path.isdir(target):
+        old = f"{target}.old.{os.getpid()}"
+        os.replace(target, old)
+    try:
+        os.replace(built, target)
+    except OSError:
+        shutil.rmtree(built, ignore_errors=True)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def warm_cache_path(model_path):
+    """Önceden birleştirilmiş (Conv+BN fuse) PyTorch kontrol noktasının yolu"""
+    return f"{os.path.splitext(model_path)[0]}_fused.pt"
+
+
+def build_warm_cache(model_path):
+    """Conv+BN katmanları birleştirilmiş modeli diske yazar; yüklemede fuse adımı atlanır"""
+    from ultralytics import YOLO
+
+    target = warm_cache_path(model_path)
+    root, ext = os.path.splitext(target)
+    temp = f"{root}.{os.getpid()}.tmp{ext}"
+    model = YOLO(model_path)
+    model.fuse()
+    try:
+        model.save(temp)
+        _replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return target
+
+
+def exported_path(model_path, runtime, int8=False, imgsz=640):
+    """Dışa aktarılmış modelin önbellek yolu (ör. yolov8n_640_int8.onnx, yolov8n_640_openvino_model/)"""
+    stem = os.path.splitext(model_path)[0]
+    tag = f"{stem}_{imgsz}{'_int8' if int8 else ''}"
+    if runtime == "onnx":
+        return tag + ".onnx"
+    if runtime == "openvino":
+        # ultralytics OpenVINO modellerini klasör adındaki bu sonekten tanır
+        return tag + "_openvino_model"
+    return model_path
+
+
+def calibration_batches(source, imgsz=640, frames=CALIBRATION_FRAMES):
+    """Videodan eşit aralıklı kareleri modelin gördüğü biçimde (letterbox, RGB, 0-1, NCHW) üretir"""
+    import cv2
+    from roi import RoiLetterbox
+
+    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if not cap.isOpened() or total <= 0:
+        cap.release()
+        raise FileNotFoundError(f"Kalibrasyon videosu açılamadı: {source}")
+    letterbox = None
+    try:
+        for index in np.linspace(0, total - 1, min(frames, total)).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            if letterbox is None:
+                letterbox = RoiLetterbox(frame.shape, imgsz=imgsz)
+            image = letterbox.prepare(frame)[..., ::-1].transpose(2, 0, 1)
+            yield np.ascontiguousarray(image, dtype=np.float32)[None] / 255.0
+    finally:
+        cap.release()
+
+
+def quantize_onnx(source, target, calibration=CALIBRATION_VIDEO, imgsz=640):
+    """ONNX modelini video karelerinden kalibre edilmiş statik INT8'e (QDQ) nicemler.
+
+    Dinamik nicemleme yalnızca ağırlıkları INT8 yapar; YOLO'nun evrişimleri
+    aktivasyonları her çıkarımda yeniden nicemlediğinden CPU'da hızlanma
+    sağlamaz. Statik nicemlemede aktivasyon aralıkları kalibrasyon karelerinden
+    bir kez çıkarılır.
+    """
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = onnx.load(source, load_external_data=False).graph.input[0].name
+
+    class VideoReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = calibration_batches(calibration, imgsz)
+
+        def get_next(self):
+            batch = next(self.batches, None)
+            return None if batch is None else {input_name: batch}
+
+    quantize_static(source, target, VideoReader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+
+def export_model(model_path, runtime, int8=False, imgsz=640, force=False):
+    """Modeli verilen çalışma ortamına bir kez dışa aktarır; sonraki çağrılarda önbellekteki yolu döner"""
+    target = exported_path(model_path, runtime, int8, imgsz)
+    if runtime == "torch" or not (force or _is_stale(target, model_path)):
+        return target
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Bilinmeyen çalışma ortamı: {runtime} (seçenekler: {', '.join(RUNTIMES)})")
+
+    from ultralytics import YOLO
+
+    if not os.path.exists(model_path):
+        YOLO(model_path)  # ultralytics bilinen modelleri çalışma klasörüne indirir
+    # ultralytics ara çıktıyı (yolov8n.onnx, yolov8n_openvino_model/) kaynak modelin yanına
+    # yazar; aynı anda başlayan işçiler çakışmasın diye her süreç kendi geçici kopyasından aktarır
+    workdir = tempfile.mkdtemp(prefix=".export_", dir=os.path.dirname(os.path.abspath(target)))
+    try:
+        model = YOLO(shutil.copy2(model_path, workdir))
+        # Dinamik giriş: letterbox dikdörtgen kalır (640x384, 640x640'a şişirilmez) ve
+        # inference_server birden çok kamerayı aynı partide verebilir
+        if runtime == "onnx":
+            exported = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+            if int8:
+                quantized = os.path.join(workdir, "int8.onnx")
+                quantize_onnx(exported, quantized, imgsz=imgsz)
+                exported = quantized
+        else:
+            exported = model.export(format="openvino", imgsz=imgsz, dynamic=True, int8=int8,
+                                    data=CALIBRATION_DATA if int8 else None)
+        _replace(str(exported), target)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return target
+
+
+def tracker_args(tracker_config="bytetrack.yaml"):
+    """ByteTrack yapılandırmasını BYTETracker(args=...) için okur.
+
+    ultralytics 8.3 sonrasında yaml_load kaldırıldı (yerine YAML.load); iki sürüm de desteklenir.
+    """
+    from ultralytics.utils import IterableSimpleNamespace
+    from ultralytics.utils.checks import check_yaml
+    try:
+        from ultralytics.utils import YAML
+        load = YAML.load
+    except ImportError:
+        from ultralytics.utils import yaml_load as load
+    return IterableSimpleNamespace(**load(check_yaml(tracker_config)))
+
+
+def byte_tracker(args, frame_rate=30):
+    """Kamera kare hızına göre BYTETracker kurar.
+
+    Eski ultralytics sürümleri frame_rate alıp track_buffer'ı 30 FPS'e göre
+    ölçekler; 8.4 ve sonrası bu parametreyi almaz, ölçekleme burada yapılır.
+    """
+    import inspect
+
+    from ultralytics.trackers.byte_tracker import BYTETracker
+    from ultralytics.utils import IterableSimpleNamespace
+    if "frame_rate" in inspect.signature(BYTETracker.__init__).parameters:
+        return BYTETracker(args=args, frame_rate=int(frame_rate))
+    scaled = IterableSimpleNamespace(**{**vars(args), "track_buffer": int(frame_rate / 30.0 * args.track_buffer)})
+    return BYTETracker(args=scaled)
+
+
+def _set_backend_threads(model, runtime, path, threads):
+    """Kullanılacak predictor'ın ONNX Runtime / OpenVINO oturumunu iş parçacığı sınırıyla yeniden kurar.
+
+    Isınma çağrıcının track/predict biçimiyle yapıldıktan sonra çağrılır; farklı
+    ayarlarla kurulan yeni bir predictor bu sınırı taşımaz.
+    """
+    backend = model.predictor.model
+    # ultralytics 8.4+: AutoBackend çalışma ortamına özgü nesneyi .backend'de tutar ve
+    # öznitelikleri ondan okur; oturum orada değiştirilmelidir
+    backend = vars(backend).get("backend", backend)
+    if runtime == "onnx" and hasattr(backend, "session"):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        backend.session = onnxruntime.InferenceSession(path, options, providers=backend.session.get_providers())
+        return True
+    if runtime == "openvino":
+        import openvino as ov
+        core = ov.Core()
+        xml = next(name for name in os.listdir(path) if name.endswith(".xml"))
+        config = {"INFERENCE_NUM_THREADS": threads, "PERFORMANCE_HINT": "LATENCY"}
+        if isinstance(getattr(backend, "compile_model", None), partial):
+            # 8.4+: giriş boyutu değişince model bu fonksiyonla yeniden derlenir; sınır orada da geçerli olsun
+            keywords = backend.compile_model.keywords
+            config = {**keywords.get("config", {}), **config}
+            backend.compile_model = partial(backend.compile_model.func, **{**keywords, "config": config})
+            compiled = backend.compile_model(core.read_model(os.path.join(path, xml)))
+        else:
+            compiled = core.compile_model(core.read_model(os.path.join(path, xml)), "CPU", config)
+        # Alan adı ultralytics sürümüne göre değişir
+        for name in ("ov_compiled_model", "executable_network"):
+            if hasattr(backend, name):
+                setattr(backend, name, compiled)
+                return True
+    return False
+
+
+def _cached_model(model_path, runtime, int8, imgsz, warm_cache, rebuild=False):
+    """Yüklenecek model yolu; önbellek yoksa, eskiyse veya rebuild=True ise önce oluşturur"""
+    if runtime != "torch":
+        return export_model(model_path, runtime, int8, imgsz, force=rebuild)
+    if not warm_cache:
+        return model_path
+    path = warm_cache_path(model_path)
+    if rebuild or _is_stale(path, model_path):
+        build_warm_cache(model_path)
+    return path
+
+
+def prepare_model(model_path="yolov8n.pt", runtime="torch", int8=False, imgsz=640, warm_cache=True):
+    """load_model'in kullanacağı önbelleği (dışa aktarım / birleştirilmiş model) hazırlar.
+
+    Çok süreçli kullanımda ana süreçte bir kez çağrılır; işçiler aynı dosyayı ayrı ayrı oluşturmaz.
+    """
+    return _cached_model(model_path, runtime, int8, imgsz, warm_cache)
+
+
+def reset_tracker(model):
+    """model.track(persist=True) takipçisini sıfırlar (yeni video / ısınma sonrası); predictor korunur"""
+    for state in getattr(model.predictor, "trackers", ()):
+        state.reset()
+
+
+def _load_and_warm(yolo, path, imgsz, warmup_shape, tracker, timer):
+    model = yolo(path, task="detect")
+    if timer is not None:
+        timer.mark("model")
+    # Isınma: ultralytics arka ucu (ve fuse) ilk çıkarımda kurulur; bozuk dışa aktarım burada anlaşılır.
+    # ultralytics "tracker" ayarı değişince predictor'ı (ve arka ucu) yeniden kurar; bu yüzden
+    # model.track kullanan çağıranlar için ısınma da aynı tracker yapılandırmasıyla yapılır.
+    frame = np.zeros(warmup_shape or (imgsz, imgsz, 3), dtype=np.uint8)
+    if tracker is None:
+        model.predict(frame, verbose=False, imgsz=imgsz)
+        return model
+    model.track(frame, persist=True, tracker=tracker, verbose=False, imgsz=imgsz)
+    # Isınma karesi takipçi durumunda iz bırakmasın
+    reset_tracker(model)
+    return model
+
+
+def load_model(model_path="yolov8n.pt", runtime="torch", int8=False, threads=None, imgsz=640, warm_cache=True,
+               warmup_shape=None, tracker=None, timer=None):
+    """Seçilen çalışma ortamında YOLO modeli yükler (model.track / model.predict arayüzü aynıdır).
+
+    runtime: "torch" (PyTorch .pt), "onnx" (ONNX Runtime) veya "openvino".
+    int8: kalibrasyonlu statik INT8; ONNX için CALIBRATION_VIDEO kareleri, OpenVINO
+    için CALIBRATION_DATA kullanılır (PyTorch'ta desteklenmez). threads: CPU iş parçacığı sayısı (None: varsayılan).
+    Dışa aktarılan dosyalar model yanında önbelleklenir; ilk çalıştırma dışında
+    yeniden dışa aktarma yapılmaz. warm_cache=True iken PyTorch modeli diskteki
+    birleştirilmiş kopyadan yüklenir (yoksa bir kez oluşturulur). Önbellek
+    dosyaları geçici yola yazılıp os.replace ile yerine konur; yüklenemeyen
+    önbellek bir kez yeniden oluşturulur.
+
+    Model, warmup_shape (h, w, 3; varsayılan imgsz x imgsz) boyutunda bir kareyle
+    ısıtılarak döndürülür; ilk gerçek karede kurulum gecikmesi yaşanmaz. Model
+    model.track(..., tracker=X) ile kullanılacaksa tracker=X verilmelidir; yoksa
+    ilk track() çağrısı predictor'ı ve arka ucu baştan kurar. timer
+    (metrics.StartupTimer) verilirse içe aktarma, yükleme ve ısınma ayrı ölçülür.
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Bilinmeyen çalışma ortamı: {runtime} (seçenekler: {', '.join(RUNTIMES)})")
+    if int8 and runtime == "torch":
+        raise ValueError("INT8 yalnızca onnx ve openvino çalışma ortamlarında desteklenir")
+
+    from ultralytics import YOLO
+    if threads and runtime == "torch":
+        import torch
+        torch.set_num_threads(threads)
+    if timer is not None:
+        timer.mark("ultralytics")
+
+    path = _cached_model(model_path, runtime, int8, imgsz, warm_cache)
+    try:
+        model = _load_and_warm(YOLO, path, imgsz, warmup_shape, tracker, timer)
+    except Exception as e:
+        if path == model_path:
+            raise
+        # Yarım kalmış ya da bozulmuş önbellek: yeniden oluşturup bir kez daha dene
+        print(f"UYARI: önbellekteki model yüklenemedi ({e}), yeniden oluşturuluyor: {path}")
+        path = _cached_model(model_path, runtime, int8, imgsz, warm_cache, rebuild=True)
+        model = _load_and_warm(YOLO, path, imgsz, warmup_shape, tracker, timer)
+    if threads and runtime != "torch" and not _set_backend_threads(model, runtime, path, threads):
+        print(f"UYARI: {runtime} için iş parçacığı sayısı ayarlanamadı, varsayılan kullanılıyor.")
+    if timer is not None:
+        timer.mark("warmup")
+    return model
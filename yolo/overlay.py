@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+# --- RENK PALETİ (BGR) ---
+COLOR_LEFT = (255, 191, 0)
+COLOR_RIGHT = (0, 165, 255)
+COLOR_WHITE = (255, 255, 255)
+COLOR_LINE = (150, 150, 150)
+COLOR_INFO = (200, 200, 200)
+
+
+class InfoPanelRenderer:
+    """Bilgi panelini çizer; sabit kısımları çözünürlük başına bir kez hazırlar.
+
+    Başlık, ayırıcı çizgiler ve şerit etiketleri ilk karede siyah bir tuval
+    üzerine çizilip maskesiyle birlikte saklanır. Sonraki karelerde yalnızca
+    arka plan harmanlanır, sabit katman maskeyle kopyalanır ve değişen sayılar
+    yazılır; kare başına yeni dizi ayrılmaz.
+    """
+
+    def __init__(self, width=330, height=200, color=(0, 0, 0), alpha=0.85, x=0, y=0):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.alpha = alpha
+        self.x = x
+        self.y = y
+        self._uniform_color = color[0] == color[1] == color[2]
+        self._cache = {}
+
+    def _build(self, h, w):
+        """Verilen panel boyutu için sabit katmanı ve harman tamponunu hazırlar"""
+        background = np.full((h, w, 3), self.color, dtype=np.uint8)
+
+        static = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        cv2.putText(static, "BOLGESEL TRAFIK ANALIZI", (15, 25), cv2.FONT_HERSHEY_DUPLEX, 0.6,
+                    COLOR_WHITE, 1, cv2.LINE_AA)
+        cv2.line(static, (15, 35), (315, 35), COLOR_LINE, 1, cv2.LINE_AA)
+        cv2.putText(static, "SOL SERIT", (15, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_LEFT, 1, cv2.LINE_AA)
+        cv2.putText(static, "SAG SERIT", (15, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RIGHT, 1, cv2.LINE_AA)
+        cv2.line(static, (15, 135), (315, 135), COLOR_LINE, 1, cv2.LINE_AA)
+
+        static = np.ascontiguousarray(static[:h, :w])
+        mask = static.any(axis=2).astype(np.uint8)
+        return background, static, mask
+
+    def render(self, frame, left_count, left_status, right_count, right_status, fps):
+        """Paneli karenin üzerine yerinde çizer"""
+        frame_h, frame_w = frame.shape[:2]
+        h = max(0, min(self.height, frame_h - self.y))
+        w = max(0, min(self.width, frame_w - self.x))
+        if h == 0 or w == 0:
+            return
+
+        key = (h, w)
+        if key not in self._cache:
+            self._cache[key] = self._build(h, w)
+        background, static, mask = self._cache[key]
+
+        # 1. Yarı saydam arka plan (yerinde harmanlama)
+        panel = frame[self.y:self.y + h, self.x:self.x + w]
+        if self._uniform_color:
+            # Gri tonlu renkte harman tek bir ölçekle-topla işlemine iner
+            cv2.convertScaleAbs(panel, dst=panel, alpha=1 - self.alpha, beta=self.color[0] * self.alpha + 1.0)
+        else:
+            cv2.addWeighted(panel, 1 - self.alpha, background, self.alpha, 1.0, dst=panel)
+
+        # 2. Önceden çizilmiş sabit katman
+        cv2.copyTo(static, mask, panel)
+
+        # 3. Değişen değerler
+        left_text, left_color = left_status
+        right_text, right_color = right_status
+        x, y = self.x, self.y
+        cv2.putText(frame, f"Arac: {left_count}", (x + 130, y + 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE,
+                    1, cv2.LINE_AA)
+        cv2.putText(frame, left_text, (x + 230, y + 65), cv2.FONT_HERSHEY_DUPLEX, 0.7, left_color, 2, cv2.LINE_AA)
+        cv2.putText(frame, f"Arac: {right_count}", (x + 130, y + 105), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_WHITE,
+                    1, cv2.LINE_AA)
+        cv2.putText(frame, right_text, (x + 230, y + 105), cv2.FONT_HERSHEY_DUPLEX, 0.7, right_color, 2,
+                    cv2.LINE_AA)
+        cv2.putText(frame, f"Sistem FPS: {int(fps)}", (x + 15, y + 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    COLOR_INFO, 1, cv2.LINE_AA)
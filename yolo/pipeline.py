@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+
+# --- İŞ HATTI SONU İŞARETİ ---
+_END = object()
+
+
+class FramePipeline:
+    """Yakalama -> çıkarım -> çizim+kayıt aşamalarını sınırlı kuyruklarla birbirine bağlar.
+
+    Her aşama tek bir iş parçacığında çalışır ve kuyruklar FIFO olduğu için
+    karelerin çıktı sırası korunur. Toplam hız, aşamaların toplamı yerine en
+    yavaş aşama tarafından belirlenir.
+    """
+
+    def __init__(self, read_fn, infer_fn, render_fn, queue_size=8):
+        # read_fn() -> frame veya None (kaynak bitti)
+        # infer_fn(index, frame) -> tespit sonucu
+        # render_fn(index, frame, detections) -> None
+        self.read_fn = read_fn
+        self.infer_fn = infer_fn
+        self.render_fn = render_fn
+
+        self.capture_queue = queue.Queue(maxsize=queue_size)
+        self.render_queue = queue.Queue(maxsize=queue_size)
+
+        self.stop_event = threading.Event()
+        self.errors = []
+
+        self.captured = 0
+        self.inferred = 0
+        self.rendered = 0
+        self.max_depth = {"capture": 0, "render": 0}
+
+    def _put(self, q, item):
+        """Kuyruk doluysa bekler, durdurma istenirse bırakır"""
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        """Kuyruktan eleman alır, durdurma istenirse _END döner"""
+        while not self.stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _capture_loop(self):
+        try:
+            index = 0
+            while not self.stop_event.is_set():
+                frame = self.read_fn()
+                if frame is None:
+                    break
+                index += 1
+                if not self._put(self.capture_queue, (index, frame)):
+                    return
+                self.captured = index
+                self.max_depth["capture"] = max(self.max_depth["capture"], self.capture_queue.qsize())
+        except Exception as e:
+            self.errors.append(("capture", e))
+        self._put(self.capture_queue, _END)
+
+    def _inference_loop(self):
+        try:
+            while True:
+                item = self._get(self.capture_queue)
+                if item is _END:
+                    break
+                index, frame = item
+                detections = self.infer_fn(index, frame)
+                if not self._put(self.render_queue, (index, frame, detections)):
+                    return
+                self.inferred = index
+                self.max_depth["render"] = max(self.max_depth["render"], self.render_queue.qsize())
+        except Exception as e:
+            self.errors.append(("inference", e))
+        self._put(self.render_queue, _END)
+
+    def queue_depths(self):
+        """Aşamalar arası kuyrukların anlık doluluğunu döner"""
+        return {
+            "capture": self.capture_queue.qsize(),
+            "render": self.render_queue.qsize(),
+        }
+
+    def depth_report(self):
+        """Kuyruk doluluğunu tek satırlık metin olarak döner"""
+        depths = self.queue_depths()
+        size = self.capture_queue.maxsize
+        return (f"Kuyruk -> Yakalama: {depths['capture']}/{size}, "
+                f"Çizim: {depths['render']}/{size}")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        """İş hattını çalıştırır; çizim+kayıt aşaması çağıran iş parçacığında yürür"""
+        workers = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        start_time = time.time()
+        last_index = 0
+        try:
+            while True:
+                item = self._get(self.render_queue)
+                if item is _END:
+                    break
+                index, frame, detections = item
+                # Tek tüketici + FIFO kuyruk: sıra bozulmamalı
+                assert index == last_index + 1, f"Kare sırası bozuldu: {last_index} -> {index}"
+                last_index = index
+                self.render_fn(index, frame, detections)
+                self.rendered = index
+        finally:
+            self.stop()
+            for worker in workers:
+                worker.join(timeout=2)
+
+        for stage, error in self.errors:
+            raise RuntimeError(f"İş hattı aşaması hata verdi ({stage}): {error}") from error
+
+        elapsed = time.time() - start_time
+        return {
+            "frames": self.rendered,
+            "elapsed": elapsed,
+            "fps": self.rendered / elapsed if elapsed > 0 else 0,
+            "max_depth": dict(self.max_depth),
+        }
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+
+def _round_up(value, stride):
+    return int(np.ceil(value / stride) * stride)
+
+
+def roi_bounds(roi, frame_shape):
+    """ROI'nin kare içine kırpılmış sınırlayıcı dikdörtgeni (x1, y1, x2, y2) ve poligonu (yoksa None)"""
+    height, width = frame_shape[:2]
+    if roi is None:
+        polygon = None
+        x1, y1, x2, y2 = 0, 0, width, height
+    else:
+        points = np.asarray(roi, dtype=np.float64)
+        if points.size == 4:
+            polygon = None
+            x1, y1, x2, y2 = points.reshape(-1)
+        else:
+            polygon = points.reshape(-1, 2)
+            (x1, y1), (x2, y2) = polygon.min(axis=0), polygon.max(axis=0)
+    x1, y1 = max(int(x1), 0), max(int(y1), 0)
+    x2, y2 = min(int(np.ceil(x2)), width), min(int(np.ceil(y2)), height)
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError("ROI kare dışında veya boş")
+    return (x1, y1, x2, y2), polygon
+
+
+class RoiLetterbox:
+    """Kareyi ilgi alanına (ROI) kırpıp modele hazır, ön tahsisli bir tampona yazar.
+
+    roi: None (tüm kare), (x1, y1, x2, y2) dikdörtgeni veya [(x, y), ...] poligonu.
+    Poligonda sınırlayıcı dikdörtgen kırpılır, poligon dışı siyaha boyanır.
+    Ölçek tüm kareye göre hesaplanır (uzun kenar imgsz'ye iner), bu yüzden araçlar
+    kırpmadan önceki boyutlarında kalır; modele giden piksel sayısı ROI alanıyla
+    orantılı azalır. Tampon boyutu stride katına yuvarlandığından, model
+    imgsz=input_size ile çağrılırsa ultralytics'in kendi letterbox adımı yeniden
+    boyutlandırma yapmaz (imgsz=640 verilirse küçük tampon 640'a büyütülür).
+
+    Tampon ve maske bir kez ayrılır; her karede yeniden kullanılır. prepare()
+    dönen diziyi bir sonraki çağrıya kadar değiştirmeyin.
+    """
+
+    def __init__(self, frame_shape, roi=None, imgsz=640, stride=32, pad_value=114):
+        height, width = frame_shape[:2]
+        (x1, y1, x2, y2), polygon = roi_bounds(roi, frame_shape)
+
+        self.frame_shape = (height, width)
+        self.stride = stride
+        self.crop = (x1, y1, x2, y2)
+        self.scale = min(imgsz / height, imgsz / width)
+        self.resized = (max(1, round((x2 - x1) * self.scale)), max(1, round((y2 - y1) * self.scale)))
+        shape = (_round_up(self.resized[1], stride), _round_up(self.resized[0], stride), 3)
+        self.pad = ((shape[1] - self.resized[0]) // 2, (shape[0] - self.resized[1]) // 2)
+
+        self.buffer = np.full(shape, pad_value, dtype=np.uint8)
+        px, py = self.pad
+        # Ölçeklenmiş kırpım doğrudan tamponun bu bölgesine yazılır (ara kopya yok)
+        self._view = self.buffer[py:py + self.resized[1], px:px + self.resized[0]]
+
+        # Poligon dışını sıfırlayan maske (ölçeklenmiş kırpım koordinatlarında)
+        self._mask = None
+        if polygon is not None:
+            mask = np.zeros_like(self._view)
+            local = np.round((polygon - (x1, y1)) * self.scale).astype(np.int32)
+            cv2.fillPoly(mask, [local], (255, 255, 255))
+            self._mask = mask
+
+        self._offset = np.array([x1, y1, x1, y1], dtype=np.float32)
+        self._pad = np.array([px, py, px, py], dtype=np.float32)
+
+    @property
+    def input_size(self):
+        """Tampon boyutu (h, w); model çağrısında imgsz olarak verilir"""
+        return self.buffer.shape[0], self.buffer.shape[1]
+
+    @property
+    def pixel_ratio(self):
+        """Modele giden piksel sayısının ROI'siz letterbox'a oranı"""
+        height, width = self.frame_shape
+        full = _round_up(height * self.scale, self.stride) * _round_up(width * self.scale, self.stride)
+        return self.buffer.shape[0] * self.buffer.shape[1] / full
+
+    def prepare(self, frame):
+        """Kareyi kırpar, ölçekler, maskeler ve tampona yazar; tamponu döner"""
+        x1, y1, x2, y2 = self.crop
+        crop = frame[y1:y2, x1:x2]
+        cv2.resize(crop, self.resized, dst=self._view, interpolation=cv2.INTER_LINEAR)
+        if self._mask is not None:
+            cv2.bitwise_and(self._view, self._mask, dst=self._view)
+        return self.buffer
+
+    def to_frame(self, boxes):
+        """Tampon koordinatlarındaki xyxy kutuları kare koordinatlarına çevirir"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        return (boxes - self._pad) / self.scale + self._offset
+
+
+def roi_outline(roi):
+    """Çizim için ROI sınırı: (N, 1, 2) int32 nokta dizisi (cv2.polylines)"""
+    points = np.asarray(roi, dtype=np.float64)
+    if points.size == 4:
+        x1, y1, x2, y2 = points.reshape(-1)
+        points = np.array([(x1, y1), (x2, y1), (x2, y2), (x1, y2)])
+    return np.round(points).astype(np.int32).reshape(-1, 1, 2)
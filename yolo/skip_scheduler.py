@@ -0,0 +1,96 @@
+import math
+
+import cv2
+import numpy as np
+
+
+class AdaptiveSkipScheduler:
+    """Tespit adımını (SKIP_RATE) ölçülen çıkarım süresine ve sahne hareketine göre ayarlar.
+
+    - Gecikme tabanı: bir tespit target_fps'e göre kaç kare sürüyorsa adım en az o kadardır
+      (target_fps=None: gerçek zaman sınırı yok, ör. dosya işleme; yalnızca hareket belirler).
+    - Hareket: küçültülmüş gri kareler arası ortalama fark (0-1). Sakin sahnede adım
+      max_stride'a çıkar, hareketli sahnede 1'e iner.
+    """
+
+    def __init__(self, target_fps=30, min_stride=1, max_stride=8,
+                 motion_low=0.004, motion_high=0.03, smoothing=0.2, probe_size=(64, 36)):
+        self.target_fps = target_fps
+        self.min_stride = min_stride
+        self.max_stride = max_stride
+        self.motion_low = motion_low
+        self.motion_high = motion_high
+        self.smoothing = smoothing
+        self.probe_size = probe_size
+
+        # Ön tahsisli küçük gri kare tamponları
+        width, height = probe_size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._prev_gray = np.empty((height, width), dtype=np.uint8)
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._has_prev = False
+
+        self.motion = 0.0
+        self.latency = 0.0
+        self.stride = min_stride
+        self.frames_since_detect = 0
+        self.detections = 0
+        self.frames = 0
+
+    def motion_score(self, frame):
+        """Önceki kareye göre hareket enerjisini (0-1) hesaplar"""
+        cv2.resize(frame, self.probe_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if not self._has_prev:
+            self._has_prev = True
+            self._prev_gray[:] = self._gray
+            return 0.0
+        cv2.absdiff(self._gray, self._prev_gray, dst=self._diff)
+        self._prev_gray, self._gray = self._gray, self._prev_gray
+        return float(cv2.mean(self._diff)[0]) / 255.0
+
+    def _update_stride(self):
+        # Gecikme tabanı: tespit sürerken geçen kare sayısı
+        latency_stride = max(1, math.ceil(self.latency * self.target_fps)) if self.target_fps else 1
+
+        # Hareket: motion_low altı -> max_stride, motion_high üstü -> min_stride
+        span = max(self.motion_high - self.motion_low, 1e-9)
+        activity = min(max((self.motion - self.motion_low) / span, 0.0), 1.0)
+        activity_stride = round(self.max_stride - activity * (self.max_stride - self.min_stride))
+
+        self.stride = int(min(max(latency_stride, activity_stride, self.min_stride), self.max_stride))
+
+    def should_detect(self, frame):
+        """Bu karede tespit çalıştırılmalı mı? Her kare için bir kez çağrılır"""
+        self.frames += 1
+        score = self.motion_score(frame)
+        # Ani hareket artışına hemen tepki ver, düşüşte yumuşat
+        if score > self.motion:
+            self.motion = score
+        else:
+            self.motion += self.smoothing * (score - self.motion)
+        self._update_stride()
+
+        self.frames_since_detect += 1
+        if self.detections == 0 or self.frames_since_detect >= self.stride:
+            self.frames_since_detect = 0
+            self.detections += 1
+            return True
+        return False
+
+    def record_inference(self, seconds):
+        """Ölçülen tespit süresini (saniye) bildirir"""
+        if self.latency == 0.0:
+            self.latency = seconds
+        else:
+            self.latency += self.smoothing * (seconds - self.latency)
+        self._update_stride()
+
+    def stats(self):
+        return {
+            "stride": self.stride,
+            "motion": self.motion,
+            "latency_ms": self.latency * 1000,
+            "detect_ratio": self.detections / self.frames if self.frames else 0.0,
+        }
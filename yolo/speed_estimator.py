@@ -0,0 +1,120 @@
+import numpy as np
+
+# Kamera (görüntü noktaları, yol noktaları) -> homografi; her kalibrasyon bir kez hesaplanır
+_homography_cache = {}
+
+
+def compute_homography(image_points, world_points):
+    """Görüntü pikselinden yol düzlemine (metre) 3x3 homografi (DLT, en az 4 nokta)"""
+    src = np.asarray(image_points, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(world_points, dtype=np.float64).reshape(-1, 2)
+    if len(src) < 4 or len(src) != len(dst):
+        raise ValueError("Homografi için eşleşen en az 4 nokta gerekli")
+
+    # Her nokta çifti iki doğrusal denklem verir; h33 = 1
+    n = len(src)
+    a = np.zeros((2 * n, 8))
+    b = np.empty(2 * n)
+    x, y, u, v = src[:, 0], src[:, 1], dst[:, 0], dst[:, 1]
+    a[0::2, 0], a[0::2, 1], a[0::2, 2] = x, y, 1
+    a[0::2, 6], a[0::2, 7] = -x * u, -y * u
+    a[1::2, 3], a[1::2, 4], a[1::2, 5] = x, y, 1
+    a[1::2, 6], a[1::2, 7] = -x * v, -y * v
+    b[0::2], b[1::2] = u, v
+    h = np.linalg.lstsq(a, b, rcond=None)[0]
+    return np.append(h, 1.0).reshape(3, 3)
+
+
+def get_homography(image_points, world_points):
+    """Önbellekli compute_homography: aynı kalibrasyon için tekrar hesaplanmaz"""
+    key = (tuple(map(tuple, np.asarray(image_points, dtype=np.float64).reshape(-1, 2))),
+           tuple(map(tuple, np.asarray(world_points, dtype=np.float64).reshape(-1, 2))))
+    homography = _homography_cache.get(key)
+    if homography is None:
+        homography = _homography_cache[key] = compute_homography(image_points, world_points)
+    return homography
+
+
+def project(homography, points):
+    """(N, 2) piksel noktalarını yol düzlemine (metre) taşır"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    mapped = points @ homography[:, :2].T + homography[:, 2]
+    return mapped[:, :2] / mapped[:, 2:3]
+
+
+class SpeedEstimator:
+    """Takip kutularının alt orta noktasından araç hızı (km/sa) tahmin eder.
+
+    Noktalar homografi ile yol düzlemine taşınır ve her yuva için son `window`
+    konum TrackRegistry yuvalarıyla indekslenen halka tamponda tutulur. Hız,
+    penceredeki en eski ve en yeni konum arasındaki mesafe / süredir; tüm aktif
+    takipler için tek vektörel geçişte hesaplanır. Yuva başka bir ID'ye
+    geçtiğinde (generation değişir) geçmişi sıfırlanır.
+    """
+
+    def __init__(self, registry, homography, window=15, min_span=0.3, max_speed=250.0):
+        self.registry = registry
+        self.homography = np.asarray(homography, dtype=np.float64)
+        self.window = window
+        self.min_span = min_span  # Hız için gereken en kısa süre (saniye)
+        self.max_speed = max_speed  # Bunun üstündeki tahminler (takip hatası) atılır
+
+        capacity = registry.capacity
+        self.positions = np.zeros((capacity, window, 2), dtype=np.float64)
+        self.times = np.zeros((capacity, window), dtype=np.float64)
+        self.head = np.zeros(capacity, dtype=np.intp)
+        self.filled = np.zeros(capacity, dtype=np.intp)
+        self.speed = np.full(capacity, np.nan)
+        self._generation = np.zeros(capacity, dtype=np.int64)
+
+    @classmethod
+    def from_points(cls, registry, image_points, world_points, **kwargs):
+        """Kalibrasyon noktalarından (önbellekli homografi ile) tahminci oluşturur"""
+        return cls(registry, get_homography(image_points, world_points), **kwargs)
+
+    def update(self, slots, timestamp):
+        """registry.update() sonrası çağrılır; slots sırasıyla hızları (km/sa, bilinmiyorsa NaN) döner"""
+        if len(slots) == 0:
+            return np.empty(0)
+        registry = self.registry
+
+        # Yuvası yeni bir ID'ye geçenlerin geçmişini sıfırla
+        generation = registry.generation[slots]
+        reused = slots[self._generation[slots] != generation]
+        self.filled[reused] = 0
+        self.speed[reused] = np.nan
+        self._generation[slots] = generation
+
+        boxes = registry.box[slots]
+        anchors = np.empty((len(slots), 2), dtype=np.float64)
+        anchors[:, 0] = (boxes[:, 0] + boxes[:, 2]) * 0.5
+        anchors[:, 1] = boxes[:, 3]
+        world = project(self.homography, anchors)
+
+        head = (self.head[slots] + 1) % self.window
+        filled = np.minimum(self.filled[slots] + 1, self.window)
+        self.positions[slots, head] = world
+        self.times[slots, head] = timestamp
+        self.head[slots] = head
+        self.filled[slots] = filled
+
+        oldest = (head - filled + 1) % self.window
+        span = timestamp - self.times[slots, oldest]
+        distance = np.linalg.norm(world - self.positions[slots, oldest], axis=1)
+        valid = span >= self.min_span
+        speeds = np.full(len(slots), np.nan)
+        speeds[valid] = distance[valid] / span[valid] * 3.6
+        speeds[speeds > self.max_speed] = np.nan
+        self.speed[slots] = speeds
+        return speeds
+
+    @staticmethod
+    def lane_means(speeds, box_lanes, num_lanes):
+        """Şerit başına ortalama hız (hızı bilinen araç yoksa NaN)"""
+        known = np.isfinite(speeds) & (box_lanes >= 0)
+        lanes = box_lanes[known]
+        totals = np.bincount(lanes, weights=speeds[known], minlength=num_lanes)[:num_lanes]
+        counts = np.bincount(lanes, minlength=num_lanes)[:num_lanes]
+        means = np.full(num_lanes, np.nan)
+        np.divide(totals, counts, out=means, where=counts > 0)
+        return means
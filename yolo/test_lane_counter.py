@@ -0,0 +1,56 @@
+import numpy as np
+
+from lane_counter import LaneCounter
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def baseline_counts(boxes, mid_x):
+    """Vektörel sayaçtan önceki kutu başına döngü (sol/sağ)"""
+    left = right = 0
+    for box in boxes:
+        x1, y1, x2, y2 = map(int, box)
+        cx = int((x1 + x2) / 2)
+        if cx < mid_x:
+            left += 1
+        else:
+            right += 1
+    return [left, right]
+
+
+def random_boxes(rng, n):
+    # Kare kenarına değen ve merkezi kare dışına taşan (tahmin edilmiş) kutular dahil
+    x1 = rng.integers(-300, WIDTH + 100, n)
+    y1 = rng.integers(-300, HEIGHT + 100, n)
+    w = rng.integers(1, 400, n)
+    h = rng.integers(1, 300, n)
+    boxes = np.stack((x1, y1, x1 + w, y1 + h), axis=1).astype(np.float32)
+    edges = [[0, 0, 40, 40], [WIDTH - 40, HEIGHT - 40, WIDTH, HEIGHT], [WIDTH, HEIGHT, WIDTH, HEIGHT],
+             [WIDTH + 50, -80, WIDTH + 90, -20], [-90, HEIGHT + 20, -10, HEIGHT + 60],
+             [WIDTH // 2 - 1, 0, WIDTH // 2, 10], [WIDTH // 2, 0, WIDTH // 2 + 1, 10]]
+    return np.vstack((boxes, np.asarray(edges, dtype=np.float32)))
+
+
+def test_left_right_matches_baseline_loop():
+    rng = np.random.default_rng(0)
+    for mid_x in (WIDTH // 2, 700):
+        counter = LaneCounter.left_right(WIDTH, HEIGHT, mid_x)
+        for _ in range(20):
+            boxes = random_boxes(rng, 200)
+            counts, masks = counter.count(boxes)
+            assert counts.tolist() == baseline_counts(boxes, mid_x)
+            # Her kutu tam olarak bir şeride düşer
+            assert (masks.sum(axis=0) == 1).all()
+
+
+def test_out_of_frame_centre_keeps_nearest_lane():
+    lanes = [[(0, 0), (WIDTH, 0), (WIDTH, 540), (0, 540)], [(0, 540), (WIDTH, 540), (WIDTH, HEIGHT), (0, HEIGHT)]]
+    counter = LaneCounter(lanes, bounds=(0, 0, WIDTH, HEIGHT))
+    boxes = np.array([[100, -200, 200, -100], [100, HEIGHT + 10, 200, HEIGHT + 90]], dtype=np.float32)
+    assert counter.lane_index(counter.assign(boxes)).tolist() == [0, 1]
+
+
+def test_centre_outside_polygons_inside_frame_is_not_counted():
+    counter = LaneCounter([[(100, 100), (500, 100), (500, 500), (100, 500)]], bounds=(0, 0, WIDTH, HEIGHT))
+    counts, _ = counter.count(np.array([[600, 600, 700, 700], [-50, 200, 20, 260]], dtype=np.float32))
+    assert counts.tolist() == [0]
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+from model_runtime import load_model
+
+IMGSZ = 160
+TRACKER = "bytetrack.yaml"
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    """Rastgele ağırlıklı küçük model (indirme gerektirmez)"""
+    ultralytics = pytest.importorskip("ultralytics")
+    path = tmp_path_factory.mktemp("model") / "tiny.pt"
+    ultralytics.YOLO("yolov8n.yaml").save(str(path))
+    return str(path)
+
+
+def first_track(model):
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    model.track(frame, persist=True, tracker=TRACKER, verbose=False, imgsz=IMGSZ)
+    # 8.4+: çalışma ortamına özgü nesne AutoBackend.backend içindedir
+    backend = model.predictor.model
+    return vars(backend).get("backend", backend)
+
+
+def test_warmed_predictor_is_reused_by_track(model_path):
+    model = load_model(model_path, "torch", imgsz=IMGSZ, warm_cache=False, tracker=TRACKER)
+    predictor = model.predictor
+    first_track(model)
+    assert model.predictor is predictor
+
+
+def test_onnx_thread_limit_survives_first_track(model_path):
+    pytest.importorskip("onnxruntime")
+    model = load_model(model_path, "onnx", threads=2, imgsz=IMGSZ, tracker=TRACKER)
+    predictor = model.predictor
+    backend = first_track(model)
+    assert model.predictor is predictor
+    assert backend.session.get_session_options().intra_op_num_threads == 2
+
+
+def test_openvino_thread_limit_survives_first_track(model_path):
+    pytest.importorskip("openvino")
+    model = load_model(model_path, "openvino", threads=2, imgsz=IMGSZ, tracker=TRACKER)
+    backend = first_track(model)
+    # OpenVINO sınırı çekirdek sayısına indirir
+    assert int(backend.ov_compiled_model.get_property("INFERENCE_NUM_THREADS")) == min(2, os.cpu_count())
+    # Giriş boyutu değişince yapılan yeniden derleme de sınırı korur
+    assert backend.compile_model.keywords["config"]["INFERENCE_NUM_THREADS"] == 2
@@ -0,0 +1,50 @@
+import numpy as np
+
+from tiled_detector import TiledDetector, border_mask, merge_detections, tile_grid
+
+
+def detections(*rows):
+    return np.array(rows, dtype=np.float32)
+
+
+def test_nested_vehicles_in_same_tile_are_kept():
+    # Kamyon ve önündeki otomobil: IoS > 0.8 ama aynı karodan, IoU düşük
+    dets = detections([100, 100, 300, 250, 0.9, 2], [200, 150, 290, 245, 0.8, 2])
+    merged = merge_detections(dets, tile_index=[0, 0], clipped=[False, False])
+    assert len(merged) == 2
+    assert len(merge_detections(dets)) == 2
+
+
+def test_clipped_half_vehicle_merges_with_neighbour_tile():
+    # Sol karonun sağ kenarında (x=500) kesilmiş yarım araç + tüm kare geçişindeki tam araç
+    dets = detections([440, 200, 500, 260, 0.9, 2], [440, 200, 560, 262, 0.7, 2])
+    tiles = np.array([[0, 0, 500, 540], [0, 0, 1000, 540]])
+    tile_index = np.array([0, 1])
+    clipped = border_mask(dets, tiles[tile_index], (0, 0, 1000, 540))
+    assert clipped.tolist() == [True, False]
+
+    merged = merge_detections(dets, tile_index=tile_index, clipped=clipped)
+    assert len(merged) == 1
+    assert merged[0, :4].tolist() == [440, 200, 560, 262]
+
+
+def test_region_edge_is_not_a_tile_border():
+    tiles = tile_grid((0, 0, 1000, 540), 1, 2, overlap=0.2)
+    dets = detections([0, 100, 50, 150, 0.9, 2])
+    assert not border_mask(dets, tiles[[0]], (0, 0, 1000, 540))[0]
+
+
+def test_polygon_is_masked_in_every_tile():
+    # Sol üst üçgen ROI; sağ alt köşe dışarıda kalır
+    frame = np.full((200, 400, 3), 255, dtype=np.uint8)
+    detector = TiledDetector(None, (1, 2), overlap=0.2, polygon=[(0, 0), (400, 0), (0, 200)])
+    crops = detector.crops(frame)
+    tiles = detector.tiles(frame.shape)
+
+    assert len(crops) == 3
+    for crop, (x1, y1, x2, y2) in zip(crops, tiles):
+        assert crop.shape == (y2 - y1, x2 - x1, 3)
+        assert crop[0, 0].tolist() == [255, 255, 255]
+        assert crop[-1, -1].tolist() == [0, 0, 0]
+    # Kare değişmez (karolar maskeli kopyalardır)
+    assert (frame == 255).all()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from track_registry import TrackRegistry
+
+
+def boxes(n):
+    return np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+
+
+def test_eviction_keeps_tracks_matched_in_same_frame():
+    registry = TrackRegistry(capacity=2)
+    registry.update(boxes(2), [1, 2], 0)
+
+    # 1 bu karede eşleşti; yer açmak için en eski ama bu karede görülmemiş olan 2 çıkarılmalı
+    slots = registry.update(boxes(2), [1, 3], 1)
+
+    assert slots[0] != slots[1]
+    assert 1 in registry and 3 in registry and 2 not in registry
+    assert registry.lookup(1) == slots[0] and registry.lookup(3) == slots[1]
+    assert registry.hits[slots[0]] == 2 and registry.prev_seen[slots[0]] == 0
+    assert registry.evicted_total == 1
+
+
+def test_new_ids_do_not_evict_each_other():
+    registry = TrackRegistry(capacity=3)
+    registry.update(boxes(3), [1, 2, 3], 0)
+
+    slots = registry.update(boxes(3), [4, 5, 1], 1)
+
+    assert len(set(slots.tolist())) == 3
+    assert sorted(int(registry.track_id[slot]) for slot in slots) == [1, 4, 5]
+    assert registry.generation[slots[0]] == 2 and registry.generation[slots[2]] == 1
+
+
+def test_too_many_ids_in_one_frame():
+    registry = TrackRegistry(capacity=2)
+    with pytest.raises(ValueError):
+        registry.update(boxes(3), [1, 2, 3], 0)
+
+
+def test_expired_slots_are_reused():
+    registry = TrackRegistry(capacity=4, max_age=2)
+    first = registry.update(boxes(1), [7], 0)
+    registry.update(boxes(1), [8], 5)
+
+    assert 7 not in registry
+    assert registry.expired_total == 1
+    assert registry.lookup(8) == first[0]
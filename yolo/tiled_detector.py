@@ -0,0 +1,197 @@
+import time
+
+import cv2
+import numpy as np
+
+TRACKER_CONFIG = "bytetrack.yaml"
+TILE_BORDER = 2  # Kutunun karo kenarında kesilmiş sayılacağı uzaklık (piksel)
+
+
+def tile_grid(region, rows, cols, overlap=0.2):
+    """region (x1, y1, x2, y2) alanını örtüşen rows x cols karoya böler: (rows*cols, 4) int dizi"""
+    x1, y1, x2, y2 = region
+    tile_w = (x2 - x1) / (cols - (cols - 1) * overlap)
+    tile_h = (y2 - y1) / (rows - (rows - 1) * overlap)
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            tx = x1 + col * tile_w * (1 - overlap)
+            ty = y1 + row * tile_h * (1 - overlap)
+            tiles.append((tx, ty, min(tx + tile_w, x2), min(ty + tile_h, y2)))
+    return np.round(tiles).astype(np.int64)
+
+
+def border_mask(detections, tile_boxes, region):
+    """Karo iç kenarına (bölge kenarı olmayan) değen, yani kesilmiş olabilecek tespitlerin maskesi.
+
+    tile_boxes: her tespitin geldiği karonun (N, 4) dikdörtgeni (kare koordinatlarında).
+    """
+    boxes = detections[:, :4]
+    inner = tile_boxes != np.asarray(region)
+    near = np.concatenate((boxes[:, :2] <= tile_boxes[:, :2] + TILE_BORDER,
+                           boxes[:, 2:] >= tile_boxes[:, 2:] - TILE_BORDER), axis=1)
+    return (inner & near).any(axis=1)
+
+
+def merge_detections(detections, iou_threshold=0.5, ios_threshold=0.8, tile_index=None, clipped=None):
+    """Karolardan gelen (N, 6) [x1, y1, x2, y2, conf, cls] tespitlerini sınıf bazlı NMS ile birleştirir.
+
+    tile_index (her tespitin karosu) ve clipped (karo iç kenarına değme maskesi)
+    verilirse IoU'ya ek olarak küçük kutunun büyük kutu içinde kalan oranı (IoS)
+    da kontrol edilir: karo kenarında kesilmiş yarım araç, tam görüldüğü komşu
+    karodaki (veya tüm kare geçişindeki) kutuyla birleştirilir. Bu yalnızca farklı
+    karolardan gelen ve küçüğü karo kenarına değen çiftlere uygulanır; aynı
+    karodaki iç içe iki araç (ör. kamyonun önündeki otomobil) düz IoU NMS'e
+    tabidir. Birleşen kutu ikisini de kapsar.
+    """
+    if len(detections) < 2:
+        return detections
+    order = np.argsort(-detections[:, 4])
+    detections = detections[order]
+    boxes, classes = detections[:, :4], detections[:, 5]
+    use_ios = tile_index is not None and clipped is not None
+    if use_ios:
+        tile_index, clipped = np.asarray(tile_index)[order], np.asarray(clipped)[order]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    keep = []
+    merged = boxes.copy()
+    remaining = np.arange(len(detections))
+    while len(remaining):
+        best, rest = remaining[0], remaining[1:]
+        keep.append(best)
+        if not len(rest):
+            break
+        w = np.minimum(boxes[rest, 2], boxes[best, 2]) - np.maximum(boxes[rest, 0], boxes[best, 0])
+        h = np.minimum(boxes[rest, 3], boxes[best, 3]) - np.maximum(boxes[rest, 1], boxes[best, 1])
+        inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+        iou = inter / (areas[rest] + areas[best] - inter + 1e-9)
+        same_class = classes[rest] == classes[best]
+        if use_ios:
+            ios = inter / (np.minimum(areas[rest], areas[best]) + 1e-9)
+            smaller_clipped = np.where(areas[rest] <= areas[best], clipped[rest], clipped[best])
+            contained = same_class & (tile_index[rest] != tile_index[best]) & smaller_clipped & (ios > ios_threshold)
+        else:
+            contained = np.zeros(len(rest), dtype=bool)
+        if contained.any():
+            inside = rest[contained]
+            merged[best, :2] = np.minimum(merged[best, :2], boxes[inside, :2].min(axis=0))
+            merged[best, 2:] = np.maximum(merged[best, 2:], boxes[inside, 2:].max(axis=0))
+        remaining = rest[~(contained | (same_class & (iou > iou_threshold)))]
+    result = detections[keep]
+    result[:, :4] = merged[keep]
+    return result
+
+
+class TiledDetector:
+    """Yüksek çözünürlüklü kareyi örtüşen karolara bölüp tek partide tespit eder.
+
+    imgsz=640 ile 4K kare ~6 kat küçülür ve uzaktaki araçlar tespit sınırının
+    altına düşer. Her karo ayrı ayrı imgsz'ye ölçeklendiğinden uzak araçlar daha
+    büyük görünür. include_full=True iken tüm kare de partiye eklenir; karolara
+    sığmayan büyük araçlar bu geçişten gelir. Sonuçlar karolar arası NMS ile
+    birleştirilir. Karolar karenin görünümleridir (kopya yok).
+
+    polygon ([(x, y), ...], kare koordinatlarında) verilirse RoiLetterbox'taki
+    gibi poligon dışı her karoda siyaha boyanır; karolu mod ile letterbox yolu
+    aynı alandaki araçları görür. Maskeler ve maskeli karo tamponları bir kez
+    ayrılır.
+    """
+
+    def __init__(self, model, layout=(2, 2), overlap=0.2, include_full=True, region=None, imgsz=640,
+                 classes=None, conf=0.25, iou=0.5, polygon=None):
+        self.model = model
+        self.layout = tuple(layout)
+        self.overlap = overlap
+        self.include_full = include_full
+        self.region = region
+        self.polygon = polygon
+        self.imgsz = imgsz
+        self.classes = classes
+        self.conf = conf
+        self.iou = iou
+        self._tiles = None
+        self._masks = None
+        self._buffers = None
+        self._frame_shape = None
+        self.last_elapsed = 0.0
+
+    def tiles(self, frame_shape):
+        """Kare boyutu için karo dikdörtgenleri (boyut değişmedikçe önbellekten)"""
+        if self._frame_shape != frame_shape[:2]:
+            height, width = frame_shape[:2]
+            region = self.region or (0, 0, width, height)
+            tiles = tile_grid(region, *self.layout, overlap=self.overlap)
+            if self.include_full:
+                tiles = np.vstack((tiles, [region]))
+            self._tiles = tiles
+            self._frame_shape = frame_shape[:2]
+            if self.polygon is not None:
+                self._build_masks(tiles)
+        return self._tiles
+
+    def _build_masks(self, tiles):
+        polygon = np.asarray(self.polygon, dtype=np.float64).reshape(-1, 2)
+        self._masks, self._buffers = [], []
+        for x1, y1, x2, y2 in tiles:
+            mask = np.zeros((y2 - y1, x2 - x1, 3), dtype=np.uint8)
+            cv2.fillPoly(mask, [np.round(polygon - (x1, y1)).astype(np.int32)], (255, 255, 255))
+            self._masks.append(mask)
+            self._buffers.append(np.empty_like(mask))
+
+    def crops(self, frame):
+        """Modele verilecek karo görüntüleri (poligon varsa maskeli tampon, yoksa karenin görünümü)"""
+        tiles = self.tiles(frame.shape)
+        views = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        if self.polygon is None:
+            return views
+        return [cv2.bitwise_and(view, mask, dst=buffer)
+                for view, mask, buffer in zip(views, self._masks, self._buffers)]
+
+    def detect(self, frame):
+        """Karedeki tespitleri (N, 6) [x1, y1, x2, y2, conf, cls] olarak (kare koordinatlarında) döner"""
+        start_time = time.perf_counter()
+        tiles = self.tiles(frame.shape)
+        results = self.model.predict(self.crops(frame), verbose=False, classes=self.classes, conf=self.conf,
+                                     iou=self.iou, imgsz=self.imgsz)
+
+        parts, sources = [], []
+        for index, ((x1, y1, _, _), result) in enumerate(zip(tiles, results)):
+            data = result.boxes.data.cpu().numpy()
+            if len(data):
+                data = data[:, :6].copy()
+                data[:, [0, 2]] += x1
+                data[:, [1, 3]] += y1
+                parts.append(data)
+                sources.append(np.full(len(data), index))
+        if not parts:
+            self.last_elapsed = time.perf_counter() - start_time
+            return np.empty((0, 6), dtype=np.float32)
+        detections = np.concatenate(parts)
+        tile_index = np.concatenate(sources)
+        height, width = frame.shape[:2]
+        clipped = border_mask(detections, tiles[tile_index], self.region or (0, 0, width, height))
+        detections = merge_detections(detections, self.iou, tile_index=tile_index, clipped=clipped)
+        self.last_elapsed = time.perf_counter() - start_time
+        return detections
+
+
+class TiledTracker:
+    """TiledDetector çıktısını ByteTrack'e verir; model.track() ile aynı (kutular, id'ler) sonucunu döner"""
+
+    def __init__(self, detector, tracker_config=TRACKER_CONFIG, frame_rate=30):
+        # ultralytics yalnızca karolu mod açıldığında içe aktarılır (başlangıç süresi)
+        from ultralytics.engine.results import Boxes
+
+        from model_runtime import byte_tracker, tracker_args
+
+        self._boxes = Boxes
+        self.detector = detector
+        self.tracker = byte_tracker(tracker_args(tracker_config), frame_rate)
+
+    def track(self, frame):
+        detections = self.detector.detect(frame)
+        tracks = self.tracker.update(self._boxes(detections, frame.shape[:2]), frame)
+        if len(tracks):
+            return tracks[:, :4].astype(np.float32), tracks[:, 4].astype(np.int32)
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.int32)
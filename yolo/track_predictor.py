@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class ConstantVelocityPredictor:
+    """Tespit yapılmayan karelerde takip edilen kutuları sabit hızla ileri taşır.
+
+    Son iki ByteTrack tespitinde görülen her ID için kare başına hız hesaplanır;
+    atlanan karelerde kutular bu hızla kaydırılır. Yalnızca son tespitteki ID'ler
+    tutulduğundan bellek kullanımı araç sayısıyla sınırlıdır.
+    """
+
+    def __init__(self, max_gap=10):
+        # max_gap: hızın geçerli sayılacağı en fazla kare aralığı
+        self.max_gap = max_gap
+        self.boxes = np.empty((0, 4), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int32)
+        self.velocity = np.empty((0, 4), dtype=np.float32)
+        self.frame_index = None
+
+    def update(self, boxes, ids, frame_index):
+        """Yeni tespit sonucunu kaydeder ve ID başına hızı günceller"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        ids = np.asarray(ids, dtype=np.int32).reshape(-1)
+        velocity = np.zeros_like(boxes)
+
+        gap = None if self.frame_index is None else frame_index - self.frame_index
+        if gap is not None and 0 < gap <= self.max_gap and len(self.ids) and len(ids):
+            # Önceki tespitte de görülen ID'leri vektörel eşleştir
+            order = np.argsort(self.ids)
+            sorted_ids = self.ids[order]
+            pos = np.searchsorted(sorted_ids, ids).clip(max=len(sorted_ids) - 1)
+            matched = sorted_ids[pos] == ids
+            prev = order[pos[matched]]
+            velocity[matched] = (boxes[matched] - self.boxes[prev]) / gap
+
+        self.boxes = boxes
+        self.ids = ids
+        self.velocity = velocity
+        self.frame_index = frame_index
+
+    def predict(self, frame_index):
+        """Verilen kare için tahmini kutuları ve ID'leri döner"""
+        if self.frame_index is None or not len(self.ids):
+            return self.boxes, self.ids
+        steps = min(max(frame_index - self.frame_index, 0), self.max_gap)
+        return self.boxes + self.velocity * steps, self.ids
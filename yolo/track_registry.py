@@ -0,0 +1,165 @@
+import numpy as np
+
+
+class TrackRecord:
+    """Tek bir takibin anlık görüntüsü (pano ve hata ayıklama için)"""
+
+    __slots__ = ("track_id", "slot", "box", "first_seen", "last_seen", "hits")
+
+    def __init__(self, track_id, slot, box, first_seen, last_seen, hits):
+        self.track_id = track_id
+        self.slot = slot
+        self.box = box
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self.hits = hits
+
+    @property
+    def age(self):
+        return self.last_seen - self.first_seen + 1
+
+    def __repr__(self):
+        return f"TrackRecord(id={self.track_id}, slot={self.slot}, hits={self.hits}, last_seen={self.last_seen})"
+
+
+class TrackRegistry:
+    """ByteTrack ID'leri için sabit kapasiteli, süre aşımlı takip tablosu.
+
+    Her ID'ye 0..capacity-1 arasında bir yuva atanır; kayıtlar yuva indeksli
+    dizilerde tutulur ve ID -> yuva eşlemesi sözlükle O(1) bulunur. max_age
+    kare boyunca görülmeyen ID'ler silinir, yuvaları yeniden kullanılır. Tablo
+    dolarsa bu karede görülmemiş takiplerden en uzun süredir görülmeyen
+    çıkarılır. Bu yüzden ID'ler sınırsız
+    artsa da bellek kullanımı sabittir.
+
+    Diğer aşamalar (akış sayımı, hız tahmini) kendi durumlarını aynı yuva
+    indeksli dizilerde tutar. Bir yuva her yeniden atandığında generation[yuva]
+    artar; eski nesilde kalan kendi kayıtlarını bu sayede sıfırlarlar.
+    """
+
+    def __init__(self, capacity=1024, max_age=90):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.track_id = np.full(capacity, -1, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.generation = np.zeros(capacity, dtype=np.int64)
+        self.first_seen = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.prev_seen = np.zeros(capacity, dtype=np.int64)
+        self.hits = np.zeros(capacity, dtype=np.int64)
+        self.box = np.zeros((capacity, 4), dtype=np.float32)
+        self.prev_box = np.zeros((capacity, 4), dtype=np.float32)
+
+        self._slot_of = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self.frame_index = None
+        self.expired_total = 0
+        self.evicted_total = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, track_id):
+        return int(track_id) in self._slot_of
+
+    def lookup(self, track_id):
+        """ID'nin yuvası (yoksa -1)"""
+        return self._slot_of.get(int(track_id), -1)
+
+    def _release(self, slot):
+        del self._slot_of[int(self.track_id[slot])]
+        self.active[slot] = False
+        self.track_id[slot] = -1
+        self._free.append(int(slot))
+
+    def expire(self, frame_index):
+        """max_age kareden uzun süredir görülmeyen takipleri siler; silinen yuvaları döner"""
+        stale = np.flatnonzero(self.active & (frame_index - self.last_seen > self.max_age))
+        for slot in stale:
+            self._release(slot)
+        self.expired_total += len(stale)
+        return stale
+
+    def _allocate(self, track_id, box, frame_index):
+        if not self._free:
+            # Tablo dolu: bu karede görülmemiş takiplerden en uzun süredir görülmeyeni çıkar
+            candidates = np.flatnonzero(self.active & (self.last_seen < frame_index))
+            self._release(candidates[np.argmin(self.last_seen[candidates])])
+            self.evicted_total += 1
+        slot = self._free.pop()
+        self._slot_of[track_id] = slot
+        self.track_id[slot] = track_id
+        self.active[slot] = True
+        self.generation[slot] += 1
+        self.first_seen[slot] = frame_index
+        self.last_seen[slot] = frame_index
+        self.hits[slot] = 0
+        self.box[slot] = box
+        return slot
+
+    def update(self, boxes, ids, frame_index):
+        """Karedeki kutuları kaydeder; ID'lerin yuva dizisini (ids ile aynı sırada) döner"""
+        self.expire(frame_index)
+        self.frame_index = frame_index
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if len(ids) > self.capacity:
+            raise ValueError(f"Karedeki takip sayısı ({len(ids)}) kapasiteyi ({self.capacity}) aşıyor")
+
+        id_list = ids.tolist()
+        slot_of = self._slot_of
+        slots = np.fromiter((slot_of.get(track_id, -1) for track_id in id_list), dtype=np.intp, count=len(ids))
+
+        # Bilinen takipler yeni ID'lere yer açılmadan önce bu kareye işlenir; böylece çıkarılmazlar
+        known = slots[slots >= 0]
+        self.prev_box[known] = self.box[known]
+        self.prev_seen[known] = self.last_seen[known]
+        self.last_seen[known] = frame_index
+        for i in np.flatnonzero(slots < 0).tolist():
+            slot = slot_of.get(id_list[i])
+            if slot is None:
+                slot = self._allocate(id_list[i], boxes[i], frame_index)
+                self.prev_box[slot] = boxes[i]
+                self.prev_seen[slot] = frame_index
+            slots[i] = slot
+
+        self.box[slots] = boxes
+        self.hits[slots] += 1
+        return slots
+
+    def active_slots(self):
+        return np.flatnonzero(self.active)
+
+    def snapshot(self):
+        """Aktif takiplerin sütun tabanlı kopyası"""
+        slots = self.active_slots()
+        return {
+            "slot": slots,
+            "track_id": self.track_id[slots].copy(),
+            "box": self.box[slots].copy(),
+            "first_seen": self.first_seen[slots].copy(),
+            "last_seen": self.last_seen[slots].copy(),
+            "hits": self.hits[slots].copy(),
+        }
+
+    def get(self, track_id):
+        slot = self.lookup(track_id)
+        if slot < 0:
+            return None
+        return self._record(slot)
+
+    def _record(self, slot):
+        return TrackRecord(int(self.track_id[slot]), int(slot), self.box[slot].copy(),
+                           int(self.first_seen[slot]), int(self.last_seen[slot]), int(self.hits[slot]))
+
+    def __iter__(self):
+        for slot in self.active_slots():
+            yield self._record(slot)
+
+    def stats(self):
+        return {
+            "active": len(self._slot_of),
+            "capacity": self.capacity,
+            "expired": self.expired_total,
+            "evicted": self.evicted_total,
+        }
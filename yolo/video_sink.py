@@ -0,0 +1,172 @@
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class OpenCVSink:
+    """cv2.VideoWriter ile kayıt (mevcut davranış)"""
+
+    def __init__(self, path, fps, size, fourcc='mp4v'):
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Video yazıcı açılamadı: {path}")
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def release(self):
+        self.writer.release()
+
+
+# x264 ön ayar adlarının NVENC karşılıkları (p1 en hızlı, p7 en kaliteli)
+NVENC_PRESETS = {
+    "ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3", "fast": "p3",
+    "medium": "p4", "slow": "p5", "slower": "p6", "veryslow": "p7",
+}
+# QSV yalnızca veryfast..veryslow adlarını tanır
+QSV_PRESETS = {"ultrafast": "veryfast", "superfast": "veryfast"}
+
+
+def encoder_options(codec, preset=None, crf=None):
+    """Kodlayıcıya uygun hız ön ayarı ve kalite argümanları.
+
+    x264 adları (ör. "veryfast") donanım kodlayıcılarda karşılığına çevrilir;
+    NVENC "p1".."p7", QSV "veryfast".."veryslow" kullanır, VAAPI ön ayar almaz.
+    crf, NVENC'de -cq, QSV'de -global_quality, VAAPI'de -qp olarak verilir.
+    """
+    if codec.endswith("_nvenc"):
+        preset, quality = NVENC_PRESETS.get(preset, preset), "-cq"
+    elif codec.endswith("_qsv"):
+        preset, quality = QSV_PRESETS.get(preset, preset), "-global_quality"
+    elif codec.endswith("_vaapi"):
+        preset, quality = None, "-qp"
+    else:
+        quality = "-crf"
+    options = []
+    if preset:
+        options += ['-preset', preset]
+    if crf is not None:
+        options += [quality, str(crf)]
+    return options
+
+
+class FFmpegSink:
+    """Ham BGR kareleri stdin üzerinden bir ffmpeg sürecine aktarır.
+
+    codec donanım kodlayıcı da olabilir (ör. h264_nvenc, h264_qsv, h264_vaapi);
+    kodlama ayrı süreçte yürüdüğü için Python tarafında yalnızca kopyalama kalır.
+    preset / crf kodlayıcıya göre çevrilir (bkz. encoder_options).
+    """
+
+    def __init__(self, path, fps, size, codec='libx264', preset='veryfast', crf=23,
+                 pix_fmt='yuv420p', extra_args=None, ffmpeg_bin='ffmpeg'):
+        if shutil.which(ffmpeg_bin) is None:
+            raise RuntimeError(f"ffmpeg bulunamadı: {ffmpeg_bin}")
+
+        width, height = size
+        command = [
+            ffmpeg_bin, '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}', '-r', str(fps),
+            '-i', '-',
+            '-an', '-c:v', codec,
+        ]
+        command += encoder_options(codec, preset, crf)
+        command += ['-pix_fmt', pix_fmt]
+        command += list(extra_args or [])
+        command.append(path)
+
+        self.size = size
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        height, width = frame.shape[:2]
+        if (width, height) != self.size:
+            frame = cv2.resize(frame, self.size)
+        try:
+            self.process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg süreci beklenmedik şekilde kapandı (kod: {self.process.poll()})")
+
+    def release(self):
+        if self.process.stdin and not self.process.stdin.closed:
+            self.process.stdin.close()
+        self.process.wait()
+
+
+class NullSink:
+    """Kodlama yapmaz; yalnızca analiz sonuçları gerektiğinde kullanılır"""
+
+    def write(self, frame):
+        pass
+
+    def release(self):
+        pass
+
+
+class ThreadedSink:
+    """Herhangi bir çıktıyı ayrı bir iş parçacığında çalıştırır, ana döngüyü bekletmez.
+
+    write() kareyi sınırlı kuyruğa bırakır; kuyruk doluysa kodlayıcı yetişene kadar
+    bekler. Yazılan kare sonradan değiştirilmemelidir. on_write verilirse her karenin
+    gerçek kodlama süresi (saniye) kodlama iş parçacığında ona bildirilir.
+    """
+
+    _END = object()
+
+    def __init__(self, sink, queue_size=32, on_write=None):
+        self.sink = sink
+        self.on_write = on_write
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._loop, name="video-sink", daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        while True:
+            frame = self.queue.get()
+            if frame is self._END:
+                break
+            if self.error is not None:
+                continue
+            start = time.perf_counter()
+            try:
+                self.sink.write(frame)
+            except Exception as e:
+                self.error = e
+                continue
+            if self.on_write is not None:
+                self.on_write(time.perf_counter() - start)
+
+    def write(self, frame):
+        if self.error is not None:
+            raise RuntimeError(f"Video kodlama hatası: {self.error}") from self.error
+        self.queue.put(frame)
+
+    def release(self):
+        self.queue.put(self._END)
+        self.thread.join()
+        try:
+            self.sink.release()
+        except Exception as e:
+            self.error = self.error or e
+        if self.error is not None:
+            raise RuntimeError(f"Video kodlama hatası: {self.error}") from self.error
+
+
+def open_sink(mode, path, fps, size, threaded=True, on_write=None, **options):
+    """mode: "opencv" | "ffmpeg" | "none" için uygun çıktıyı döner (on_write: bkz. ThreadedSink)"""
+    if mode == "none":
+        return NullSink()
+    if mode == "opencv":
+        sink = OpenCVSink(path, fps, size, **options)
+    elif mode == "ffmpeg":
+        sink = FFmpegSink(path, fps, size, **options)
+    else:
+        raise ValueError(f"Bilinmeyen çıktı modu: {mode}")
+    return ThreadedSink(sink, on_write=on_write) if threaded else sink